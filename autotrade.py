@@ -1,31 +1,246 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
 import os
+import argparse
+import threading
 from dotenv import load_dotenv
-import json
-import pyupbit
-import pandas as pd
-import ta
-from datetime import datetime, timedelta
-from openai import OpenAI
-import time
-import codecs
-import requests
+from datetime import datetime, timedelta, timezone
+# openai, pyupbit(pandas), 지표, 캔들 저장소, 웹소켓, 저널(pyarrow)은 무거우므로 처음 쓸 때 import
+from cache import TTLCache
+from decision_cache import DecisionCache, fingerprint
+from execution import create_order_executor, live_trading_enabled, size_order, MIN_ORDER_KRW
+from prompt_encoder import PromptEncoder, SYSTEM_PROMPT, DEFAULT_TOKEN_BUDGET
+from decision_parser import (
+    DecisionParser, DecisionParseError, StreamingDecisionParser, RESPONSE_FORMAT, RETRY_MESSAGE,
+)
+from scheduler import add_schedule_arguments, scheduler_from_args
+from observability import (
+    METRICS, StartupReport, get_logger, add_observability_arguments, setup_observability, export_cycle_metrics,
+)
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 load_dotenv()
 
+log = get_logger("autotrade")
+STARTUP = StartupReport(_IMPORT_STARTED)
+
+# 데이터 소스별 수집 제한 시간 (초)
+SOURCE_TIMEOUTS = {
+    "current_status": 5,
+    "orderbook_data": 3,
+    "ohlcv": 10,
+    "fear_greed": 5,
+    "news": 8,
+}
+
+# 지표 계산에 사용할 캔들 수 (SMA_120과 EMA 워밍업에 충분한 길이)
+DAILY_LOOKBACK = 200
+HOURLY_LOOKBACK = 200
+
+KST_OFFSET = timedelta(hours=9)  # candle_store와 같음 (pyupbit를 불러오지 않도록 따로 둠)
+
+# AI에 전달할 최근 캔들 수
+DAILY_WINDOW = 7
+HOURLY_WINDOW = 6
+
+
+class lazy_property:
+    """처음 접근할 때 한 번만 만드는 속성 (여러 스레드가 동시에 접근해도 한 번만 생성)
+
+    값은 인스턴스 __dict__에 저장되므로 이후 접근과 __init__에서의 대입은 일반 속성과 같다.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.name = factory.__name__
+        self.__doc__ = factory.__doc__
+        self.lock = threading.RLock()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self.lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.factory(instance)
+            return instance.__dict__[self.name]
+
+
+def frame_to_payload(df, rows, date_format):
+    """DataFrame의 최근 rows개 행을 컬럼별 리스트 dict로 변환 (NaN은 None)"""
+    import numpy as np
+
+    window = df.iloc[-rows:]
+    values = window.to_numpy(dtype=float)
+    cells = values.astype(object)
+    cells[np.isnan(values)] = None
+
+    payload = {"date": window.index.strftime(date_format).tolist()}
+    payload.update(zip(window.columns, cells.T.tolist()))
+    return payload
+
+
+def daily_candle_start(now=None):
+    """진행 중인 일봉의 시작 시각 (UTC 자정. pyupbit 캔들 인덱스와 같은 KST 기준)"""
+    now = now or datetime.now(timezone.utc)
+    return datetime(now.year, now.month, now.day) + KST_OFFSET
+
+
+def optimize_analysis_data(analysis_data):
+    """gather_analysis_data() 결과에서 AI 프롬프트에 넣을 항목만 추림"""
+    return {
+        "current_status" : analysis_data["current_status"],
+        "orderbook_data" : {
+            "timestamp": analysis_data["orderbook_data"]["timestamp"],
+            "total_ask_size": analysis_data["orderbook_data"]["total_ask_size"],
+            "total_bid_size": analysis_data["orderbook_data"]["total_bid_size"],
+            "ask_prices": analysis_data["orderbook_data"]["ask_prices"][:3],  # 상위 3개 호가만 사용
+            "bid_prices": analysis_data["orderbook_data"]["bid_prices"][:3],  # 상위 3개 호가만 사용
+            "microstructure": analysis_data["orderbook_data"].get("microstructure"),
+        },
+        "ohlcv_data": analysis_data["ohlcv"],
+        "fear_greed" : analysis_data["fear_greed"],
+        "data_age_seconds" : {
+            source: round(age) for source, age in analysis_data.get("data_age", {}).items()
+            if age is not None
+        },
+    }
+
+
+def parse_balances(balances, ticker):
+    """get_balances() 결과에서 (보유 현금, 보유 암호화폐, 평균 매수 단가) 추출"""
+    if not isinstance(balances, list):
+        raise ValueError(f"Unexpected balances response: {balances}")
+
+    fiat, currency = ticker.split("-")
+    krw_balance = crypto_balance = avg_buy_price = 0.0
+    for item in balances:
+        if item["currency"] == fiat:
+            krw_balance = float(item["balance"])
+        elif item["currency"] == currency and item["unit_currency"] == fiat:
+            crypto_balance = float(item["balance"])
+            avg_buy_price = float(item["avg_buy_price"])
+    return krw_balance, crypto_balance, avg_buy_price
+
+
 class EnhancedCryptoDataCollector:
-    def __init__(self, ticker="KRW-BTC"):
+    # upbit/client/executor/candle_store/http/cache/decision_cache/feed/order_executor/journal을 넘기면
+    # 여러 collector가 같은 객체를 공유. 넘기지 않은 클라이언트/저장소는 처음 사용할 때 만듦
+    def __init__(self, ticker="KRW-BTC", upbit=None, client=None, executor=None, candle_store=None, http=None,
+                 cache=None, decision_cache=None, feed=None, order_executor=None, journal=None):
         self.ticker = ticker
         self.access = os.getenv("UPBIT_ACCESS_KEY")
         self.secret = os.getenv("UPBIT_SECRET_KEY")
         self.serpapi_key = os.getenv("SERPAPI_KEY")
-        self.upbit = pyupbit.Upbit(self.access, self.secret)
-        self.client = OpenAI()
         self.fear_greed_api = "https://api.alternative.me/fng/"
+        self.serpapi_api = "https://serpapi.com/search.json"
+        self.executor = executor or ThreadPoolExecutor(max_workers=8, thread_name_prefix="collector")
+        self.status_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="status")
+        self.indicator_series = {}  # (ticker, interval)별 증분 지표 엔진
+        self._inflight = {}  # 소스별 마지막 조회 future (제한 시간을 넘겨도 끝날 때까지 다시 조회하지 않음)
+        # 천천히 바뀌는 입력(공포탐욕지수, 뉴스, 일봉) 캐시
+        self.cache = cache or TTLCache(path=os.getenv("CACHE_PATH", ".cache/collector_cache.json"))
+        self.last_analysis = None  # 직전 get_ai_analysis의 프롬프트/응답 (저널 기록용)
+        self.feed = feed  # MarketFeed가 있으면 현재가/호가를 웹소켓 상태에서 읽음
+        self.decision_parser = DecisionParser()  # AI 응답 검증 (파싱 실패 횟수 집계)
+        # 응답을 스트리밍으로 받아 결정 필드가 완성되는 즉시 매매 (LLM_STREAM=0이면 전체 응답 대기)
+        self.stream_responses = os.getenv("LLM_STREAM", "1").lower() not in ("0", "false", "no")
+        self.last_llm_timing = None
+
+        shared = {
+            "upbit": upbit, "client": client, "http": http, "candle_store": candle_store,
+            "decision_cache": decision_cache, "order_executor": order_executor, "journal": journal,
+        }
+        for name, value in shared.items():
+            if value is not None:
+                setattr(self, name, value)
+
+    @lazy_property
+    def upbit(self):
+        import pyupbit
+        return pyupbit.Upbit(self.access, self.secret)
+
+    @lazy_property
+    def client(self):
+        from openai import OpenAI
+        return OpenAI()
+
+    @lazy_property
+    def http(self):
+        """외부 API 호출은 모두 공유 세션과 재시도 정책을 거침"""
+        from http_client import HttpClient
+        return HttpClient()
+
+    @lazy_property
+    def candle_store(self):
+        from candle_store import CandleStore
+        return CandleStore(os.getenv("CANDLE_STORE_DIR", ".candles"), http=self.http)
+
+    @lazy_property
+    def journal(self):
+        """사이클별 입력/AI 응답/결정을 Parquet 저널에 기록 (JOURNAL_DIR이 비어 있으면 끔)"""
+        from journal import create_journal
+        return create_journal()
+
+    @lazy_property
+    def decision_cache(self):
+        """입력 지문이 같으면 DECISION_CACHE_SECONDS 동안 AI 결정 재사용 (저널의 최근 결정으로 시작)
+
+        재사용/복원한 결정으로는 주문하지 않으므로 재시작해도 직전 매매가 반복되지 않는다.
+        """
+        cache = DecisionCache(max_age=float(os.getenv("DECISION_CACHE_SECONDS", 900)))
+        if self.journal is not None:
+            cache.restore(self.journal)
+        return cache
+
+    @lazy_property
+    def orderbook_ring(self):
+        """호가 스냅샷 이력 (feed가 있으면 모든 웹소켓 호가가 쌓이는 feed의 링 버퍼 공유)"""
+        if self.feed is not None:
+            return self.feed.ring(self.ticker)
+        from orderbook_ring import OrderbookRing
+        return OrderbookRing()
+
+    @lazy_property
+    def prompt_encoder(self):
+        """시장 데이터를 PROMPT_TOKEN_BUDGET 토큰 이내의 간결한 표 형식으로 변환"""
+        return PromptEncoder(budget=int(os.getenv("PROMPT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)))
+
+    @lazy_property
+    def order_executor(self):
+        """주문 제출/체결 추적과 로컬 잔고 캐시 (LIVE_TRADING=1이 아니면 모의 거래소)"""
+        upbit = self.upbit if live_trading_enabled() else None
+        return create_order_executor(upbit, http=self.http, price_source=self._current_price)
+
+    def settings(self):
+        """클라이언트를 만들지 않고 확인할 수 있는 실행 설정 (--dry-run 출력용)"""
+        return {
+            "ticker": self.ticker,
+            "mode": "LIVE" if live_trading_enabled() else "PAPER",
+            "llm_stream": self.stream_responses,
+            "token_budget": int(os.getenv("PROMPT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)),
+            "decision_cache_seconds": float(os.getenv("DECISION_CACHE_SECONDS", 900)),
+            "candle_dir": os.getenv("CANDLE_STORE_DIR", ".candles"),
+            "journal_dir": os.getenv("JOURNAL_DIR", ".journal") or None,
+            "paper_ledger": None if live_trading_enabled() else os.getenv("PAPER_LEDGER", ".paper/ledger.json") or None,
+            "upbit_keys": bool(self.access and self.secret),
+            "openai_key": bool(os.getenv("OPENAI_API_KEY")),
+            "serpapi_key": bool(self.serpapi_key),
+        }
+
+    def _current_price(self, ticker):
+        import pyupbit
+
+        price = self.feed.get_price(ticker) if self.feed is not None else None
+        if price is None:
+            price = self.http.call("upbit", pyupbit.get_current_price, ticker)
+        return price
     
-    """비트코인 관련 최신 뉴스 조회"""
+    """비트코인 관련 최신 뉴스 조회 (캐시 TTL 동안 재사용)"""
     def get_crypto_news(self):
+        return self.cache.get_or_fetch("news", self._fetch_crypto_news)
+
+    def _fetch_crypto_news(self):
         try:
-            base_url = "https://serpapi.com/search.json"
             params = {
                 "engine" : "google_news",
                 "q" : "bitcoin crypto trading",
@@ -34,7 +249,7 @@ class EnhancedCryptoDataCollector:
                 "hl" : "en",  # 영어 뉴스
             }
 
-            response = requests.get(base_url, params=params)
+            response = self.http.get("serpapi", self.serpapi_api, params=params)
             if response.status_code == 200:
                 news_data = response.json()
 
@@ -51,31 +266,27 @@ class EnhancedCryptoDataCollector:
                         "snippet": news.get("snippet", "")
                     })
 
-                print("\n=== Latest Crypto News ===")
                 for news in processed_news:
-                    print(f"Title: {news['title']}")
-                    print(f"Source: {news['source']}")
-                    print(f"Date: {news['date']}")
+                    log.debug("Crypto news", title=news["title"], source=news["source"], date=news["date"])
 
                 return processed_news
             return None
         except Exception as e:
-            print(f"Error getting crypto news: {e}")
+            log.error("Error getting crypto news", error=repr(e))
             return None
 
 
-    """공포탐욕지수 데이터 조회"""
+    """공포탐욕지수 데이터 조회 (하루 한 번 갱신되므로 캐시 사용)"""
     def get_fear_greed_index(self, limit=7):
+        return self.cache.get_or_fetch("fear_greed", lambda: self._fetch_fear_greed_index(limit), key=limit)
+
+    def _fetch_fear_greed_index(self, limit):
         try:
-            response = requests.get(f"{self.fear_greed_api}?limit={limit}")
+            response = self.http.get("fear_greed", self.fear_greed_api, params={"limit": limit})
             if response.status_code == 200:
                 data = response.json()
                 
-                # 최신 공포탐욕지수 출력
                 latest = data['data'][0]
-                print("\n=== Fear & Greed Index ===")
-                print(f"Current Value : {latest['value']} ({latest['value_classification']})")
-    
 
                 # 7일간의 데이터 가공
                 processed_data = []
@@ -85,17 +296,16 @@ class EnhancedCryptoDataCollector:
                         "value": int(item["value"]),
                         "classification": item["value_classification"]
                     })
-                
-                print("\n=== Fear & Greed Index History ===")
-                print (f"processed_data: {processed_data}")
+
 
                 # 추세 분석
                 values = [int(item["value"]) for item in data['data']]
                 avg_value = sum(values) / len(values)
                 treand = "Improving" if values[0] > avg_value else "Deteriorating"
 
-                print("\n=== Fear & Greed Index AVG ===")
-                print(f"Avg: {avg_value:.2f}")   
+                log.info("Fear & greed index", value=latest["value"], classification=latest["value_classification"],
+                         average=round(avg_value, 2), trend=treand)
+                log.debug("Fear & greed history", history=processed_data)
 
                 return {
                     "current" : {
@@ -108,69 +318,56 @@ class EnhancedCryptoDataCollector:
                 }
             return None
         except Exception as e:
-            print(f"Error getting fear & greed index: {e}")
+            log.error("Error getting fear & greed index", error=repr(e))
             return None
 
 
     """기술적 분석 지표 추가"""
-    def add_technical_indicators(self, df):
-
-        # 볼린저 밴드
-        indicator_bb = ta.volatility.BollingerBands(close=df["close"])
-        df["bb_high"] = indicator_bb.bollinger_hband()
-        df["bb_mid"] = indicator_bb.bollinger_mavg()
-        df["bb_low"] = indicator_bb.bollinger_lband()
-        df['bb_pband'] = indicator_bb.bollinger_pband()  
-
-        # RSI
-        df["rsi"] = ta.momentum.RSIIndicator(close=df["close"]).rsi()
-
-        # MACD
-        macd = ta.trend.MACD(close=df["close"])
-        df["macd"] = macd.macd()
-        df["macd_signal"] = macd.macd_signal()
-        df["macd_diff"] = macd.macd_diff()
-
-        # 이동평균선
-        df["sma_5"] = ta.trend.SMAIndicator(close=df["close"], window=5).sma_indicator()
-        df["sma_20"] = ta.trend.SMAIndicator(
-            close=df["close"], window=20
-        ).sma_indicator()
-        df["sma_60"] = ta.trend.SMAIndicator(
-            close=df["close"], window=60
-        ).sma_indicator()
-        df["sma_120"] = ta.trend.SMAIndicator(
-            close=df["close"], window=120
-        ).sma_indicator()
-
-        # ATR
-        df["atr"] = ta.volatility.AverageTrueRange(
-            high=df["high"], low=df["low"], close=df["close"]
-        ).average_true_range()
+    def add_technical_indicators(self, df, key=None):
+        # key별로 지표 엔진을 유지해 이전 호출 이후 추가/변경된 캔들만 계산
+        # (key가 없으면 매번 처음부터 계산)
+        from indicators import IndicatorSeries, INDICATOR_COLUMNS
+
+        if key is None:
+            series = IndicatorSeries()
+        else:
+            series = self.indicator_series.setdefault(key, IndicatorSeries())
+
+        with METRICS.stage("indicators", interval=key[1] if key else "adhoc"):
+            values = series.sync(df)
+        for i, column in enumerate(INDICATOR_COLUMNS):
+            df[column] = values[:, i]
 
         return df
 
 
-    def get_current_status(self):
-        """현재 투자 상태 조회"""
+    def get_current_status(self, balances=None, current_price=None):
+        """현재 투자 상태 조회 (이미 조회한 잔고/현재가를 넘기면 재조회하지 않음)"""
         try:
-            krw_balance = float(self.upbit.get_balance("KRW"))                 # 보유 현금
-            crypto_balance = float(self.upbit.get_balance(self.ticker))        # 보유 암호화폐
-            avg_buy_price = float(self.upbit.get_avg_buy_price(self.ticker))   # 평균 매수 단가
-            current_price = float(pyupbit.get_current_price(self.ticker))      # 현재가
+            if current_price is None and self.feed is not None:
+                current_price = self.feed.get_price(self.ticker)
+
+            # 잔고(주문 실행기의 로컬 캐시, 처음에만 거래소 조회)와 현재가를 동시에 조회
+            if balances is None:
+                balances_future = self.status_executor.submit(self.order_executor.balances)
+            if current_price is None:
+                current_price = self.status_executor.submit(self._current_price, self.ticker).result()
+            if balances is None:
+                balances = balances_future.result()
+
+            # 보유 현금, 보유 암호화폐, 평균 매수 단가
+            krw_balance, crypto_balance, avg_buy_price = parse_balances(balances, self.ticker)
+            current_price = float(current_price)                # 현재가
 
-            print("\n=== Current Investment Status ===")
-            print(f"보유 현금 : {krw_balance:,.0f} KRW")
-            print(f"보유 암호화폐 : {crypto_balance:,.8f} {self.ticker}")
-            print(f"평균 매수 단가 : {avg_buy_price:,.0f} KRW")
-            print(f"현재가 : {current_price:,.0f} KRW")
 
             total_value = krw_balance + (crypto_balance * current_price)       # 총 자산 가치 (현금 + 암호화폐 가치)
             unrealized_profit = ((current_price - avg_buy_price) * crypto_balance) if crypto_balance > 0 else 0  # 미실현 손익
             profit_percentage = (((current_price - avg_buy_price) - 1) * 100) if crypto_balance > 0 else 0
 
-            print(f"총 자산 가치 : {total_value:,.0f} KRW")
-            print(f"미실현 손익 : {unrealized_profit:,.0f} KRW ({profit_percentage:.2f}%)")
+            log.info("Current investment status", ticker=self.ticker, krw=f"{krw_balance:,.0f}",
+                     crypto=f"{crypto_balance:,.8f}", avg_buy_price=f"{avg_buy_price:,.0f}",
+                     price=f"{current_price:,.0f}", total_value=f"{total_value:,.0f}",
+                     unrealized_profit=f"{unrealized_profit:,.0f}", profit_pct=f"{profit_percentage:.2f}")
 
             return {
                 "krw_balance": krw_balance,
@@ -183,13 +380,17 @@ class EnhancedCryptoDataCollector:
             }
         
         except Exception as e:
-            print(f"Error getting current status: {e}")
+            log.error("Error getting current status", ticker=self.ticker, error=repr(e))
             return None
 
     """호가 데이터 조회"""
-    def get_orderbook_data(self):
+    def get_orderbook_data(self, orderbook=None):
         try:
-            orderbook = pyupbit.get_orderbook(ticker=self.ticker)
+            if orderbook is None and self.feed is not None:
+                orderbook = self.feed.get_orderbook(self.ticker)
+            if orderbook is None:
+                import pyupbit
+                orderbook = self.http.call("upbit", pyupbit.get_orderbook, ticker=self.ticker)
 
             if not orderbook or len(orderbook) == 0:
                 return None
@@ -206,10 +407,13 @@ class EnhancedCryptoDataCollector:
                 bid_prices.append(unit["bid_price"])
                 bid_sizes.append(unit["bid_size"])
             
-            print("\n=== Orderbook Data ===")
-            print(f"Timestamp: {datetime.fromtimestamp(orderbook['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"ask_prices: {ask_prices}")
-            print(f"bid_prices: {bid_prices}")
+            # 전체 호가 단계를 링 버퍼에 쌓아 미시구조 지표 계산 (같은 스냅샷은 한 번만 저장)
+            self.orderbook_ring.push(orderbook)
+            microstructure = self.orderbook_ring.features()
+
+            log.debug("Orderbook", ticker=self.ticker, ask_prices=ask_prices, bid_prices=bid_prices)
+            log.info("Orderbook microstructure", ticker=self.ticker, imbalance=f"{microstructure['imbalance']:.3f}",
+                     ofi=f"{microstructure['order_flow_imbalance']:.4f}")
 
             return {
                 "timestamp": datetime.fromtimestamp(
@@ -221,212 +425,455 @@ class EnhancedCryptoDataCollector:
                 "ask_sizes": ask_sizes,
                 "bid_prices": bid_prices,
                 "bid_sizes": bid_sizes,
+                "microstructure": microstructure,
             }
 
         except Exception as e:
-            print(f"Error getting orderbook data: {e}")
+            log.error("Error getting orderbook data", ticker=self.ticker, error=repr(e))
             return None
 
+    """마감된 일봉 (다음 일봉 마감인 UTC 자정까지 캐시)"""
+    def get_daily_data(self):
+        return self.cache.get_or_fetch("daily_closed", self._fetch_daily_data, key=self.ticker)
+
+    def _fetch_daily_data(self):
+        # 일봉 데이터 (로컬 캔들 저장소에서 새 캔들만 받아옴). 진행 중인 오늘 일봉은 빼고
+        # 캐시 파일에 저장할 수 있도록 컬럼별 리스트로 변환
+        from candle_store import CANDLE_FIELDS
+
+        daily_data = self.candle_store.get_ohlcv(self.ticker, interval="day", count=DAILY_LOOKBACK)
+        if daily_data is None:
+            return None
+        closed = daily_data[daily_data.index < daily_candle_start()]
+        payload = {"date": closed.index.strftime("%Y-%m-%dT%H:%M:%S").tolist()}
+        payload.update((field, closed[field].tolist()) for field in CANDLE_FIELDS)
+        return payload
+
+    def _daily_frame(self, hourly_data):
+        """캐시한 마감 일봉 뒤에 시간봉으로 만든 오늘(진행 중) 일봉을 붙인 DataFrame"""
+        import pandas as pd
+        from candle_store import CANDLE_FIELDS
+
+        closed = self.get_daily_data()
+        if closed is None:
+            raise ValueError("No daily candles")
+        frame = pd.DataFrame({field: closed[field] for field in CANDLE_FIELDS},
+                             index=pd.DatetimeIndex(closed["date"]), dtype=float)
+
+        start = daily_candle_start()
+        today = hourly_data[hourly_data.index >= start]
+        if len(today):
+            frame.loc[start] = [
+                today["open"].iloc[0], today["high"].max(), today["low"].min(), today["close"].iloc[-1],
+                today["volume"].sum(), today["value"].sum(),
+            ]
+        return frame.iloc[-DAILY_LOOKBACK:]
+
     """차트 데이터 수집"""
     def get_ohlcv_data(self):
         try:
-            # 30일 일봉 데이터
-            daily_data = pyupbit.get_ohlcv(self.ticker, interval="day", count=30)
-            daily_data = self.add_technical_indicators(daily_data)
-
-            # 24시간 봉 데이터
-            hourly_data = pyupbit.get_ohlcv(self.ticker, interval="minute60", count=24)
-            hour_data = self.add_technical_indicators(hourly_data)
-
-            # DataFrame을 dict로 변환시 datetiem index 처리
-            daily_data_dict = []
-            for index, row in daily_data.iterrows():
-                day_data = row.to_dict()
-                day_data["date"] = index.strftime("%Y-%m-%d")
-                daily_data_dict.append(day_data)
-
-            hourly_data_dict = []
-            for index, row in hourly_data.iterrows():
-                hour_data = row.to_dict()
-                hour_data["date"] = index.strftime("%Y-%m-%d %H:%M:%S")
-                hourly_data_dict.append(hour_data)
-
-            # 최신 기술적 지표 출력
-            print ("\n=== Latest Technical Indicators ===")
-            print (f"RSI: {daily_data['rsi'].iloc[-1]:.2f}")
-            print (f"MACD: {daily_data['macd'].iloc[-1]:.2f}")
-            print (f"BB Position: {daily_data['bb_pband'].iloc[-1]:.2f}")
+            # 시간봉 데이터
+            hourly_data = self.candle_store.get_ohlcv(self.ticker, interval="minute60", count=HOURLY_LOOKBACK)
+            hourly_data = self.add_technical_indicators(hourly_data, key=(self.ticker, "minute60"))
+
+            # 일봉 지표는 매 사이클 갱신 (마감 일봉은 그대로이므로 엔진이 마지막 일봉만 다시 계산)
+            daily_data = self.add_technical_indicators(self._daily_frame(hourly_data), key=(self.ticker, "day"))
+            log.info("Latest technical indicators", ticker=self.ticker, rsi=f"{daily_data['rsi'].iloc[-1]:.2f}",
+                     macd=f"{daily_data['macd'].iloc[-1]:.2f}", bb_position=f"{daily_data['bb_pband'].iloc[-1]:.2f}")
 
             return {
-                "daily_data": daily_data_dict[-7],  # 최근 7일 데이터
-                "hourly_data": hourly_data_dict[-6],  # 최근 6시간 데이터
+                # 필요한 최근 구간만 잘라 컬럼 단위로 변환
+                "daily_data": frame_to_payload(daily_data, DAILY_WINDOW, "%Y-%m-%d"),  # 최근 7일 데이터
+                "hourly_data": frame_to_payload(hourly_data, HOURLY_WINDOW, "%Y-%m-%d %H:%M:%S"),  # 최근 6시간 데이터
                 "latest_indicators": {
-                    "rsi": daily_data['rsi'].iloc[-1],
-                    "macd": daily_data['macd'].iloc[-1],
-                    "macd_signal": daily_data['macd_signal'].iloc[-1],
-                    "bb_position": daily_data['bb_pband'].iloc[-1]
-                }
+                    "rsi": float(daily_data['rsi'].iloc[-1]),
+                    "macd": float(daily_data['macd'].iloc[-1]),
+                    "macd_signal": float(daily_data['macd_signal'].iloc[-1]),
+                    "bb_position": float(daily_data['bb_pband'].iloc[-1])
+                },
             }
 
         except Exception as e:
-            print(f"Error getting OHLCV data: {e}")
+            log.error("Error getting OHLCV data", ticker=self.ticker, error=repr(e))
             return None
         
-    def get_ai_analysis(self, analysis_data):
-        """AI 분석 및 매매 신호 생성"""
+    def gather_analysis_data(self, timeouts=None, shared=None):
+        """AI 분석용 데이터 동시 수집
+
+        독립적인 조회를 한 번에 실행하고 소스별 제한 시간을 적용한다.
+        제한 시간을 넘기거나 실패한 소스는 None으로 채운 analysis_data를 반환한다.
+        shared에 이미 준비된 소스(예: 여러 티커가 공유하는 공포탐욕지수, 뉴스)는 다시 조회하지 않는다.
+        """
+        timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+        shared = shared or {}
+        sources = {
+            "current_status": self.get_current_status,
+            "orderbook_data": self.get_orderbook_data,
+            "ohlcv": self.get_ohlcv_data,
+            "fear_greed": self.get_fear_greed_index,
+            "news": self.get_crypto_news,
+        }
+
+        start = time.monotonic()
+        results = dict(shared)
+        futures = {}
+        for name, fetch in sources.items():
+            if name in shared:
+                continue
+            previous = self._inflight.get(name)
+            if previous is not None and not previous.done():
+                # 이전 사이클에서 제한 시간을 넘긴 조회가 아직 지표 엔진/캔들 저장소를 갱신 중이므로
+                # 같은 상태를 동시에 건드리지 않도록 이번 사이클은 건너뜀
+                METRICS.inc("fetch_skipped_total", source=name)
+                log.warning("Previous fetch still running, skipping source", ticker=self.ticker, source=name)
+                results[name] = None
+                continue
+            # 소스별 조회 시간과 실패(None 반환 포함)를 fetch 단계 지표로 기록
+            futures[name] = self._inflight[name] = self.executor.submit(METRICS.timed("fetch", source=name)(fetch))
+
+        for name, future in futures.items():
+            # 모든 요청이 동시에 시작되었으므로 마감 시각은 시작 시각 기준
+            remaining = max(0.0, start + timeouts[name] - time.monotonic())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                METRICS.inc("fetch_timeouts_total", source=name)
+                log.warning("Timeout collecting source", ticker=self.ticker, source=name, timeout=timeouts[name])
+                results[name] = None
+            except Exception as e:
+                log.error("Error collecting source", ticker=self.ticker, source=name, error=repr(e))
+                results[name] = None
+
+        # 캐시에서 재사용한 입력이 얼마나 오래된 것인지 기록 (초)
+        results["data_age"] = {
+            "fear_greed": self.cache.age("fear_greed", 7),
+            "news": self.cache.age("news"),
+        }
+
+        elapsed = time.monotonic() - start
+        METRICS.observe("stage_duration_seconds", elapsed, stage="gather")
+        log.info("Data collected", ticker=self.ticker, seconds=f"{elapsed:.2f}")
+        return results
+
+    def get_ai_analysis(self, analysis_data, on_decision=None):
+        """AI 분석 및 매매 신호 생성
+
+        스트리밍 응답에서 decision/risk_level/confidence_score가 먼저 완성되면 reason을 받는
+        중에 on_decision(Decision)을 호출해 매매를 먼저 진행할 수 있다.
+        DecisionCache에서 재사용한 결정이면 last_analysis["cached"]가 True이고, 새 매매 신호가 아니다.
+        """
         try:
+            self.last_analysis = None
             # 데이터 최적화
-            optimized_data = {
-                "current_status" : analysis_data["current_status"],
-                "orderbook_data" : {
-                    "timestamp": analysis_data["orderbook_data"]["timestamp"],
-                    "total_ask_size": analysis_data["orderbook_data"]["total_ask_size"],
-                    "total_bid_size": analysis_data["orderbook_data"]["total_bid_size"],
-                    "ask_prices": analysis_data["orderbook_data"]["ask_prices"][:3],  # 상위 3개 호가만 사용
-                    "bid_prices": analysis_data["orderbook_data"]["bid_prices"][:3],  # 상위 3개 호가만 사용
+            optimized_data = optimize_analysis_data(analysis_data)
+
+            # 시장 상황이 이전 호출과 사실상 같으면 이전 결정 재사용
+            fp = fingerprint(self.ticker, optimized_data)
+            cached = self.decision_cache.lookup(fp)
+            METRICS.inc("decision_cache_total", result="miss" if cached is None else "hit")
+            self.last_analysis = {"snapshot": optimized_data, "fingerprint": fp, "cached": cached is not None}
+            if cached is not None:
+                log.info("입력 데이터 변화가 없어 이전 AI 결정을 재사용합니다.", ticker=self.ticker,
+                         hit_rate=f"{self.decision_cache.stats()['hit_rate']:.0%}")
+                return cached
+
+            with METRICS.stage("prompt_build"):
+                prompt, report = self.prompt_encoder.encode(optimized_data)
+            METRICS.inc("llm_prompt_tokens_total", report["user"])
+            self.last_analysis.update(prompt=prompt, prompt_tokens=report["user"])
+            log.info("Prompt tokens", ticker=self.ticker, system=report["system"], user=report["user"],
+                     budget=report["budget"], reduced=report["reduced"] or None)
+            log.debug("Prompt section tokens", ticker=self.ticker, **report["sections"])
+
+            messages = [
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
                 },
-                "ohlcv_data": analysis_data["ohlcv"],
-                "fear_greed" : analysis_data["fear_greed"]
-            }
-
-            
-
-            promt = """당신은 비트코인 투자 전문가입니다. 제공된 데이터를 분석하여 매매 결정을 내려주세요. :
-                        분석 기준:
-                        1. 현재 보유 현황 (현금/코인 보유량...)
-                        2. 차트 / 기술적 지표 (RSI, MACD, 볼린저밴드..)
-                        3. 호가창 정보 (매수/매도 세력...)
-                        4. 공포 탐욕 지수 (Fear & Greed Index)
-                        5. 비트코인 관련 최신 뉴스
-
-                        Please consider the fiolloing key points:
-                        - Fear & greed Index below 20 (Extreme Fear) may present buying opportunitiese.
-                        - Fear & Greed Index above 80 (Extreme Greed) may present selling opportunities.
-                        - The trend of the Fear & Greeed Index is also a crucial inidicator.
-
-                        응답은 반드시 아래 JSON 형식으로만 제공하고, 모든 텍스트는 한글로 작성해주세요:
-                        {
-                            "decision": "buy/sell/hold",
-                            "reason": "상세한 분석 근거를 한글로 설명",
-                            "risk_level": "low/medium/high",
-                            "confidence_score": 0-100
-                        }"""
-        
-            response = self.client.chat.completions.create(
-                model="gpt-4.1",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": promt
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Market data for analysis: {json.dumps(optimized_data, ensure_ascii=False)}"
-                    }
-                ]
-            )
-
-            result_text = response.choices[0].message.content.strip()
-            print(f"\n=== Raw AI Response ===\n{result_text}\n")
-
-            #응답에서 JSON 부분만 추출
-            try:
-                result = json.loads(result_text)
-            except json.JSONDecodeError:
-                import re
-                json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group()
-                    result = json.loads(json_str)
-                else:
-                    raise Exception("Failed to parse AI response")
-            except json.JSONDecodeError:
-                    # 3단계: 유니코드 이스케이프 처리
-                    try:
-                        json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                        if json_match:
-                            json_str = json_match.group()
-                            # 유니코드 이스케이프 디코딩 시도
-                            decoded_str = codecs.decode(json_str, 'unicode_escape')
-                            result = json.loads(decoded_str)
-                        else:
-                            raise Exception("JSON 형식을 찾을 수 없습니다")
-                    except Exception as e:
-                        print(f"모든 파싱 방법 실패: {e}")
-                        raise Exception("AI 응답 파싱에 실패했습니다")
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+
+            # 형식이 잘못된 응답은 다음 사이클까지 기다리지 않고 그 자리에서 한 번만 다시 요청
+            for attempt in range(2):
+                with METRICS.stage("llm_call", stream=str(self.stream_responses).lower()):
+                    result_text, parse = self._request_decision(messages, on_decision)
+                self.last_analysis["response"] = result_text
+                try:
+                    with METRICS.stage("parse"):
+                        result = parse()
+                    break
+                except DecisionParseError as e:
+                    log.warning("Invalid AI response", ticker=self.ticker, error=str(e), attempt=attempt + 1,
+                                **self.decision_parser.stats())
+                    if attempt:
+                        return None
+                    messages += [
+                        {"role": "assistant", "content": result_text},
+                        {"role": "user", "content": RETRY_MESSAGE},
+                    ]
+
+            self.decision_cache.store(fp, result)
             return result
         except Exception as e:
-            print(f"Error in get_ai_analysis: {e}")
+            log.exception("Error in get_ai_analysis", ticker=self.ticker, error=repr(e))
             return None
     
-    def execute_trade(self, decision, confidence_score, feat_greed_value):
-        """AI 결정에 따라 거래 실행"""
+    def _request_decision(self, messages, on_decision=None):
+        """LLM 호출 1회. (응답 문자열, 검증된 Decision을 반환하는 함수) 반환"""
+        start = time.monotonic()
+        if not self.stream_responses:
+            response = self.client.chat.completions.create(
+                model="gpt-4.1",
+                messages=messages,
+                response_format=RESPONSE_FORMAT,
+            )
+            result_text = (response.choices[0].message.content or "").strip()
+            self.last_llm_timing = {"complete": time.monotonic() - start}
+            self._record_llm_timing()
+            log.debug("Raw AI response", ticker=self.ticker, text=result_text)
+            return result_text, lambda: self.decision_parser.parse(result_text)
+
+        stream = self.client.chat.completions.create(
+            model="gpt-4.1",
+            messages=messages,
+            response_format=RESPONSE_FORMAT,
+            stream=True,
+        )
+        parser = StreamingDecisionParser(self.decision_parser)
+        timing = {}
         try:
-            if decision == "buy":
-                print("매수합니다.")
-                # TODO : 여기에 매수 로직 추가
-            
-            elif decision == "sell":
-                print("매도합니다.")
-                # TODO : 여기에 매도 로직 추가
-                # current_price = pyupbit.get_current_price(self.ticker)  # 현재가 조회
-                # sell_amount = (krw_amount / current_price) * 0.9995  # 수수료 0.05% 반영, 매도수량
-                # res = self.upbit.sell_market_order(self.ticker, btc_amount)
-                # print("매도 시도 " + res)
-            else:
-                print("hold 합니다.")
-                # TODO : 여기에 매도/매수 하지 않는 로직 추가
-
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                timing.setdefault("first_token", time.monotonic() - start)
+                if parser.early is not None:
+                    parser.feed(delta)  # 매매는 이미 진행됐으므로 나머지(근거)는 모으기만 함
+                    continue
+
+                early = parser.feed(delta)
+                if early is not None:
+                    timing["decision"] = time.monotonic() - start
+                    log.info("Early AI decision", ticker=self.ticker, decision=early.decision,
+                             risk_level=early.risk_level, confidence=early.confidence_score,
+                             seconds=f"{timing['decision']:.2f}")
+                    if on_decision is not None:
+                        on_decision(early)
+                        timing["order"] = time.monotonic() - start
         except Exception as e:
-            print(f"Error in execute_trade: {e}")
-
-
-def ai_trading():
-    try:
-        trader = EnhancedCryptoDataCollector("KRW-BTC")  # 원하는 암호화폐 티커로 초기화 (예: "KRW-BTC")
-
-        # 1. 현재 투자 상태 조회
-        current_status = trader.get_current_status()
-
-        #2 . 호가 데이터 조회
-        orderbook_data = trader.get_orderbook_data()
+            if "order" not in timing:
+                raise
+            # 조기 결정으로 이미 매매했으므로 재시도(다른 결정이 나올 수 있음) 대신 그 결정을 결과로 사용
+            log.warning("AI stream failed after the early decision, keeping it", ticker=self.ticker, error=repr(e))
+            METRICS.inc("llm_stream_errors_total", phase="reason")
+            self.last_llm_timing = dict(timing, complete=time.monotonic() - start)
+            self._record_llm_timing()
+            return parser.text.strip(), lambda: parser.early
+        timing["complete"] = time.monotonic() - start
+        self.last_llm_timing = timing
+        self._record_llm_timing()
+
+        result_text = parser.text.strip()
+        log.debug("Raw AI response", ticker=self.ticker, text=result_text)
+
+        def parse():
+            try:
+                return parser.finish()
+            except DecisionParseError as e:
+                if parser.early is None:
+                    raise
+                # 조기 결정으로 이미 매매했으므로 근거가 깨진 경우에도 그 결정을 결과로 사용
+                log.warning("AI reason incomplete, keeping the early decision", ticker=self.ticker, error=str(e))
+                return parser.early
+
+        return result_text, parse
+
+    def journal_cycle(self, analysis_data, result, order_uuid=None):
+        """사이클 입력 스냅샷/AI 응답/결정을 저널 대기열에 추가 (파일 쓰기는 저널의 기록 스레드에서)"""
+        if self.journal is None or self.last_analysis is None:
+            return
+        analysis = self.last_analysis
+        status = analysis_data["current_status"] or {}
+        fear_greed = analysis_data.get("fear_greed")
+        self.journal.record({
+            "ts": datetime.now(timezone.utc),
+            "ticker": self.ticker,
+            "decision": result.decision if result else None,
+            "risk_level": result.risk_level if result else None,
+            "confidence_score": result.confidence_score if result else None,
+            "reason": result.reason if result else None,
+            "cached": analysis["cached"],
+            "fingerprint": analysis["fingerprint"],
+            "order_uuid": order_uuid,
+            "price": status.get("current_price"),
+            "krw_balance": status.get("krw_balance"),
+            "crypto_balance": status.get("crypto_balance"),
+            "fear_greed": fear_greed["current"]["value"] if fear_greed else None,
+            "prompt_tokens": analysis.get("prompt_tokens"),
+            "llm_seconds": (self.last_llm_timing or {}).get("complete") if not analysis["cached"] else None,
+            "prompt": analysis.get("prompt"),
+            "response": analysis.get("response"),
+            "snapshot": analysis["snapshot"],
+        })
+
+    def _record_llm_timing(self):
+        timing = self.last_llm_timing
+        for phase, seconds in timing.items():
+            METRICS.observe("llm_latency_seconds", seconds, phase=phase)
+        log.info("LLM latency", ticker=self.ticker, **{phase: f"{seconds:.2f}s" for phase, seconds in timing.items()})
+
+    def execute_trade(self, decision, confidence_score, fear_greed_value, current_price=None):
+        """AI 결정에 따라 시장가 주문 제출 (체결은 백그라운드에서 추적). 주문 uuid 반환"""
+        with METRICS.stage("execute", decision=decision) as timer:
+            order_uuid = self._execute_trade(decision, confidence_score, fear_greed_value, current_price)
+            if order_uuid is None and decision in ("buy", "sell"):
+                timer.fail()
+            return order_uuid
+
+    def _execute_trade(self, decision, confidence_score, fear_greed_value, current_price):
+        try:
+            if decision not in ("buy", "sell"):
+                log.info("hold 합니다.", ticker=self.ticker)
+                return None
 
-        # 3. 차트 데이터 수집
-        ohlcv_data = trader.get_ohlcv_data()
+            if current_price is None:
+                current_price = self._current_price(self.ticker)
+
+            def sizer(balances):
+                # 주문 실행기를 공유하는 다른 티커의 주문과 겹치지 않도록 실행기 안에서 잔고를 읽고 크기를 정함
+                krw_balance, crypto_balance, _ = parse_balances(balances, self.ticker)
+                order = size_order(decision, confidence_score, fear_greed_value, krw_balance, crypto_balance,
+                                   float(current_price))
+                if order is None:
+                    log.info(f"{decision} 결정이지만 주문 금액이 최소 주문 금액({MIN_ORDER_KRW:,} KRW) 미만이라 주문하지 않습니다.",
+                             ticker=self.ticker)
+                    return None
 
-        #4. 공포 탐욕지수 데이터 조회
-        fear_greed_data = trader.get_fear_greed_index()
+                side, amount = order
+                mode = "LIVE" if self.order_executor.live else "PAPER"
+                if side == "buy":
+                    log.info("매수합니다.", ticker=self.ticker, mode=mode, krw=f"{amount:,.0f}")
+                else:
+                    log.info("매도합니다.", ticker=self.ticker, mode=mode, volume=f"{amount:.8f}")
+                return order
 
-        #5 비트코인 관련 최신 뉴스 조회
-        news_data = trader.get_crypto_news()
+            return self.order_executor.submit_sized(self.ticker, sizer)
 
-        #6. AI 분석을 위한 데이터 준비
-        if all([current_status, orderbook_data, ohlcv_data]):
-            analysis_data = {
-                "current_status": current_status,
-                "orderbook_data": orderbook_data,
-                "ohlcv": ohlcv_data,
-                "fear_greed": fear_greed_data
-            }
+        except Exception as e:
+            log.exception("Error in execute_trade", ticker=self.ticker, error=repr(e))
+            return None
 
-            #7. AI 분석 실행
-            ai_result = trader.get_ai_analysis(analysis_data)
-            if ai_result:
-                print("\n=== AI Analysis Result ===")
-                print(json.dumps(ai_result, indent=2))
 
-                # 8. 매매 실행
-                trader.execute_trade(ai_result["decision"], ai_result["confidence_score"], fear_greed_data["current"]["value"])
+@METRICS.timed("cycle")
+def run_trading_cycle(trader, shared=None, deadline=None):
+    """데이터 수집 → AI 분석 → 매매 실행까지 한 사이클 수행
+
+    deadline(time.time() 기준)까지 데이터 수집이 끝나지 않으면 오래된 데이터로
+    매매하지 않도록 해당 사이클을 건너뛴다.
+    """
+    # 1~6. 투자 상태, 호가, 차트, 공포 탐욕지수, 뉴스를 동시에 조회해 AI 분석용 데이터 구성
+    analysis_data = trader.gather_analysis_data(shared=shared)
+    fear_greed_data = analysis_data["fear_greed"]
+
+    if deadline is not None and time.time() > deadline:
+        METRICS.inc("cycles_skipped_total", reason="deadline")
+        log.warning("Data fetch overran the deadline, skipping this cycle", ticker=trader.ticker)
+        return None
+
+    if all([analysis_data["current_status"], analysis_data["orderbook_data"], analysis_data["ohlcv"]]):
+        fear_greed_value = fear_greed_data["current"]["value"] if fear_greed_data else None
+        executed = []
+
+        def execute(decision):
+            # 8. 매매 실행 (주문 uuid 보관)
+            executed.append(trader.execute_trade(
+                decision.decision, decision.confidence_score, fear_greed_value,
+                analysis_data["current_status"]["current_price"],
+            ))
+
+        #7. AI 분석 실행 (스트리밍이면 결정 필드가 도착하는 즉시 execute 호출)
+        ai_result = trader.get_ai_analysis(analysis_data, on_decision=execute)
+        if ai_result:
+            log.info("AI analysis result", ticker=trader.ticker, decision=ai_result.decision,
+                     risk_level=ai_result.risk_level, confidence=ai_result.confidence_score)
+            log.info("AI reason", ticker=trader.ticker, reason=ai_result.reason)
+            if trader.last_analysis["cached"]:
+                # 재사용한 결정은 이미 매매에 반영됐으므로 새 신호로 보지 않음 (같은 주문 반복 방지)
+                log.info("이전 AI 결정을 재사용했으므로 새 주문을 내지 않습니다.", ticker=trader.ticker)
+            elif not executed:
+                execute(ai_result)
+        # 9. 입력/응답/결정 기록
+        trader.journal_cycle(analysis_data, ai_result, executed[0] if executed else None)
+        return ai_result
+    return None
+
+
+def ai_trading(trader=None, deadline=None, metrics_file=None):
+    try:
+        if trader is None:
+            trader = EnhancedCryptoDataCollector("KRW-BTC")  # 원하는 암호화폐 티커로 초기화 (예: "KRW-BTC")
+        run_trading_cycle(trader, deadline=deadline)
     except Exception as e:
-        print(f"Error in ai_trading: {e}")
+        log.exception("Error in ai_trading", error=repr(e))
+    finally:
+        export_cycle_metrics(metrics_file)
             
 if __name__ == "__main__":
-    print("Starting Enhancesd Bitcoin Trading Bot with Fear & Greed Index...")
-    print("Press Ctrl+C to stop")
+    STARTUP.mark("imports")
+    parser = argparse.ArgumentParser(description="Bitcoin AI trading bot")
+    parser.add_argument("--ticker", default="KRW-BTC")
+    parser.add_argument("--stream", action="store_true", help="현재가/호가를 웹소켓으로 실시간 구독")
+    parser.add_argument("--status", action="store_true",
+                        help="실제 계정의 현재 투자 상태만 조회하고 종료 (LLM/지표 모듈을 불러오지 않음)")
+    parser.add_argument("--dry-run", action="store_true", help="설정과 시작 시간만 확인하고 종료 (네트워크 호출 없음)")
+    add_schedule_arguments(parser)
+    add_observability_arguments(parser)
+    args = parser.parse_args()
+    setup_observability(args)
+
+    if args.dry_run or args.status:
+        # 클라이언트는 필요할 때 만들어지므로 여기서는 OpenAI/지표 모듈을 불러오지 않음
+        trader = EnhancedCryptoDataCollector(args.ticker)
+        STARTUP.mark("collector")
+        if args.dry_run:
+            log.info("Dry run", **trader.settings())
+        else:
+            # 모의 매매 중이어도 --status는 항상 실제 업비트 계정 잔고를 보여줌
+            trader.get_current_status(balances=trader.http.call("upbit", trader.upbit.get_balances))
+            STARTUP.mark("status")
+        STARTUP.log()
+        raise SystemExit(0)
+
+    log.info("Starting Enhanced Bitcoin Trading Bot with Fear & Greed Index (Ctrl+C to stop)", ticker=args.ticker)
 
     try:
-        ai_trading()
+        feed = None
+        if args.stream:
+            from market_feed import MarketFeed
+            feed = MarketFeed([args.ticker]).start()
+            if not feed.wait_ready(timeout=10):
+                log.warning("Market feed not ready, falling back to REST until it catches up")
+
+        # collector(클라이언트, 캔들 저장소, 지표 엔진)를 사이클 간 재사용
+        trader = EnhancedCryptoDataCollector(args.ticker, feed=feed)
+        STARTUP.mark("collector")
+        if args.schedule:
+            scheduler = scheduler_from_args(args)
+            STARTUP.log()
+            log.info("Running on schedule", interval=f"{scheduler.interval:.0f}s", offset=f"{scheduler.offset:.0f}s")
+            scheduler.run(lambda deadline: ai_trading(trader, deadline, args.metrics_file))
+        else:
+            ai_trading(trader, metrics_file=args.metrics_file)
+            STARTUP.mark("first_cycle")
+            STARTUP.log()
+            # 한 번만 실행할 때는 제출한 주문의 체결 결과를 확인하고 종료
+            if not trader.order_executor.wait_idle(timeout=30):
+                log.warning("Orders still pending", orders=trader.order_executor.pending())
     except KeyboardInterrupt:
-        print("\nTrading bot stopped by user.")
+        log.info("Trading bot stopped by user.")
     except Exception as e:
-        print(f"Error in main execution: {e}")
\ No newline at end of file
+        log.exception("Error in main execution", error=repr(e))
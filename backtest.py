@@ -0,0 +1,334 @@
+import argparse
+import json
+import math
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from candle_store import CandleStore, KST_OFFSET
+from execution import FEE_RATE, size_order
+from indicators import IndicatorEngine, INDICATOR_COLUMNS, MACD_SLOW, MACD_SIGN
+
+WARMUP_BARS = MACD_SLOW + MACD_SIGN  # MACD 시그널이 나올 때까지는 판단하지 않음
+
+
+def fear_greed_label(value):
+    """alternative.me 분류 기준"""
+    if value <= 24:
+        return "Extreme Fear"
+    if value <= 46:
+        return "Fear"
+    if value <= 54:
+        return "Neutral"
+    if value <= 75:
+        return "Greed"
+    return "Extreme Greed"
+
+
+def load_fear_greed_history(path):
+    """alternative.me 응답 형식(JSON, ?limit=0) 파일을 KST 날짜 인덱스 Series로 변환"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    items = data["data"] if isinstance(data, dict) else data
+    return pd.Series(
+        [int(item["value"]) for item in items],
+        index=pd.to_datetime([int(item["timestamp"]) for item in items], unit="s") + KST_OFFSET,
+    ).sort_index()
+
+
+class RuleBasedDecider:
+    """프롬프트의 판단 기준(공포탐욕지수, RSI, 볼린저밴드)을 규칙으로 옮긴 결정기"""
+
+    def __init__(self, fear_buy=20, greed_sell=80, rsi_buy=30, rsi_sell=70):
+        self.fear_buy = fear_buy
+        self.greed_sell = greed_sell
+        self.rsi_buy = rsi_buy
+        self.rsi_sell = rsi_sell
+
+    def decide(self, snapshot):
+        indicators = snapshot["indicators"]
+        rsi = indicators["rsi"]
+        bb_position = indicators["bb_pband"]
+        fear_greed = snapshot["fear_greed"]
+
+        buy_signals = sum([
+            fear_greed is not None and fear_greed < self.fear_buy,
+            rsi < self.rsi_buy,
+            bb_position < 0,
+        ])
+        sell_signals = sum([
+            fear_greed is not None and fear_greed > self.greed_sell,
+            rsi > self.rsi_sell,
+            bb_position > 1,
+        ])
+
+        if buy_signals > sell_signals:
+            return {"decision": "buy", "confidence_score": 40 + 20 * buy_signals}
+        if sell_signals > buy_signals:
+            return {"decision": "sell", "confidence_score": 40 + 20 * sell_signals}
+        return {"decision": "hold", "confidence_score": 50}
+
+
+class RecordedDecider:
+    """기록된 결정({"timestamp": ..., "decision": ..., "confidence_score": ...})을 재생
+
+    각 캔들에서는 그 시각 이전의 가장 최근 결정을 한 번만 사용하고, 없으면 hold.
+    """
+
+    def __init__(self, records):
+        records = list(records)
+        records.sort(key=lambda record: pd.Timestamp(record["timestamp"]))
+        self._times = np.array([pd.Timestamp(record["timestamp"]) for record in records], dtype="datetime64[ns]")
+        self._records = records
+        self._used = -1
+
+    @classmethod
+    def from_file(cls, path):
+        """JSONL 파일에서 읽음"""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.loads(line) for line in f if line.strip())
+
+    @classmethod
+    def from_journal(cls, journal, ticker, start=None, end=None):
+        """DecisionJournal에 기록된 실거래 결정을 캔들과 같은 KST 시각으로 읽음"""
+        frame = journal.query(start, end, ticker, columns=["ts", "decision", "confidence_score"])
+        frame = frame[frame["decision"].notna()]
+        return cls({
+            "timestamp": ts.tz_convert(None) + KST_OFFSET,
+            "decision": decision,
+            "confidence_score": int(confidence_score),
+        } for ts, decision, confidence_score in zip(frame["ts"], frame["decision"], frame["confidence_score"]))
+
+    def decide(self, snapshot):
+        i = int(np.searchsorted(self._times, snapshot["timestamp"], side="right")) - 1
+        if i < 0 or i == self._used:
+            return {"decision": "hold", "confidence_score": 0}
+        self._used = i
+        return self._records[i]
+
+
+class LLMDecider:
+    """실시간과 같은 AI 분석(get_ai_analysis)을 결정기로 사용 (네트워크 필요)"""
+
+    def __init__(self, collector):
+        self.collector = collector
+
+    def decide(self, snapshot):
+        indicators = snapshot["indicators"]
+        status = snapshot["status"]
+        orderbook = snapshot["orderbook"] or {}
+        analysis_data = {
+            "current_status": status,
+            "orderbook_data": {
+                "timestamp": pd.Timestamp(snapshot["timestamp"]).strftime("%Y-%m-%d %H:%M:%S"),
+                "total_ask_size": orderbook.get("total_ask_size", 0.0),
+                "total_bid_size": orderbook.get("total_bid_size", 0.0),
+                "ask_prices": orderbook.get("ask_prices", [snapshot["price"]]),
+                "bid_prices": orderbook.get("bid_prices", [snapshot["price"]]),
+            },
+            "ohlcv": {
+                "latest_indicators": {
+                    "rsi": indicators["rsi"],
+                    "macd": indicators["macd"],
+                    "macd_signal": indicators["macd_signal"],
+                    "bb_position": indicators["bb_pband"],
+                },
+            },
+            "fear_greed": None if snapshot["fear_greed"] is None else {
+                "current": {
+                    "value": snapshot["fear_greed"],
+                    "classification": fear_greed_label(snapshot["fear_greed"]),
+                },
+            },
+        }
+        result = self.collector.get_ai_analysis(analysis_data)
+        if result is None or self.collector.last_analysis["cached"]:
+            # 재사용한 결정은 실시간과 마찬가지로 새 주문으로 보지 않음
+            return {"decision": "hold", "confidence_score": 0}
+        return result.to_dict()
+
+
+class BacktestResult:
+    def __init__(self, index, equity, trades, fees, initial_krw, elapsed):
+        self.index = index
+        self.equity = equity
+        self.trades = trades
+        self.fees = fees
+        self.initial_krw = initial_krw
+        self.elapsed = elapsed
+
+    def summary(self):
+        equity = self.equity
+        peak = np.maximum.accumulate(equity)
+        drawdown = equity / peak - 1
+        returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.empty(0)
+        closed = [trade for trade in self.trades if trade["side"] == "sell"]
+        wins = [trade for trade in closed if trade["pnl"] > 0]
+
+        return {
+            "bars": len(equity),
+            "start": str(self.index[0]) if len(self.index) else None,
+            "end": str(self.index[-1]) if len(self.index) else None,
+            "final_equity": float(equity[-1]) if len(equity) else self.initial_krw,
+            "pnl": float(equity[-1] - self.initial_krw) if len(equity) else 0.0,
+            "total_return": float(equity[-1] / self.initial_krw - 1) if len(equity) else 0.0,
+            "max_drawdown": float(drawdown.min()) if len(equity) else 0.0,
+            "trades": len(self.trades),
+            "buys": len(self.trades) - len(closed),
+            "sells": len(closed),
+            "win_rate": len(wins) / len(closed) if closed else None,
+            "fees": self.fees,
+            "return_volatility": float(returns.std()) if len(returns) else 0.0,
+            "elapsed_seconds": self.elapsed,
+        }
+
+
+class Backtester:
+    """저장된 캔들을 한 봉씩 재생하며 지표 → 결정 → 체결을 시뮬레이션
+
+    지표는 실시간과 같은 IndicatorEngine으로 증분 계산하고, 체결은 해당 봉 종가에
+    수수료 0.05%를 반영해 처리한다. 주문 크기는 실거래와 같은 size_order()로
+    confidence_score와 공포탐욕지수에서 정한다.
+    """
+
+    def __init__(self, decider, initial_krw=1_000_000, fee_rate=FEE_RATE, decision_every=1, warmup=WARMUP_BARS):
+        self.decider = decider
+        self.initial_krw = initial_krw
+        self.fee_rate = fee_rate
+        self.decision_every = decision_every
+        self.warmup = warmup
+
+    @staticmethod
+    def _align(history, index):
+        """시계열을 캔들 시각에 맞춰 직전 값으로 채움"""
+        if history is None:
+            return None
+        return history.sort_index().reindex(index, method="ffill")
+
+    def run(self, candles, fear_greed=None, orderbooks=None):
+        """candles: OHLCV DataFrame, fear_greed: 값 Series, orderbooks: 시각 인덱스 DataFrame"""
+        start = time.perf_counter()
+        index = candles.index
+        times = index.to_numpy(dtype="datetime64[ns]")  # 봉마다 Timestamp 객체를 만들지 않도록 numpy 시각 사용
+        # 루프 안에서는 numpy 스칼라보다 빠른 파이썬 float 사용
+        high = candles["high"].to_numpy(dtype=float).tolist()
+        low = candles["low"].to_numpy(dtype=float).tolist()
+        close = candles["close"].to_numpy(dtype=float).tolist()
+
+        fear_greed_values = self._align(fear_greed, index)
+        fear_greed_values = None if fear_greed_values is None else fear_greed_values.to_numpy(dtype=float).tolist()
+        orderbook_rows = self._align(orderbooks, index)
+        orderbook_records = None if orderbook_rows is None else orderbook_rows.to_dict("records")
+
+        engine = IndicatorEngine()
+        krw = float(self.initial_krw)
+        coin = 0.0
+        cost_basis = 0.0  # 보유 수량의 수수료 포함 매수 원가
+        fees = 0.0
+        trades = []
+        equity = np.empty(len(close))
+
+        for i in range(len(close)):
+            values = engine.update(high[i], low[i], close[i])
+            price = close[i]
+
+            if i >= self.warmup and (i - self.warmup) % self.decision_every == 0:
+                fear_greed_value = None
+                if fear_greed_values is not None and not math.isnan(fear_greed_values[i]):
+                    fear_greed_value = int(fear_greed_values[i])
+                avg_buy_price = cost_basis / coin if coin > 0 else 0.0
+                snapshot = {
+                    "timestamp": times[i],
+                    "price": price,
+                    "indicators": dict(zip(INDICATOR_COLUMNS, values)),
+                    "fear_greed": fear_greed_value,
+                    "orderbook": orderbook_records[i] if orderbook_records is not None else None,
+                    "status": {
+                        "krw_balance": krw,
+                        "crypto_balance": coin,
+                        "avg_buy_price": avg_buy_price,
+                        "current_price": price,
+                        "total_value": krw + coin * price,
+                        "unrealized_profit": (price - avg_buy_price) * coin,
+                        "profit_percentage": (price / avg_buy_price - 1) * 100 if coin > 0 else 0,
+                    },
+                }
+                result = self.decider.decide(snapshot)
+                order = size_order(
+                    result["decision"], result.get("confidence_score", 0), fear_greed_value,
+                    krw, coin, price, fee_rate=self.fee_rate,
+                )
+
+                if order is not None and order[0] == "buy":
+                    # 업비트 시장가 매수처럼 주문 금액에 수수료가 더해짐
+                    spend = order[1]
+                    fee = spend * self.fee_rate
+                    qty = spend / price
+                    krw -= spend + fee
+                    coin += qty
+                    cost_basis += spend + fee
+                    fees += fee
+                    trades.append({"timestamp": times[i], "side": "buy", "price": price, "qty": qty, "pnl": 0.0})
+                elif order is not None:
+                    qty = order[1]
+                    proceeds = qty * price
+                    fee = proceeds * self.fee_rate
+                    cost = cost_basis * (qty / coin)
+                    krw += proceeds - fee
+                    coin -= qty
+                    cost_basis -= cost
+                    fees += fee
+                    trades.append({
+                        "timestamp": times[i], "side": "sell", "price": price, "qty": qty,
+                        "pnl": proceeds - fee - cost,
+                    })
+
+            equity[i] = krw + coin * price
+
+        return BacktestResult(index, equity, trades, fees, self.initial_krw, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline backtest on stored candles")
+    parser.add_argument("--ticker", default="KRW-BTC")
+    parser.add_argument("--interval", default="minute60")
+    parser.add_argument("--count", type=int, default=None, help="최근 캔들 수 (기본: 저장된 전체)")
+    parser.add_argument("--candle-dir", default=".candles")
+    parser.add_argument("--fear-greed", default=None, help="공포탐욕지수 이력 JSON 파일")
+    parser.add_argument("--orderbooks", default=None, help="호가 이력 CSV (timestamp 컬럼 포함)")
+    parser.add_argument("--decider", choices=["rule", "recorded", "llm"], default="rule")
+    parser.add_argument("--decisions", default=None, help="recorded 결정기용 JSONL 파일 또는 저널 디렉터리")
+    parser.add_argument("--initial-krw", type=float, default=1_000_000)
+    parser.add_argument("--decision-every", type=int, default=1, help="몇 봉마다 결정할지")
+    args = parser.parse_args()
+
+    candles = CandleStore(args.candle_dir).load(args.ticker, args.interval, args.count)
+    if candles is None:
+        raise SystemExit(f"No stored candles for {args.ticker} {args.interval} in {args.candle_dir}")
+
+    fear_greed = load_fear_greed_history(args.fear_greed) if args.fear_greed else None
+    orderbooks = None
+    if args.orderbooks:
+        orderbooks = pd.read_csv(args.orderbooks, parse_dates=["timestamp"]).set_index("timestamp")
+
+    if args.decider == "recorded":
+        if os.path.isdir(args.decisions):
+            from journal import DecisionJournal
+            decider = RecordedDecider.from_journal(DecisionJournal(args.decisions), args.ticker)
+        else:
+            decider = RecordedDecider.from_file(args.decisions)
+    elif args.decider == "llm":
+        from autotrade import EnhancedCryptoDataCollector
+        decider = LLMDecider(EnhancedCryptoDataCollector(args.ticker))
+    else:
+        decider = RuleBasedDecider()
+
+    result = Backtester(decider, args.initial_krw, decision_every=args.decision_every).run(
+        candles, fear_greed, orderbooks
+    )
+    print(f"\n=== Backtest {args.ticker} {args.interval} ({datetime.now():%Y-%m-%d %H:%M:%S}) ===")
+    for key, value in result.summary().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,584 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+import pyupbit
+from openai import OpenAI
+
+from autotrade import (
+    EnhancedCryptoDataCollector, ai_trading, frame_to_payload, optimize_analysis_data,
+    DAILY_LOOKBACK, DAILY_WINDOW, HOURLY_LOOKBACK, HOURLY_WINDOW,
+)
+from backtest import fear_greed_label
+from cache import TTLCache
+from candle_store import CandleStore, INTERVAL_DURATIONS, KST_OFFSET
+from decision_cache import DecisionCache
+from decision_parser import DecisionParser, StreamingDecisionParser
+from execution import MockExchange, OrderExecutor
+from fake_openai import FakeOpenAIServer
+from http_client import HttpClient
+from journal import DecisionJournal
+from observability import configure_logging
+from prompt_encoder import SYSTEM_PROMPT
+
+FIXTURE_DIR = "fixtures"
+BASELINE_PATH = "bench_baseline.json"
+FIXTURE_INTERVALS = ("minute60", "day")
+FIXTURE_CANDLES = 300           # 지표 계산(200개)과 증분 동기화에 충분한 캔들 수
+REGRESSION_THRESHOLD = 0.25     # 기준선 대비 p50이 이 비율 이상 느려지면 회귀
+STREAM_CHUNK = 4                # 스트리밍 파싱 벤치마크의 조각 크기 (FakeOpenAIServer 기본값과 같음)
+
+
+def load_fixtures(path=FIXTURE_DIR):
+    """fixtures 디렉터리의 기록 응답을 dict로 (ohlcv는 interval별 DataFrame)"""
+    def read_json(name):
+        with open(os.path.join(path, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    return {
+        "ohlcv": {
+            interval: pd.read_csv(os.path.join(path, f"ohlcv_{interval}.csv"), index_col=0, parse_dates=True)
+            for interval in FIXTURE_INTERVALS
+        },
+        "orderbook": read_json("orderbook.json"),
+        "fear_greed": read_json("fear_greed.json"),
+        "news": read_json("serpapi_news.json"),
+        "openai": read_json("openai_responses.json"),
+    }
+
+
+def save_fixtures(fixtures, path=FIXTURE_DIR):
+    os.makedirs(path, exist_ok=True)
+    for interval, frame in fixtures["ohlcv"].items():
+        frame.to_csv(os.path.join(path, f"ohlcv_{interval}.csv"), index_label="date")
+    for key, name in (("orderbook", "orderbook.json"), ("fear_greed", "fear_greed.json"),
+                      ("news", "serpapi_news.json"), ("openai", "openai_responses.json")):
+        with open(os.path.join(path, name), "w", encoding="utf-8") as f:
+            json.dump(fixtures[key], f, ensure_ascii=False, indent=1)
+            f.write("\n")
+
+
+def synthetic_ohlcv(interval, count=FIXTURE_CANDLES, seed=0, start_price=140_000_000):
+    """로그 정규 랜덤워크 캔들 (pyupbit.get_ohlcv 형식, KST 인덱스)"""
+    rng = np.random.default_rng(seed)
+    step = INTERVAL_DURATIONS[interval]
+    volatility = 0.02 if interval == "day" else 0.004
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, count)))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    wick = np.abs(rng.normal(0, volatility / 2, (2, count)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.gamma(2.0, 40.0 if interval == "day" else 2.0, count)
+
+    end = pd.Timestamp("2026-01-01 00:00:00") + KST_OFFSET
+    index = pd.DatetimeIndex([end - step * (count - 1 - i) for i in range(count)])
+    frame = pd.DataFrame({
+        "open": np.round(open_, -3),
+        "high": np.round(high, -3),
+        "low": np.round(low, -3),
+        "close": np.round(close, -3),
+        "volume": np.round(volume, 8),
+    }, index=index)
+    frame["value"] = np.round(frame["close"] * frame["volume"], 0)
+    return frame
+
+
+def synthetic_fixtures(seed=0):
+    """네트워크 없이 만드는 결정적인 픽스처 (--record로 실제 응답을 기록하기 전 기본값)"""
+    rng = np.random.default_rng(seed)
+    ohlcv = {interval: synthetic_ohlcv(interval, seed=seed + i) for i, interval in enumerate(FIXTURE_INTERVALS)}
+    price = float(ohlcv["minute60"]["close"].iloc[-1])
+
+    units = [{
+        "ask_price": price + 1000 * (i + 1),
+        "bid_price": price - 1000 * i,
+        "ask_size": round(float(rng.gamma(2.0, 0.05)), 8),
+        "bid_size": round(float(rng.gamma(2.0, 0.05)), 8),
+    } for i in range(15)]
+    orderbook = {
+        "market": "KRW-BTC",
+        "timestamp": 1767193200000,
+        "total_ask_size": round(sum(unit["ask_size"] for unit in units), 8),
+        "total_bid_size": round(sum(unit["bid_size"] for unit in units), 8),
+        "orderbook_units": units,
+        "level": 0,
+    }
+
+    day = 86400
+    values = [int(v) for v in rng.integers(20, 80, 7)]
+    fear_greed = {
+        "name": "Fear and Greed Index",
+        "data": [{
+            "value": str(value),
+            "value_classification": fear_greed_label(value),
+            "timestamp": str(1767225600 - i * day),
+        } for i, value in enumerate(values)],
+        "metadata": {"error": None},
+    }
+    fear_greed["data"][0]["time_until_update"] = "43200"
+
+    headlines = [
+        "Bitcoin holds range as ETF flows slow",
+        "Crypto traders eye Fed minutes for direction",
+        "Spot bitcoin volumes climb on Asian exchanges",
+        "Analysts split on bitcoin's next move after halving cycle",
+        "Stablecoin supply hits new high",
+        "Miners increase exchange deposits",
+        "Options market prices in higher volatility",
+        "Altcoins lag as bitcoin dominance rises",
+    ]
+    news = {"news_results": [{
+        "position": i + 1,
+        "title": title,
+        "link": f"https://news.example.com/{i + 1}",
+        "source": {"name": "Example News"},
+        "date": "01/01/2026, 08:00 AM, +0000 UTC",
+        "snippet": f"{title}. Market participants weigh macro data and on-chain signals.",
+    } for i, title in enumerate(headlines)]}
+
+    reason = ("시간봉 RSI가 중립 구간에서 반등하고 MACD가 시그널선 위로 올라섰지만 일봉 볼린저밴드 상단이 가깝고 "
+              "공포탐욕지수 추세가 뚜렷하지 않아 비중을 나누어 대응합니다. ")
+    openai = [
+        json.dumps({"decision": decision, "risk_level": "medium", "confidence_score": score, "reason": reason * 3},
+                   ensure_ascii=False)
+        # 매수/매도를 번갈아 돌려주어 반복 사이클에서도 모의 잔고가 한쪽으로 소진되지 않게 함
+        for decision, score in (("buy", 62), ("sell", 58))
+    ]
+    return {"ohlcv": ohlcv, "orderbook": orderbook, "fear_greed": fear_greed, "news": news, "openai": openai}
+
+
+class RecordingHttpClient(HttpClient):
+    """성공한 JSON 응답을 endpoint별로 보관하는 HttpClient (--record용)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.responses = {}
+
+    def get(self, endpoint, url, params=None):
+        response = super().get(endpoint, url, params=params)
+        if response.status_code == 200:
+            self.responses[endpoint] = response.json()
+        return response
+
+
+def record_fixtures(ticker="KRW-BTC", count=FIXTURE_CANDLES):
+    """실제 서비스 응답을 픽스처로 기록 (네트워크, OPENAI_API_KEY, SERPAPI_KEY 필요)"""
+    http = RecordingHttpClient()
+    collector = EnhancedCryptoDataCollector(
+        ticker, http=http, candle_store=CandleStore(tempfile.mkdtemp(prefix="bench-record-"), http=http),
+        cache=TTLCache(), decision_cache=DecisionCache(max_age=0), order_executor=OrderExecutor(MockExchange()),
+    )
+    collector.stream_responses = False
+
+    ohlcv = {}
+    for interval in FIXTURE_INTERVALS:
+        frame = http.call("upbit", pyupbit.get_ohlcv, ticker, interval=interval, count=count, retry_none=True)
+        ohlcv[interval] = frame[["open", "high", "low", "close", "volume", "value"]]
+    orderbook = http.call("upbit", pyupbit.get_orderbook, ticker=ticker)
+
+    analysis_data = collector.gather_analysis_data()
+    for source in ("fear_greed", "serpapi"):
+        if source not in http.responses:
+            raise RuntimeError(f"No {source} response recorded")
+
+    # 실제 사이클과 같은 프롬프트로 요청한 응답 원문을 기록
+    prompt, _ = collector.prompt_encoder.encode(optimize_analysis_data(analysis_data))
+    text, parse = collector._request_decision([
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ])
+    parse()
+    return {
+        "ohlcv": ohlcv,
+        "orderbook": orderbook,
+        "fear_greed": http.responses["fear_greed"],
+        "news": http.responses["serpapi"],
+        "openai": [text],
+    }
+
+
+class FixtureUpbit:
+    """pyupbit 시세 함수(get_ohlcv, get_current_price, get_orderbook)를 픽스처로 대신하는 대역
+
+    pyupbit는 API 주소가 고정되어 있어 로컬 서버 대신 모듈 함수를 교체한다.
+    캔들은 마지막 캔들이 현재 진행 중인 캔들이 되도록 인덱스를 옮겨 돌려주므로
+    캔들 저장소의 증분 동기화가 실제처럼 최근 몇 개만 받아온다.
+    """
+
+    FUNCTIONS = ("get_ohlcv", "get_current_price", "get_orderbook")
+
+    def __init__(self, ohlcv, orderbook):
+        self.ohlcv = ohlcv
+        self.orderbook = orderbook
+        self.calls = 0
+        self._originals = None
+
+    def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, **kwargs):
+        self.calls += 1
+        frame = self.ohlcv[interval].iloc[-count:].copy()
+        step = INTERVAL_DURATIONS[interval]
+        now = pd.Timestamp(datetime.now(timezone.utc).replace(tzinfo=None))
+        last = pd.Timestamp(0) + (now - pd.Timestamp(0)) // step * step + KST_OFFSET
+        frame.index = pd.DatetimeIndex([last - step * (len(frame) - 1 - i) for i in range(len(frame))])
+        return frame
+
+    def get_current_price(self, ticker="KRW-BTC", **kwargs):
+        self.calls += 1
+        price = float(self.ohlcv["minute60"]["close"].iloc[-1])
+        return {item: price for item in ticker} if isinstance(ticker, list) else price
+
+    def get_orderbook(self, ticker="KRW-BTC", **kwargs):
+        self.calls += 1
+
+        def book(market):
+            return {**self.orderbook, "market": market, "timestamp": int(time.time() * 1000)}
+
+        return [book(item) for item in ticker] if isinstance(ticker, list) else book(ticker)
+
+    def install(self):
+        self._originals = {name: getattr(pyupbit, name) for name in self.FUNCTIONS}
+        for name in self.FUNCTIONS:
+            setattr(pyupbit, name, getattr(self, name))
+        return self
+
+    def uninstall(self):
+        if self._originals:
+            for name, func in self._originals.items():
+                setattr(pyupbit, name, func)
+            self._originals = None
+
+
+class FixtureServer:
+    """경로별로 기록된 JSON을 돌려주는 로컬 HTTP 서버 (공포탐욕지수, SerpAPI 대역)"""
+
+    def __init__(self, routes, host="127.0.0.1", port=0):
+        self.routes = {path: json.dumps(payload, ensure_ascii=False).encode("utf-8") for path, payload in routes.items()}
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._server = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # HttpClient 세션의 연결 재사용
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                payload = server.routes.get(urlsplit(self.path).path)
+                with server._lock:
+                    server.requests += 1
+                if payload is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class DiscardingJournal(DecisionJournal):
+    """기록 스레드가 파일을 쓰지 않고 버리는 저널 (record() 자체 비용 측정용)"""
+
+    def _write(self, entries):
+        return []
+
+
+class LocalServices:
+    """모든 외부 서비스를 픽스처 기반 로컬 대역으로 띄움
+
+    업비트 시세는 FixtureUpbit, 공포탐욕지수/SerpAPI는 FixtureServer, OpenAI는
+    FakeOpenAIServer, 주문은 MockExchange가 맡으므로 네트워크 없이 실행된다.
+    캔들 저장소와 저널은 임시 디렉터리에 쓰고 stop()에서 지운다.
+    """
+
+    def __init__(self, fixtures, first_token_delay=0.0, token_delay=0.0):
+        self.fixtures = fixtures
+        self.upbit = FixtureUpbit(fixtures["ohlcv"], fixtures["orderbook"])
+        self.web = FixtureServer({"/fng/": fixtures["fear_greed"], "/search.json": fixtures["news"]})
+        self.openai = FakeOpenAIServer(fixtures["openai"], first_token_delay=first_token_delay,
+                                       token_delay=token_delay, chunk_size=STREAM_CHUNK)
+        self.workdir = None
+        self.journal = None
+
+    def start(self):
+        self.upbit.install()
+        self.web.start()
+        self.openai.start()
+        self.workdir = tempfile.mkdtemp(prefix="bench-")
+        self.journal = DecisionJournal(os.path.join(self.workdir, "journal"))
+        return self
+
+    def stop(self):
+        self.upbit.uninstall()
+        self.web.stop()
+        self.openai.stop()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def collector(self, ticker="KRW-BTC"):
+        """로컬 대역만 바라보는 collector (모의 거래소로만 주문)"""
+        http = HttpClient()
+        collector = EnhancedCryptoDataCollector(
+            ticker,
+            client=OpenAI(base_url=self.openai.url, api_key="bench", max_retries=0),
+            http=http,
+            candle_store=CandleStore(os.path.join(self.workdir, "candles"), http=http),
+            cache=TTLCache(),
+            decision_cache=DecisionCache(max_age=0),
+            order_executor=OrderExecutor(MockExchange(price_source=self.upbit.get_current_price)),
+            journal=self.journal,
+        )
+        collector.fear_greed_api = f"{self.web.url}/fng/"
+        collector.serpapi_api = f"{self.web.url}/search.json"
+        return collector
+
+
+def build_benchmarks(services):
+    """이름 -> 인자 없는 함수. 준비 과정에서 로컬 대역이 제대로 응답하는지도 확인"""
+    fixtures = services.fixtures
+    trader = services.collector()
+
+    hourly = fixtures["ohlcv"]["minute60"].iloc[-HOURLY_LOOKBACK:].copy()
+    daily = trader.add_technical_indicators(fixtures["ohlcv"]["day"].iloc[-DAILY_LOOKBACK:].copy())
+    with_indicators = trader.add_technical_indicators(hourly.copy())
+
+    # 같은 프레임에서 진행 중인 마지막 캔들 가격만 바뀌는 실제 사이클 상황
+    incremental = hourly.copy()
+    key = ("KRW-BTC", "minute60")
+    trader.add_technical_indicators(incremental, key=key)
+    close = incremental.columns.get_loc("close")
+    moves = itertools.cycle([1.0005, 0.9995])
+
+    def indicators_incremental():
+        incremental.iloc[-1, close] = incremental.iloc[-2, close] * next(moves)
+        trader.add_technical_indicators(incremental, key=key)
+
+    def ohlcv_serialize():
+        frame_to_payload(daily, DAILY_WINDOW, "%Y-%m-%d")
+        frame_to_payload(with_indicators, HOURLY_WINDOW, "%Y-%m-%d %H:%M:%S")
+
+    def get_ohlcv_data():
+        trader.cache = TTLCache()  # 일봉 캐시를 비워 매번 캔들 저장소 동기화부터 실행
+        trader.get_ohlcv_data()
+
+    analysis_data = trader.gather_analysis_data()
+    missing = [source for source in ("current_status", "orderbook_data", "ohlcv", "fear_greed", "news")
+               if analysis_data.get(source) is None]
+    if missing:
+        raise RuntimeError(f"Local services returned no data for: {', '.join(missing)}")
+    optimized_data = optimize_analysis_data(analysis_data)
+
+    content = fixtures["openai"][0]
+    chunks = [content[i:i + STREAM_CHUNK] for i in range(0, len(content), STREAM_CHUNK)]
+    parser = DecisionParser()
+    parser.parse(content)
+
+    def response_parse_stream():
+        stream = StreamingDecisionParser(parser)
+        for chunk in chunks:
+            stream.feed(chunk)
+        stream.finish()
+
+    # 사이클 끝의 저널 기록 비용 (파일 쓰기는 백그라운드 스레드라 여기에 포함되지 않아야 함)
+    result = trader.get_ai_analysis(analysis_data)
+    if result is None:
+        raise RuntimeError("Local OpenAI stand-in returned no decision")
+    # 측정 반복이 파일 쓰기보다 훨씬 빨라 실제 저널이면 대기열이 차서 버리는 경로만 재게 되므로
+    # 쓰기는 버리고, 그래도 대기열이 쌓이지 않도록 주기적으로 비움
+    trader.journal = DiscardingJournal(os.path.join(services.workdir, "journal-discard"))
+    records = itertools.count(1)
+
+    def journal_record():
+        trader.journal_cycle(analysis_data, result)
+        if next(records) % 1000 == 0:
+            trader.journal.flush()
+
+    cycle_trader = services.collector()
+
+    def ai_trading_cycle():
+        cycle_trader.cache = TTLCache()  # 공포탐욕지수/뉴스/일봉도 매 사이클 로컬 대역에서 다시 조회
+        ai_trading(cycle_trader)
+
+    return {
+        "indicators_full": lambda: trader.add_technical_indicators(hourly),
+        "indicators_incremental": indicators_incremental,
+        "ohlcv_serialize": ohlcv_serialize,
+        "get_ohlcv_data": get_ohlcv_data,
+        "prompt_build": lambda: trader.prompt_encoder.encode(optimized_data),
+        "response_parse": lambda: parser.parse(content),
+        "response_parse_stream": response_parse_stream,
+        "journal_record": journal_record,
+        "ai_trading_cycle": ai_trading_cycle,
+    }
+
+
+def measure(func, min_time=1.0, min_iterations=5, max_iterations=100_000, warmup=2):
+    """warmup 후 min_time초(최소 min_iterations회) 반복 실행한 지연 통계 (초)"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < max_iterations and (len(samples) < min_iterations or time.perf_counter() - start < min_time):
+        began = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - began)
+
+    samples = np.array(samples)
+    return {
+        "iterations": len(samples),
+        "mean": float(samples.mean()),
+        "p50": float(np.percentile(samples, 50)),
+        "p95": float(np.percentile(samples, 95)),
+        "min": float(samples.min()),
+        "ops_per_sec": float(len(samples) / samples.sum()),
+    }
+
+
+def run_benchmarks(services, only=None, min_time=1.0):
+    results = {}
+    for name, func in build_benchmarks(services).items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = measure(func, min_time=min_time)
+        services.journal.flush(timeout=60)  # 밀린 저널 기록이 다음 측정에 끼어들지 않도록
+    return results
+
+
+def load_baseline(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, f, indent=2)
+        f.write("\n")
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """벤치마크별 기준선 대비 p50 변화율과 회귀 목록 반환"""
+    changes = {}
+    regressions = []
+    base_results = (baseline or {}).get("results", {})
+    for name, result in results.items():
+        base = base_results.get(name)
+        if not base or not base.get("p50"):
+            changes[name] = None
+            continue
+        changes[name] = result["p50"] / base["p50"] - 1
+        if changes[name] > threshold:
+            regressions.append(name)
+    return changes, regressions
+
+
+def print_report(results, changes, baseline):
+    print(f"\n=== Benchmarks ({datetime.now():%Y-%m-%d %H:%M:%S}) ===")
+    if baseline:
+        print(f"baseline: {baseline.get('created')} (python {baseline.get('python')})")
+    print(f"{'name':<24}{'iters':>8}{'mean ms':>11}{'p50 ms':>11}{'p95 ms':>11}{'ops/s':>11}{'vs base':>10}")
+    for name, result in results.items():
+        change = changes.get(name)
+        print(f"{name:<24}{result['iterations']:>8}{result['mean'] * 1000:>11.3f}{result['p50'] * 1000:>11.3f}"
+              f"{result['p95'] * 1000:>11.3f}{result['ops_per_sec']:>11.1f}"
+              f"{'' if change is None else f'{change:+.1%}':>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the collector and decision pipeline")
+    parser.add_argument("-k", "--filter", action="append", default=None, help="이름에 이 문자열이 있는 벤치마크만")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준선으로 저장")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="기준선 대비 p50 증가율이 이보다 크면 실패 (기본 0.25)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="벤치마크별 최소 측정 시간 (초)")
+    parser.add_argument("--first-token-delay", type=float, default=0.0, help="OpenAI 대역의 첫 토큰 지연 (초)")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="OpenAI 대역의 조각별 지연 (초)")
+    parser.add_argument("--record", action="store_true", help="실제 서비스 응답을 픽스처로 기록 (네트워크 필요)")
+    parser.add_argument("--synthesize", action="store_true", help="합성 픽스처 생성")
+    parser.add_argument("--ticker", default="KRW-BTC", help="--record할 티커")
+    parser.add_argument("--seed", type=int, default=0, help="--synthesize 난수 시드")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    if args.record or args.synthesize:
+        fixtures = record_fixtures(args.ticker) if args.record else synthetic_fixtures(args.seed)
+        save_fixtures(fixtures, args.fixtures)
+        print(f"Fixtures written to {args.fixtures}")
+        raise SystemExit(0)
+
+    fixtures = load_fixtures(args.fixtures)
+    with LocalServices(fixtures, args.first_token_delay, args.token_delay) as services:
+        results = run_benchmarks(services, args.filter, args.min_time)
+
+    baseline = load_baseline(args.baseline)
+    changes, regressions = compare(results, baseline, args.threshold)
+    print_report(results, changes, baseline)
+    missing = [name for name, change in changes.items() if change is None]
+    if baseline is not None and missing and not args.save_baseline:
+        print(f"Not in baseline (not compared): {', '.join(missing)}")
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    elif baseline is None:
+        # 기준선이 없으면 아무것도 비교하지 못하므로 통과로 보지 않음
+        print(f"No baseline at {args.baseline}; nothing was compared. Run with --save-baseline to create one.")
+        raise SystemExit(2)
+    elif regressions:
+        print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        raise SystemExit(1)
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from observability import get_logger
+
+log = get_logger("cache")
+
+
+def seconds_until_utc_midnight():
+    """다음 UTC 자정(일봉 마감, 공포탐욕지수 갱신 시각)까지 남은 초"""
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+# 소스별 TTL (초, 또는 초를 반환하는 함수)
+SOURCE_TTLS = {
+    "fear_greed": seconds_until_utc_midnight,
+    "news": 30 * 60,
+    "daily_closed": seconds_until_utc_midnight,  # 마감된 일봉 (진행 중인 일봉은 매 사이클 다시 만듦)
+}
+DEFAULT_TTL = 60
+
+
+class CacheEntry:
+    __slots__ = ("value", "stored_at", "expires_at")
+
+    def __init__(self, value, stored_at, expires_at):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    @property
+    def age(self):
+        """저장 후 경과 시간 (초)"""
+        return time.time() - self.stored_at
+
+    def expired(self, now=None):
+        return (now or time.time()) >= self.expires_at
+
+
+class TTLCache:
+    """소스별 TTL과 최대 항목 수를 갖는 LRU 캐시
+
+    path를 지정하면 항목을 JSON 파일로 저장해 재시작 후에도 유지한다.
+    (저장할 값은 JSON으로 직렬화 가능해야 함)
+    """
+
+    def __init__(self, ttls=None, max_entries=256, path=None):
+        self.ttls = {**SOURCE_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()  # (source, key) -> CacheEntry
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def _ttl(self, source):
+        ttl = self.ttls.get(source, DEFAULT_TTL)
+        return ttl() if callable(ttl) else ttl
+
+    def get(self, source, key=None):
+        """만료되지 않은 CacheEntry 반환 (없으면 None)"""
+        with self._lock:
+            entry = self._entries.get((source, key))
+            if entry is None:
+                return None
+            if entry.expired():
+                del self._entries[(source, key)]
+                return None
+            self._entries.move_to_end((source, key))
+            return entry
+
+    def set(self, source, value, key=None, ttl=None):
+        now = time.time()
+        ttl = self._ttl(source) if ttl is None else ttl
+        with self._lock:
+            self._entries[(source, key)] = CacheEntry(value, now, now + ttl)
+            self._entries.move_to_end((source, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.path:
+            self._save()
+
+    def get_or_fetch(self, source, fetch, key=None):
+        """캐시에 있으면 그 값을, 없으면 fetch() 결과를 저장 후 반환 (None은 저장하지 않음)"""
+        entry = self.get(source, key)
+        if entry is not None:
+            return entry.value
+        value = fetch()
+        if value is not None:
+            self.set(source, value, key)
+        return value
+
+    def age(self, source, key=None):
+        entry = self.get(source, key)
+        return entry.age if entry is not None else None
+
+    def _save(self):
+        with self._lock:
+            data = [
+                {"source": source, "key": key, "value": entry.value,
+                 "stored_at": entry.stored_at, "expires_at": entry.expires_at}
+                for (source, key), entry in self._entries.items()
+            ]
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            log.error("Error saving cache", path=self.path, error=repr(e))
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.error("Error loading cache", path=self.path, error=repr(e))
+            return
+
+        now = time.time()
+        for item in data[-self.max_entries:]:
+            entry = CacheEntry(item["value"], item["stored_at"], item["expires_at"])
+            if not entry.expired(now):
+                self._entries[(item["source"], item["key"])] = entry
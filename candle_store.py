@@ -0,0 +1,181 @@
+import io
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pyupbit
+
+from observability import get_logger
+from scheduler import INTERVAL_DURATIONS
+
+log = get_logger("candle_store")
+
+CANDLE_FIELDS = ["open", "high", "low", "close", "volume", "value"]
+CANDLE_DTYPE = np.dtype([("ts", "i8")] + [(field, "f8") for field in CANDLE_FIELDS])
+
+KST_OFFSET = timedelta(hours=9)  # pyupbit 캔들 인덱스는 KST 기준
+
+
+class CandleStore:
+    """(ticker, interval)별 OHLCV 캔들을 디스크에 보관하는 로컬 저장소
+
+    캔들은 구조화 numpy 배열(.npy)로 저장하고 메모리 매핑으로 읽는다.
+    sync()는 마지막 저장 시각 이후의 캔들만 받아와 파일 끝에 덧붙이고, load()는 네트워크 없이
+    원하는 길이만큼 최근 캔들을 돌려준다. 백테스트용 이력을 남기도록 기본으로는 자르지 않으며
+    max_rows를 주면 그 개수(여유분 1/4 초과 시)로 잘라낸다.
+    """
+
+    def __init__(self, root=".candles", max_rows=None, http=None):
+        self.root = root
+        self.max_rows = max_rows
+        self.http = http  # HttpClient가 있으면 재시도/백오프 정책을 적용
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, ticker, interval):
+        with self._locks_guard:
+            return self._locks.setdefault((ticker, interval), threading.Lock())
+
+    def path(self, ticker, interval):
+        return os.path.join(self.root, ticker, f"{interval}.npy")
+
+    def _read(self, ticker, interval):
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    def _write(self, ticker, interval, candles):
+        path = self.path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, candles)
+        os.replace(tmp_path, path)
+
+    def _write_tail(self, ticker, interval, start, new):
+        """저장 파일의 start번째 행부터 new로 덮어쓰고 헤더의 행 수만 갱신. 제자리에 쓰지 못하면 False
+
+        numpy는 첫 축이 자랄 수 있도록 헤더에 여유를 두므로 대부분 파일 전체를 다시 쓰지 않는다.
+        행을 먼저 쓰고 헤더를 나중에 고치므로 읽는 쪽은 이전 길이 또는 새 길이만 본다.
+        """
+        path = self.path(ticker, interval)
+        try:
+            with open(path, "r+b") as f:
+                if np.lib.format.read_magic(f) != (1, 0):
+                    return False
+                _, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                data_start = f.tell()
+                if dtype != CANDLE_DTYPE or fortran_order:
+                    return False
+
+                header = io.BytesIO()
+                np.lib.format.write_array_header_1_0(header, {
+                    "descr": np.lib.format.dtype_to_descr(CANDLE_DTYPE),
+                    "fortran_order": False,
+                    "shape": (start + len(new),),
+                })
+                if len(header.getvalue()) != data_start:
+                    return False
+
+                f.seek(data_start + start * CANDLE_DTYPE.itemsize)
+                f.write(np.ascontiguousarray(new, dtype=CANDLE_DTYPE).tobytes())
+                f.truncate()
+                f.seek(0)
+                f.write(header.getvalue())
+        except (OSError, ValueError) as e:
+            log.warning("Error appending candles, rewriting file", ticker=ticker, interval=interval, error=repr(e))
+            return False
+        return True
+
+    def last_timestamp(self, ticker, interval):
+        candles = self._read(ticker, interval)
+        if len(candles) == 0:
+            return None
+        return pd.Timestamp(int(candles["ts"][-1]))
+
+    def load(self, ticker, interval, count=None):
+        """저장된 최근 count개 캔들을 DataFrame으로 반환 (네트워크 사용 안 함)"""
+        candles = self._read(ticker, interval)
+        if count is not None:
+            candles = candles[-count:]
+        if len(candles) == 0:
+            return None
+        return pd.DataFrame(
+            {field: np.array(candles[field]) for field in CANDLE_FIELDS},
+            index=pd.DatetimeIndex(np.array(candles["ts"]).astype("datetime64[ns]")),
+        )
+
+    def _fetch(self, ticker, interval, count):
+        if self.http is not None:
+            # get_ohlcv는 요청 실패를 None으로 돌려주므로 None도 재시도
+            fetched = self.http.call("upbit", pyupbit.get_ohlcv, ticker, interval=interval, count=count,
+                                     retry_none=True)
+        else:
+            fetched = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
+        if fetched is None or len(fetched) == 0:
+            return None
+
+        candles = np.empty(len(fetched), dtype=CANDLE_DTYPE)
+        candles["ts"] = pd.DatetimeIndex(fetched.index).astype("datetime64[ns]").asi8
+        for field in CANDLE_FIELDS:
+            candles[field] = fetched[field].to_numpy(dtype=float)
+        return candles
+
+    def sync(self, ticker, interval, history=200):
+        """마지막 저장 캔들 이후 분량만 받아와 저장. 받아온 캔들 수를 반환
+
+        마지막 저장 캔들은 진행 중이었을 수 있으므로 항상 다시 받아 덮어쓴다.
+        저장된 캔들이 history개보다 적으면 history개를 받아온다.
+        """
+        with self._lock(ticker, interval):
+            stored = self._read(ticker, interval)
+            if len(stored) < history:
+                count = history
+            else:
+                last = pd.Timestamp(int(stored["ts"][-1]))
+                now_kst = datetime.now(timezone.utc).replace(tzinfo=None) + KST_OFFSET
+                elapsed = max(now_kst - last.to_pydatetime(), timedelta(0))
+                count = int(elapsed / INTERVAL_DURATIONS[interval]) + 2
+
+            new = self._fetch(ticker, interval, count)
+            if new is None:
+                return 0
+
+            if len(stored) and new["ts"][0] > stored["ts"][-1]:
+                # 저장분과 이어지지 않으면 공백이 생기므로 history개를 다시 받아 교체
+                log.warning("Candle gap, refetching", ticker=ticker, interval=interval, bars=history)
+                stored = stored[:0]
+                if count < history:
+                    new = self._fetch(ticker, interval, history)
+                    if new is None:
+                        return 0
+
+            rows = new
+            if len(stored):
+                # 저장된 마지막 캔들 이전 분량은 이미 마감된 캔들이므로 다시 쓰지 않음
+                rows = new[np.searchsorted(new["ts"], stored["ts"][-1]):]
+                if len(rows) == 0:
+                    return 0
+            start = int(np.searchsorted(stored["ts"], rows["ts"][0])) if len(stored) else 0
+            total = start + len(rows)
+            # max_rows를 넘어도 여유분(1/4)을 채울 때까지는 잘라내지 않고 끝에 덧붙이기만 함
+            trim = self.max_rows is not None and total > self.max_rows + max(1, self.max_rows // 4)
+            if start and not trim and self._write_tail(ticker, interval, start, rows):
+                return len(new)
+
+            merged = np.concatenate([np.array(stored[:start]), rows])
+            if self.max_rows is not None:
+                merged = merged[-self.max_rows:]
+            self._write(ticker, interval, merged)
+            return len(new)
+
+    def get_ohlcv(self, ticker, interval="day", count=200):
+        """증분 동기화 후 최근 count개 캔들 반환 (pyupbit.get_ohlcv 대체)"""
+        try:
+            self.sync(ticker, interval, history=count)
+        except Exception as e:
+            log.error("Error syncing candles", ticker=ticker, interval=interval, error=repr(e))
+        return self.load(ticker, interval, count)
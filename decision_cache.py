@@ -0,0 +1,116 @@
+import json
+import math
+import threading
+import time
+
+from decision_parser import Decision
+from observability import get_logger
+
+log = get_logger("decision_cache")
+
+# 양자화 단위
+PRICE_BUCKET_PCT = 0.5      # 현재가 구간 (%)
+RSI_BAND = 10
+BB_BAND = 0.2
+IMBALANCE_BAND = 0.1
+MIN_POSITION_KRW = 5000     # 업비트 최소 주문 금액 미만 보유는 미보유로 취급
+
+
+def _band(value, width):
+    if value is None or isinstance(value, float) and math.isnan(value):
+        return None
+    return math.floor(value / width)
+
+
+def fingerprint(ticker, optimized_data):
+    """AI 입력 데이터를 양자화한 특징 튜플
+
+    의사결정에 의미 있는 변화(가격 구간, 일봉/시간봉 지표 구간, 공포탐욕 단계, 호가 불균형,
+    보유 여부)만 남기므로 값이 조금씩 흔들려도 같은 지문이 나온다.
+    """
+    status = optimized_data["current_status"]
+    price = status["current_price"]
+    price_bucket = math.floor(math.log(price) / math.log1p(PRICE_BUCKET_PCT / 100)) if price > 0 else None
+    holding = status["crypto_balance"] * price >= MIN_POSITION_KRW
+    can_buy = status["krw_balance"] >= MIN_POSITION_KRW
+
+    # 일봉 지표는 진행 중인 일봉까지 매 사이클 다시 계산된 값 (get_ohlcv_data)
+    indicators = optimized_data["ohlcv_data"]["latest_indicators"]
+    hourly_rsi = (optimized_data["ohlcv_data"].get("hourly_data") or {}).get("rsi") or [None]
+    macd, macd_signal = indicators["macd"], indicators["macd_signal"]
+    macd_trend = None if math.isnan(macd - macd_signal) else macd > macd_signal
+
+    fear_greed = optimized_data.get("fear_greed")
+    fear_greed_class = fear_greed["current"]["classification"] if fear_greed else None
+
+    orderbook = optimized_data["orderbook_data"]
+    total = orderbook["total_bid_size"] + orderbook["total_ask_size"]
+    imbalance = _band(orderbook["total_bid_size"] / total, IMBALANCE_BAND) if total > 0 else None
+
+    return (
+        ticker,
+        price_bucket,
+        holding,
+        can_buy,
+        _band(indicators["rsi"], RSI_BAND),
+        _band(hourly_rsi[-1], RSI_BAND),
+        _band(indicators["bb_position"], BB_BAND),
+        macd_trend,
+        fear_greed_class,
+        imbalance,
+    )
+
+
+class DecisionCache:
+    """지문이 같은 입력에 대해 max_age초 동안 이전 AI 결정을 재사용"""
+
+    def __init__(self, max_age=900):
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # ticker -> (fingerprint, decision, stored_at)
+        self._lock = threading.Lock()
+
+    def lookup(self, fp):
+        """재사용 가능한 이전 결정 반환 (없으면 None)"""
+        with self._lock:
+            entry = self._entries.get(fp[0])
+            if entry is not None and entry[0] == fp and time.time() - entry[2] <= self.max_age:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def store(self, fp, decision):
+        with self._lock:
+            self._entries[fp[0]] = (fp, decision, time.time())
+
+    def restore(self, journal):
+        """저널에 남은 최근 결정으로 채움 (재시작 직후에도 입력이 같으면 AI를 다시 호출하지 않음)
+
+        복원한 결정은 재시작 전에 이미 매매에 반영된 것이므로, 다른 캐시 적중과 마찬가지로
+        새 주문을 내지 않는 재사용 결정(last_analysis["cached"])으로만 쓰인다.
+        """
+        try:
+            records = journal.latest_decisions(self.max_age)
+        except Exception as e:
+            log.error("Error restoring decision cache", error=repr(e))
+            return 0
+        with self._lock:
+            for record in records:
+                decision = Decision(record["decision"], record["reason"] or "", record["risk_level"],
+                                    int(record["confidence_score"]))
+                fp = tuple(json.loads(record["fingerprint"]))
+                self._entries[record["ticker"]] = (fp, decision, record["ts"].timestamp())
+        if records:
+            log.info("Decision cache restored from journal (reused without new orders)", entries=len(records))
+        return len(records)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
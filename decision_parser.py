@@ -0,0 +1,281 @@
+import json
+import threading
+
+DECISIONS = ("buy", "sell", "hold")
+RISK_LEVELS = ("low", "medium", "high")
+MAX_SCAN_CHARS = 20000  # 중괄호 매칭으로 훑을 최대 글자 수
+
+# chat.completions의 response_format (제공자가 스키마에 맞는 JSON만 생성)
+DECISION_SCHEMA = {
+    "type": "object",
+    # 짧은 필드를 앞에 두어 스트리밍 중 긴 reason보다 먼저 완성되게 함
+    "properties": {
+        "decision": {"type": "string", "enum": list(DECISIONS)},
+        "risk_level": {"type": "string", "enum": list(RISK_LEVELS)},
+        "confidence_score": {"type": "integer"},
+        "reason": {"type": "string"},
+    },
+    "required": ["decision", "risk_level", "confidence_score", "reason"],
+    "additionalProperties": False,
+}
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "trading_decision", "strict": True, "schema": DECISION_SCHEMA},
+}
+
+# 형식이 잘못된 응답 뒤에 보내는 재요청 메시지
+RETRY_MESSAGE = (
+    "응답을 해석할 수 없습니다. decision(buy/sell/hold), risk_level(low/medium/high), "
+    "confidence_score(0-100 정수), reason을 이 순서로 가진 JSON 객체 하나만 다시 응답해주세요."
+)
+
+
+class DecisionParseError(ValueError):
+    pass
+
+
+class Decision:
+    """검증된 AI 매매 결정"""
+
+    __slots__ = ("decision", "reason", "risk_level", "confidence_score")
+
+    def __init__(self, decision, reason="", risk_level=None, confidence_score=0):
+        self.decision = decision
+        self.reason = reason
+        self.risk_level = risk_level
+        self.confidence_score = confidence_score
+
+    @classmethod
+    def from_dict(cls, data):
+        """dict를 검증해 Decision으로 변환 (잘못된 값이면 DecisionParseError)"""
+        if not isinstance(data, dict):
+            raise DecisionParseError(f"Expected a JSON object, got {type(data).__name__}")
+
+        decision = str(data.get("decision", "")).strip().lower()
+        if decision not in DECISIONS:
+            raise DecisionParseError(f"Invalid decision: {data.get('decision')!r}")
+
+        risk_level = data.get("risk_level")
+        if risk_level is not None:
+            risk_level = str(risk_level).strip().lower()
+            if risk_level not in RISK_LEVELS:
+                raise DecisionParseError(f"Invalid risk_level: {data.get('risk_level')!r}")
+
+        try:
+            confidence_score = float(data.get("confidence_score", 0))
+        except (TypeError, ValueError):
+            raise DecisionParseError(f"Invalid confidence_score: {data.get('confidence_score')!r}")
+        if not 0 <= confidence_score <= 100:
+            raise DecisionParseError(f"confidence_score out of range: {confidence_score}")
+
+        reason = data.get("reason") or ""
+        return cls(decision, str(reason), risk_level, int(round(confidence_score)))
+
+    def to_dict(self):
+        return {
+            "decision": self.decision,
+            "reason": self.reason,
+            "risk_level": self.risk_level,
+            "confidence_score": self.confidence_score,
+        }
+
+    def __repr__(self):
+        return f"Decision({self.decision!r}, risk_level={self.risk_level!r}, confidence_score={self.confidence_score})"
+
+
+class JsonObjectScanner:
+    """조각 단위로 들어오는 텍스트에서 첫 번째 완결된 JSON 객체를 찾는 중괄호 매처
+
+    문자열 안의 중괄호와 이스케이프는 무시하고, max_chars를 넘게 훑으면 포기한다.
+    """
+
+    def __init__(self, max_chars=MAX_SCAN_CHARS):
+        self.max_chars = max_chars
+        self.scanned = 0
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk):
+        """완결된 객체 문자열을 반환 (아직 없으면 None)"""
+        for char in chunk:
+            self.scanned += 1
+            if self.scanned > self.max_chars:
+                raise DecisionParseError(f"No JSON object within {self.max_chars} characters")
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    return "".join(self._buffer)
+        return None
+
+
+def extract_json_object(text, max_chars=MAX_SCAN_CHARS):
+    """text 안의 첫 번째 완결된 JSON 객체 문자열 (없으면 None)"""
+    return JsonObjectScanner(max_chars).feed(text)
+
+
+class DecisionParser:
+    """AI 응답 문자열을 Decision으로 변환하고 성공/대체 경로/실패 횟수를 집계"""
+
+    def __init__(self, max_chars=MAX_SCAN_CHARS):
+        self.max_chars = max_chars
+        self.parsed = 0
+        self.fallbacks = 0   # 응답 전체가 JSON이 아니어서 중괄호 매칭으로 찾은 횟수
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def parse(self, text):
+        """Decision 반환 (파싱/검증 실패 시 DecisionParseError)"""
+        fallback = False
+        try:
+            try:
+                data = json.loads(text)
+            except json.JSONDecodeError:
+                fallback = True
+                candidate = extract_json_object(text, self.max_chars)
+                if candidate is None:
+                    raise DecisionParseError("No JSON object in response")
+                try:
+                    data = json.loads(candidate)
+                except json.JSONDecodeError as e:
+                    raise DecisionParseError(f"Malformed JSON object: {e}")
+            decision = Decision.from_dict(data)
+        except DecisionParseError:
+            with self._lock:
+                self.failures += 1
+            raise
+
+        with self._lock:
+            self.parsed += 1
+            self.fallbacks += fallback
+        return decision
+
+    def stats(self):
+        with self._lock:
+            return {"parsed": self.parsed, "fallbacks": self.fallbacks, "failures": self.failures}
+
+
+class StreamingDecisionParser:
+    """스트리밍 응답 조각에서 최상위 decision/risk_level/confidence_score를 완성되는 즉시 추출
+
+    JSON 최상위 키와 스칼라 값만 추적하는 상태 기계로, 긴 reason이 도착하기 전에
+    매매 판단에 필요한 필드를 꺼낼 수 있다. 전체 응답 검증은 finish()에서 한다.
+    """
+
+    EARLY_FIELDS = ("decision", "risk_level", "confidence_score")
+
+    def __init__(self, parser=None, max_chars=MAX_SCAN_CHARS):
+        self.parser = parser or DecisionParser()
+        self.max_chars = max_chars
+        self.fields = {}
+        self.early = None        # 조기 필드로 만든 Decision (reason 없음)
+        self._chunks = []
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"     # 최상위에서 다음에 올 것: key 또는 value
+        self._key = None
+        self._token = None       # 수집 중인 최상위 키/스칼라 값 문자들
+
+    @property
+    def text(self):
+        return "".join(self._chunks)
+
+    def feed(self, chunk):
+        """조각 추가. 조기 필드가 처음 모두 갖춰진 순간 Decision을 반환 (그 외에는 None)"""
+        self._chunks.append(chunk)
+        if self.early is not None or self._scanned > self.max_chars:
+            return None
+        self._scanned += len(chunk)
+
+        for char in chunk:
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._expect = "key"
+                continue
+
+            if self._in_string:
+                if self._token is not None:
+                    self._token.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._token is not None:
+                        self._complete()
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._token = [char]
+                continue
+
+            if self._depth == 1 and self._token is not None:
+                # 숫자/리터럴 값은 구분자가 나올 때 끝남
+                if char not in ",}" and not char.isspace():
+                    self._token.append(char)
+                    continue
+                self._complete()
+
+            if char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+            elif self._depth == 1:
+                if char == ":":
+                    self._expect = "value"
+                elif char == ",":
+                    self._expect = "key"
+                elif self._expect == "value" and not char.isspace():
+                    self._token = [char]
+
+        if all(field in self.fields for field in self.EARLY_FIELDS):
+            try:
+                self.early = Decision.from_dict(self.fields)
+            except DecisionParseError:
+                self._scanned = self.max_chars + 1  # 잘못된 값이면 조기 추출 중단, finish()에서 처리
+                return None
+            return self.early
+        return None
+
+    def _complete(self):
+        raw = "".join(self._token)
+        self._token = None
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = None
+        if self._expect == "key":
+            self._key = value
+        else:
+            if self._key in self.EARLY_FIELDS and value is not None:
+                self.fields[self._key] = value
+            self._key = None
+
+    def finish(self):
+        """전체 응답을 검증한 Decision (실패 시 DecisionParseError)"""
+        return self.parser.parse(self.text)
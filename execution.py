@@ -0,0 +1,412 @@
+import json
+import math
+import os
+import threading
+import time
+import uuid
+
+from observability import METRICS, get_logger
+
+FEE_RATE = 0.0005           # 업비트 거래 수수료 0.05%
+MIN_ORDER_KRW = 5000        # 업비트 최소 주문 금액
+FINAL_STATES = ("done", "cancel")  # 더 이상 체결되지 않는 주문 상태
+
+log = get_logger("execution")
+
+
+def size_order(decision, confidence_score, fear_greed_value, krw_balance, crypto_balance, price,
+               fee_rate=FEE_RATE, max_fraction=1.0):
+    """AI 결정을 주문 크기로 변환. (side, amount) 또는 주문하지 않으면 None
+
+    기본 비중은 confidence_score%이고, 공포탐욕지수가 낮을수록 매수를, 높을수록 매도를
+    늘린다(50 기준 ±50이면 ±50%). 매수 amount는 KRW 금액(수수료 별도), 매도 amount는
+    수량이며 업비트 최소 주문 금액 미만이면 주문하지 않는다.
+    """
+    if decision not in ("buy", "sell") or not price or price <= 0:
+        return None
+
+    fraction = min(max(float(confidence_score or 0), 0.0), 100.0) / 100
+    if fear_greed_value is not None:
+        tilt = (50 - fear_greed_value) / 100 if decision == "buy" else (fear_greed_value - 50) / 100
+        fraction *= 1 + tilt
+    fraction = min(max(fraction, 0.0), max_fraction)
+
+    if decision == "buy":
+        # 시장가 매수는 주문 금액에 수수료가 더해져 묶이므로 그만큼 남겨둠
+        amount = math.floor(min(krw_balance * fraction, krw_balance / (1 + fee_rate)))
+        if amount < MIN_ORDER_KRW:
+            return None
+        return "buy", amount
+
+    volume = math.floor(crypto_balance * fraction * 1e8) / 1e8
+    if volume * price < MIN_ORDER_KRW:
+        return None
+    return "sell", volume
+
+
+class MockExchange:
+    """pyupbit.Upbit의 주문/잔고 API를 흉내 내는 모의 거래소 (오프라인 테스트, 모의 매매용)
+
+    시장가 주문은 fill_delay초 뒤 price_source(ticker) 가격에 전량 체결되고,
+    그 전까지 get_order()는 "wait" 상태를 돌려준다.
+    path를 지정하면 잔고(모의 장부)를 JSON 파일에 저장해 재시작해도 이어서 쓰고,
+    balances는 장부 파일이 없을 때의 초기 잔고로만 쓴다.
+    """
+
+    def __init__(self, balances=None, price_source=None, fee_rate=FEE_RATE, fill_delay=0.0, path=None):
+        self.path = path
+        # currency -> [balance, locked, avg_buy_price]
+        self._balances = self._load() if path else None
+        if self._balances is None:
+            self._balances = {
+                currency: [float(amount), 0.0, 0.0]
+                for currency, amount in (balances or {"KRW": 1_000_000}).items()
+            }
+        if price_source is None:
+            import pyupbit
+            price_source = pyupbit.get_current_price
+        self.price_source = price_source
+        self.prices = {}  # 티커별 고정 가격 (있으면 price_source보다 우선)
+        self.fee_rate = fee_rate
+        self.fill_delay = fill_delay
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.error("Error loading paper ledger", path=self.path, error=repr(e))
+            return None
+        # 저장 시점에 미체결이던 주문은 이어지지 않으므로 묶인 금액은 되돌림
+        return {currency: [balance + locked, 0.0, avg_buy_price]
+                for currency, (balance, locked, avg_buy_price) in data["balances"].items()}
+
+    def _save(self):
+        """잔고를 장부 파일에 기록 (잠금을 잡은 상태에서 호출)"""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"balances": self._balances}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.error("Error saving paper ledger", path=self.path, error=repr(e))
+
+    def _price(self, ticker):
+        price = self.prices.get(ticker)
+        return float(price if price is not None else self.price_source(ticker))
+
+    def _account(self, currency):
+        return self._balances.setdefault(currency, [0.0, 0.0, 0.0])
+
+    def get_balances(self):
+        with self._lock:
+            self._settle()
+            return [
+                {
+                    "currency": currency,
+                    "balance": f"{balance:.8f}",
+                    "locked": f"{locked:.8f}",
+                    "avg_buy_price": f"{avg_buy_price:.8f}",
+                    "unit_currency": "KRW",
+                }
+                for currency, (balance, locked, avg_buy_price) in self._balances.items()
+            ]
+
+    def buy_market_order(self, ticker, price):
+        return self._submit(ticker, "bid", float(price))
+
+    def sell_market_order(self, ticker, volume):
+        return self._submit(ticker, "ask", float(volume))
+
+    def _submit(self, ticker, side, amount):
+        fiat, currency = ticker.split("-")
+        with self._lock:
+            if side == "bid":
+                account, reserved = self._account(fiat), amount * (1 + self.fee_rate)
+            else:
+                account, reserved = self._account(currency), amount
+            if reserved > account[0] + 1e-9:
+                return {"error": {"name": "insufficient_funds", "message": "주문가능한 금액이 부족합니다."}}
+            account[0] -= reserved
+            account[1] += reserved
+
+            order = {
+                "uuid": str(uuid.uuid4()),
+                "side": side,
+                "ord_type": "price" if side == "bid" else "market",
+                "market": ticker,
+                "state": "wait",
+                "price": f"{amount}" if side == "bid" else None,
+                "volume": None if side == "bid" else f"{amount}",
+                "executed_volume": "0",
+                "paid_fee": "0",
+                "trades": [],
+                "_reserved": reserved,
+                "_fill_at": time.monotonic() + self.fill_delay,
+            }
+            self._orders[order["uuid"]] = order
+            if not self._settle():
+                self._save()
+            return self._public(order)
+
+    def _settle(self):
+        """체결 시각이 지난 주문을 현재가로 전량 체결. 체결한 주문 수 반환"""
+        now = time.monotonic()
+        filled = 0
+        for order in self._orders.values():
+            if order["state"] != "wait" or order["_fill_at"] > now:
+                continue
+            fiat, currency = order["market"].split("-")
+            price = self._price(order["market"])
+            cash, coin = self._account(fiat), self._account(currency)
+            if order["side"] == "bid":
+                funds = float(order["price"])
+                volume = funds / price
+                fee = funds * self.fee_rate
+                cash[1] -= order["_reserved"]
+                cash[0] += order["_reserved"] - funds - fee
+                coin[2] = (coin[0] * coin[2] + funds) / (coin[0] + volume)
+                coin[0] += volume
+            else:
+                volume = float(order["volume"])
+                funds = volume * price
+                fee = funds * self.fee_rate
+                coin[1] -= order["_reserved"]
+                cash[0] += funds - fee
+            order.update({
+                "state": "done",
+                "executed_volume": f"{volume}",
+                "paid_fee": f"{fee}",
+                "trades": [{"price": f"{price}", "volume": f"{volume}", "funds": f"{funds}"}],
+            })
+            filled += 1
+        if filled:
+            self._save()
+        return filled
+
+    @staticmethod
+    def _public(order):
+        return {key: value for key, value in order.items() if not key.startswith("_")}
+
+    def get_order(self, order_uuid):
+        with self._lock:
+            self._settle()
+            order = self._orders.get(order_uuid)
+            return self._public(order) if order else None
+
+
+class PendingOrder:
+    __slots__ = ("uuid", "ticker", "side", "amount", "reserved", "submitted_at", "result", "done")
+
+    def __init__(self, order_uuid, ticker, side, amount, reserved):
+        self.uuid = order_uuid
+        self.ticker = ticker
+        self.side = side
+        self.amount = amount
+        self.reserved = reserved
+        self.submitted_at = time.monotonic()
+        self.result = None       # 최종 주문 조회 결과
+        self.done = threading.Event()
+
+
+class OrderExecutor:
+    """주문 제출, 백그라운드 체결 추적, 로컬 잔고 캐시
+
+    submit()은 주문을 넣고 바로 반환하며, 백그라운드 스레드가 poll_interval마다
+    미체결 주문만 조회해 체결 내역을 로컬 잔고에 반영한다. 잔고는 처음 한 번과
+    balance_max_age초가 지난 뒤(미체결 주문이 없을 때)에만 거래소에서 다시 받는다.
+    exchange는 pyupbit.Upbit 또는 MockExchange.
+    """
+
+    def __init__(self, exchange, http=None, fee_rate=FEE_RATE, poll_interval=0.5, order_timeout=60,
+                 balance_max_age=300):
+        self.exchange = exchange
+        self.http = http
+        self.fee_rate = fee_rate
+        self.poll_interval = poll_interval
+        self.order_timeout = order_timeout
+        self.balance_max_age = balance_max_age
+        self.live = not isinstance(exchange, MockExchange)
+
+        self._balances = {}      # currency -> dict(get_balances 항목)
+        self._loaded_at = None
+        self._pending = {}       # uuid -> PendingOrder
+        self._lock = threading.Lock()
+        self._order_lock = threading.Lock()  # 잔고 조회 → 주문 크기 결정 → 제출을 한 번에 하나씩
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+
+    def _call(self, func, *args):
+        return self.http.call("upbit", func, *args) if self.http is not None else func(*args)
+
+    def refresh_balances(self):
+        """거래소에서 잔고 전체를 다시 받아 로컬 캐시 교체"""
+        balances = self._call(self.exchange.get_balances)
+        if not isinstance(balances, list):
+            raise ValueError(f"Unexpected balances response: {balances}")
+        with self._lock:
+            self._balances = {item["currency"]: dict(item) for item in balances}
+            self._loaded_at = time.monotonic()
+
+    def balances(self):
+        """get_balances()와 같은 형식의 잔고 (로컬 캐시)"""
+        with self._lock:
+            stale = self._loaded_at is None or (
+                not self._pending and time.monotonic() - self._loaded_at > self.balance_max_age
+            )
+        if stale:
+            self.refresh_balances()
+        with self._lock:
+            return [dict(item) for item in self._balances.values()]
+
+    def _adjust(self, currency, balance=0.0, locked=0.0):
+        item = self._balances.setdefault(currency, {
+            "currency": currency, "balance": "0", "locked": "0", "avg_buy_price": "0", "unit_currency": "KRW",
+        })
+        item["balance"] = str(float(item["balance"]) + balance)
+        item["locked"] = str(float(item["locked"]) + locked)
+        return item
+
+    def submit(self, ticker, side, amount):
+        """시장가 주문 제출 후 주문 uuid 반환 (실패하면 None). 체결은 기다리지 않음"""
+        if self._loaded_at is None:
+            self.refresh_balances()
+
+        if side == "buy":
+            response = self._call(self.exchange.buy_market_order, ticker, amount)
+        else:
+            response = self._call(self.exchange.sell_market_order, ticker, amount)
+        if not isinstance(response, dict) or "uuid" not in response:
+            METRICS.inc("orders_rejected_total", side=side)
+            log.error("Order rejected", ticker=ticker, side=side, amount=amount, response=response)
+            return None
+
+        fiat, currency = ticker.split("-")
+        reserved = amount * (1 + self.fee_rate) if side == "buy" else amount
+        order = PendingOrder(response["uuid"], ticker, side, amount, reserved)
+        with self._lock:
+            # 체결 전까지 주문 금액/수량을 묶어둠
+            self._adjust(fiat if side == "buy" else currency, -reserved, reserved)
+            self._pending[order.uuid] = order
+            self._idle.clear()
+        METRICS.inc("orders_submitted_total", side=side)
+        log.info("Order submitted", ticker=ticker, side=side, amount=amount, uuid=order.uuid)
+        self._ensure_poller()
+        self._wakeup.set()
+        return order.uuid
+
+    def submit_sized(self, ticker, sizer):
+        """sizer(balances)가 정한 (side, amount)로 주문 제출 후 uuid 반환 (주문하지 않으면 None)
+
+        여러 티커가 동시에 주문해도 앞선 주문이 묶어둔 금액을 뺀 잔고로 크기를 정하도록
+        잔고 조회부터 제출까지를 한 번에 하나씩 실행한다.
+        """
+        with self._order_lock:
+            order = sizer(self.balances())
+            if order is None:
+                return None
+            side, amount = order
+            return self.submit(ticker, side, amount)
+
+    def _ensure_poller(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._poll_loop, name="order-poller", daemon=True)
+            self._thread.start()
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                pending = list(self._pending.values())
+                if not pending:
+                    # submit()이 _pending 추가와 _idle.clear()를 같은 잠금 안에서 하므로 여기서 set해야
+                    # 방금 들어온 주문이 있는데 wait_idle()이 반환되는 일이 없음
+                    self._idle.set()
+            if not pending:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            for order in pending:
+                try:
+                    result = self._call(self.exchange.get_order, order.uuid)
+                except Exception as e:
+                    log.error("Error polling order", uuid=order.uuid, error=repr(e))
+                    result = None
+                if result and result.get("state") in FINAL_STATES:
+                    self._apply_fill(order, result)
+                elif time.monotonic() - order.submitted_at > self.order_timeout:
+                    METRICS.inc("orders_expired_total", side=order.side)
+                    log.warning("Order not settled in time, resyncing balances", uuid=order.uuid,
+                                timeout=self.order_timeout)
+                    self._expire(order)
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _apply_fill(self, order, result):
+        """최종 주문 결과를 로컬 잔고에 반영"""
+        fiat, currency = order.ticker.split("-")
+        volume = float(result.get("executed_volume") or 0)
+        fee = float(result.get("paid_fee") or 0)
+        funds = sum(float(trade["funds"]) for trade in result.get("trades") or [])
+
+        with self._lock:
+            if order.side == "buy":
+                self._adjust(fiat, order.reserved - funds - fee, -order.reserved)
+                coin = self._balances.get(currency)
+                held = float(coin["balance"]) if coin else 0.0
+                avg_buy_price = float(coin["avg_buy_price"]) if coin else 0.0
+                coin = self._adjust(currency, volume)
+                if held + volume > 0:
+                    coin["avg_buy_price"] = str((held * avg_buy_price + funds) / (held + volume))
+            else:
+                self._adjust(currency, order.reserved - volume, -order.reserved)
+                self._adjust(fiat, funds - fee)
+            self._pending.pop(order.uuid, None)
+
+        order.result = result
+        order.done.set()
+        METRICS.inc("orders_filled_total", side=order.side)
+        METRICS.observe("order_fill_seconds", time.monotonic() - order.submitted_at)
+        log.info("Order filled", ticker=order.ticker, side=order.side, volume=f"{volume:.8f}",
+                 funds=f"{funds:,.0f}", fee=f"{fee:,.2f}")
+
+    def _expire(self, order):
+        with self._lock:
+            self._pending.pop(order.uuid, None)
+            self._loaded_at = None  # 다음 balances() 호출 때 거래소에서 다시 받음
+        order.done.set()
+
+    def pending(self):
+        with self._lock:
+            return list(self._pending)
+
+    def wait_idle(self, timeout=None):
+        """미체결 주문이 모두 처리될 때까지 대기"""
+        return self._idle.wait(timeout)
+
+
+def live_trading_enabled():
+    return os.getenv("LIVE_TRADING", "").lower() in ("1", "true", "yes")
+
+
+def create_order_executor(upbit, http=None, price_source=None):
+    """LIVE_TRADING=1이면 실제 업비트 계정, 아니면 모의 거래소로 주문하는 OrderExecutor
+
+    모의 거래소 잔고는 PAPER_LEDGER(기본 .paper/ledger.json)에 저장되어 cron/--schedule 재시작에도
+    이어지고, 장부가 없을 때의 초기 현금은 PAPER_KRW (기본 1,000,000 KRW).
+    """
+    if live_trading_enabled():
+        return OrderExecutor(upbit, http=http)
+    exchange = MockExchange({"KRW": float(os.getenv("PAPER_KRW", 1_000_000))}, price_source=price_source,
+                            path=os.getenv("PAPER_LEDGER", ".paper/ledger.json") or None)
+    return OrderExecutor(exchange)
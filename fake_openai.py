@@ -0,0 +1,146 @@
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSE = json.dumps({
+    "decision": "hold",
+    "risk_level": "medium",
+    "confidence_score": 55,
+    "reason": "RSI와 볼린저밴드 위치가 중립 구간이고 공포탐욕지수도 뚜렷한 방향을 보이지 않아 관망합니다. " * 8,
+}, ensure_ascii=False)
+
+
+class FakeOpenAIServer:
+    """OpenAI 호환 /v1/chat/completions를 흉내 내는 로컬 서버 (오프라인 테스트, 지연 측정용)
+
+    stream=true 요청에는 응답을 chunk_size 글자씩 SSE로 보내며, 첫 조각 전에
+    first_token_delay초, 조각마다 token_delay초를 기다린다. responses는 순서대로
+    돌려줄 응답 문자열 목록이고 요청 본문은 self.requests에 쌓인다.
+    """
+
+    def __init__(self, responses=None, host="127.0.0.1", port=0, first_token_delay=0.0, token_delay=0.0,
+                 chunk_size=4):
+        self.responses = list(responses or [DEFAULT_RESPONSE])
+        self.host = host
+        self.port = port
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.chunk_size = chunk_size
+        self.requests = []
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        """OpenAI(base_url=...)에 넘길 주소"""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _next_response(self, body):
+        with self._lock:
+            self.requests.append(body)
+            return self.responses[(len(self.requests) - 1) % len(self.responses)]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                content = server._next_response(body)
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                model = body.get("model", "gpt-4.1")
+
+                if not body.get("stream"):
+                    time.sleep(server.first_token_delay + server.token_delay * len(content) / server.chunk_size)
+                    self._send_json({
+                        "id": completion_id,
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                time.sleep(server.first_token_delay)
+                pieces = [{"role": "assistant", "content": ""}]
+                pieces += [{"content": content[i:i + server.chunk_size]} for i in range(0, len(content), server.chunk_size)]
+                for i, delta in enumerate(pieces + [{}]):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": None if delta else "stop"}],
+                    }
+                    self._send_event(json.dumps(chunk, ensure_ascii=False))
+                    if 0 < i < len(pieces):
+                        time.sleep(server.token_delay)
+                self._send_event("[DONE]")
+
+            def _send_json(self, data):
+                payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_event(self, data):
+                self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible fake for offline runs")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--response", default=None, help="돌려줄 응답 JSON 파일 (기본: hold 결정)")
+    parser.add_argument("--first-token-delay", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    responses = None
+    if args.response:
+        with open(args.response, encoding="utf-8") as f:
+            responses = [f.read().strip()]
+    server = FakeOpenAIServer(responses, port=args.port, first_token_delay=args.first_token_delay,
+                              token_delay=args.token_delay).start()
+    print(f"Fake OpenAI API on {server.url} (set OPENAI_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
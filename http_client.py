@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from observability import METRICS, get_logger
+
+# 엔드포인트별 (연결, 읽기) 타임아웃 (초)
+ENDPOINT_TIMEOUTS = {
+    "serpapi": (3.05, 8),
+    "fear_greed": (3.05, 5),
+}
+DEFAULT_TIMEOUT = (3.05, 5)
+
+# 재시도할 HTTP 상태 코드
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+log = get_logger("http")
+
+
+class HttpClient:
+    """외부 API 호출용 공유 HTTP 클라이언트
+
+    하나의 requests.Session으로 커넥션 풀과 keep-alive를 재사용하고, 엔드포인트별
+    타임아웃과 jitter를 섞은 지수 백오프 재시도를 적용한다. 429 응답을 받으면
+    Retry-After 동안 같은 엔드포인트로의 요청을 멈춘다.
+    """
+
+    def __init__(self, timeouts=None, max_retries=3, backoff_base=0.5, backoff_max=8.0, pool_size=16):
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._blocked_until = {}  # 엔드포인트별 요청 재개 시각
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (full jitter)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _wait_for_rate_limit(self, endpoint):
+        with self._lock:
+            blocked_until = self._blocked_until.get(endpoint, 0.0)
+        delay = blocked_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _block(self, endpoint, seconds):
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._blocked_until[endpoint] = max(self._blocked_until.get(endpoint, 0.0), until)
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get("Retry-After")
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, endpoint, url, params=None):
+        """재시도/백오프를 적용한 GET. 마지막 시도의 응답을 반환"""
+        timeout = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_rate_limit(endpoint)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                METRICS.observe("http_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+                METRICS.inc("http_retries_total", endpoint=endpoint, reason=e.__class__.__name__)
+                log.warning("Request failed, retrying", endpoint=endpoint, error=e.__class__.__name__,
+                            delay=f"{delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            METRICS.observe("http_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                if response.status_code == 429:
+                    self._block(endpoint, delay)
+                METRICS.inc("http_retries_total", endpoint=endpoint, reason=response.status_code)
+                log.warning("Retryable status, retrying", endpoint=endpoint, status=response.status_code,
+                            delay=f"{delay:.2f}s")
+                time.sleep(delay)
+                continue
+            return response
+
+    def get_json(self, endpoint, url, params=None):
+        response = self.get(endpoint, url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def call(self, endpoint, func, *args, retry_none=False, **kwargs):
+        """자체적으로 HTTP를 호출하는 함수(pyupbit 등)에 같은 재시도 정책 적용
+
+        ConnectionError/Timeout/UpbitLimitError를 그대로 올려보내는 함수(get_current_price,
+        get_orderbook, Upbit.get_balances)만 예외로 재시도된다. get_ohlcv처럼 예외를 삼키고
+        None을 돌려주는 조회 함수는 retry_none=True로 None도 재시도한다.
+        주문 함수도 실패하면 None을 돌려주지만 주문이 이미 접수됐을 수 있으므로 재시도하지 않는다.
+        """
+        from pyupbit.errors import UpbitLimitError  # pyupbit 함수를 넘겨받을 때만 필요하므로 여기서 import
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_rate_limit(endpoint)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout, UpbitLimitError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+                if isinstance(e, UpbitLimitError):
+                    # 초당 요청 제한은 1초 단위로 풀림
+                    delay = max(delay, 1.0)
+                    self._block(endpoint, delay)
+                METRICS.inc("http_retries_total", endpoint=endpoint, reason=e.__class__.__name__)
+                log.warning("Call failed, retrying", endpoint=endpoint, error=e.__class__.__name__,
+                            delay=f"{delay:.2f}s")
+                time.sleep(delay)
+                continue
+            finally:
+                METRICS.observe("http_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+
+            if result is None and retry_none and attempt < self.max_retries:
+                delay = self.backoff(attempt)
+                METRICS.inc("http_retries_total", endpoint=endpoint, reason="none")
+                log.warning("Call returned no data, retrying", endpoint=endpoint,
+                            func=getattr(func, "__name__", repr(func)), delay=f"{delay:.2f}s")
+                time.sleep(delay)
+                continue
+            return result
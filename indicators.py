@@ -0,0 +1,275 @@
+import math
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# 지표 기간 (ta 라이브러리 기본값과 동일)
+BB_WINDOW = 20
+BB_DEV = 2
+RSI_WINDOW = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGN = 9
+SMA_WINDOWS = (5, 20, 60, 120)
+ATR_WINDOW = 14
+
+INDICATOR_COLUMNS = [
+    "bb_high", "bb_mid", "bb_low", "bb_pband",
+    "rsi",
+    "macd", "macd_signal", "macd_diff",
+    "sma_5", "sma_20", "sma_60", "sma_120",
+    "atr",
+]
+
+NAN = float("nan")
+
+
+class IndicatorEngine:
+    """캔들 1개당 O(1)로 갱신되는 기술적 지표 계산기
+
+    ta 라이브러리와 같은 정의(ddof=0 볼린저 밴드, Wilder RSI, EMA MACD, ATR)를
+    롤링 합계와 EMA 상태만으로 계산한다. 같은 시계열을 넣으면 ta 결과와
+    부동소수점 오차 범위에서 일치한다.
+    마지막 캔들은 아직 진행 중일 수 있으므로 revise()로 다시 계산할 수 있다.
+    """
+
+    def __init__(self):
+        self._capacity = max(max(SMA_WINDOWS), BB_WINDOW)
+        self._bb_slot = SMA_WINDOWS.index(BB_WINDOW)
+        self._rsi_alpha = 1.0 / RSI_WINDOW
+        self._fast_alpha = 2.0 / (MACD_FAST + 1)
+        self._slow_alpha = 2.0 / (MACD_SLOW + 1)
+        self._sign_alpha = 2.0 / (MACD_SIGN + 1)
+        self.reset()
+
+    def reset(self):
+        # 종가는 첫 종가를 뺀 값으로 저장해 큰 가격대에서도 분산 계산 오차를 줄임
+        self._ring = array("d", bytes(8 * self._capacity))
+        # SMA 윈도우별 합계 + 볼린저 밴드 제곱합
+        self._sums = array("d", bytes(8 * (len(SMA_WINDOWS) + 1)))
+        self._ref = 0.0
+        self._n = 0
+        self._prev_close = NAN
+        self._avg_up = 0.0
+        self._avg_down = 0.0
+        self._ema_fast = NAN
+        self._ema_slow = NAN
+        self._ema_signal = NAN
+        self._macd_count = 0
+        self._tr_sum = 0.0
+        self._atr = 0.0
+        self._snapshot = None
+        self.last_values = None
+
+    def __len__(self):
+        return self._n
+
+    def update(self, high, low, close):
+        """새 캔들 추가 후 INDICATOR_COLUMNS 순서의 지표 값 반환"""
+        self._snapshot = self._save()
+        return self._apply(float(high), float(low), float(close))
+
+    def revise(self, high, low, close):
+        """마지막 캔들을 새 값으로 다시 계산"""
+        if self._snapshot is None:
+            raise ValueError("revise() called before any update()")
+        self._restore(self._snapshot)
+        return self._apply(float(high), float(low), float(close))
+
+    def _save(self):
+        slot = self._n % self._capacity
+        return (
+            self._n, self._ref, self._prev_close,
+            self._avg_up, self._avg_down,
+            self._ema_fast, self._ema_slow, self._ema_signal, self._macd_count,
+            self._tr_sum, self._atr,
+            array("d", self._sums), self._ring[slot], self.last_values,
+        )
+
+    def _restore(self, snapshot):
+        (
+            self._n, self._ref, self._prev_close,
+            self._avg_up, self._avg_down,
+            self._ema_fast, self._ema_slow, self._ema_signal, self._macd_count,
+            self._tr_sum, self._atr,
+            sums, slot_value, self.last_values,
+        ) = snapshot
+        self._sums[:] = sums
+        self._ring[self._n % self._capacity] = slot_value
+
+    def _apply(self, high, low, close):
+        n = self._n
+        cap = self._capacity
+        ring = self._ring
+        sums = self._sums
+
+        if n == 0:
+            self._ref = close
+        x = close - self._ref
+
+        # 롤링 합계: 윈도우를 벗어나는 값을 빼고 새 값을 더함 (덮어쓰기 전에 읽음)
+        for i, window in enumerate(SMA_WINDOWS):
+            if n >= window:
+                sums[i] -= ring[(n - window) % cap]
+            sums[i] += x
+        if n >= BB_WINDOW:
+            leaving = ring[(n - BB_WINDOW) % cap]
+            sums[-1] -= leaving * leaving
+        sums[-1] += x * x
+        ring[n % cap] = x
+
+        n += 1
+        self._n = n
+        if n % cap == 0:
+            self._resync()
+
+        # 볼린저 밴드
+        if n >= BB_WINDOW:
+            mean = sums[self._bb_slot] / BB_WINDOW
+            std = math.sqrt(max(sums[-1] / BB_WINDOW - mean * mean, 0.0))
+            bb_mid = mean + self._ref
+            bb_high = bb_mid + BB_DEV * std
+            bb_low = bb_mid - BB_DEV * std
+            bb_pband = (close - bb_low) / (bb_high - bb_low) if bb_high != bb_low else NAN
+        else:
+            bb_high = bb_mid = bb_low = bb_pband = NAN
+
+        # RSI (Wilder smoothing, 첫 캔들의 변화량은 0으로 취급)
+        prev_close = self._prev_close
+        diff = close - prev_close if n > 1 else 0.0
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        if n == 1:
+            self._avg_up, self._avg_down = up, down
+        else:
+            self._avg_up += self._rsi_alpha * (up - self._avg_up)
+            self._avg_down += self._rsi_alpha * (down - self._avg_down)
+        if n >= RSI_WINDOW:
+            if self._avg_down == 0:
+                rsi = 100.0
+            else:
+                rsi = 100.0 - 100.0 / (1.0 + self._avg_up / self._avg_down)
+        else:
+            rsi = NAN
+
+        # MACD
+        if n == 1:
+            self._ema_fast = self._ema_slow = close
+        else:
+            self._ema_fast += self._fast_alpha * (close - self._ema_fast)
+            self._ema_slow += self._slow_alpha * (close - self._ema_slow)
+        if n >= MACD_SLOW:
+            macd = self._ema_fast - self._ema_slow
+            if self._macd_count == 0:
+                self._ema_signal = macd
+            else:
+                self._ema_signal += self._sign_alpha * (macd - self._ema_signal)
+            self._macd_count += 1
+            if self._macd_count >= MACD_SIGN:
+                macd_signal = self._ema_signal
+                macd_diff = macd - macd_signal
+            else:
+                macd_signal = macd_diff = NAN
+        else:
+            macd = macd_signal = macd_diff = NAN
+
+        # 이동평균선
+        smas = [
+            sums[i] / window + self._ref if n >= window else NAN
+            for i, window in enumerate(SMA_WINDOWS)
+        ]
+
+        # ATR (ta와 동일하게 첫 윈도우 이전은 0)
+        if n == 1:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        if n < ATR_WINDOW:
+            self._tr_sum += true_range
+            atr = 0.0
+        elif n == ATR_WINDOW:
+            self._atr = (self._tr_sum + true_range) / ATR_WINDOW
+            atr = self._atr
+        else:
+            self._atr = (self._atr * (ATR_WINDOW - 1) + true_range) / ATR_WINDOW
+            atr = self._atr
+
+        self._prev_close = close
+        self.last_values = (
+            bb_high, bb_mid, bb_low, bb_pband,
+            rsi,
+            macd, macd_signal, macd_diff,
+            *smas,
+            atr,
+        )
+        return self.last_values
+
+    def _resync(self):
+        """누적 오차 방지를 위해 링 버퍼 전체로 합계를 다시 계산"""
+        n = self._n
+        cap = self._capacity
+        for i, window in enumerate(SMA_WINDOWS):
+            self._sums[i] = math.fsum(self._ring[k % cap] for k in range(n - window, n))
+        self._sums[-1] = math.fsum(self._ring[k % cap] ** 2 for k in range(n - BB_WINDOW, n))
+
+
+class IndicatorSeries:
+    """시계열 하나의 지표 엔진과 직전 계산 결과를 함께 보관
+
+    sync()에 이전 호출과 겹치는 캔들 프레임을 넘기면 마지막(진행 중) 캔들만
+    다시 계산하고 새로 추가된 캔들만 엔진에 반영한다.
+    """
+
+    def __init__(self):
+        self.engine = IndicatorEngine()
+        self._index = pd.DatetimeIndex([])
+        self._values = np.empty((0, len(INDICATOR_COLUMNS)))
+
+    def reset(self):
+        self.engine.reset()
+        self._index = pd.DatetimeIndex([])
+        self._values = np.empty((0, len(INDICATOR_COLUMNS)))
+
+    def _overlap(self, index):
+        """df 앞부분 중 이미 계산된 행의 수 (이어서 계산할 수 없으면 None)"""
+        if len(self._index) == 0 or len(index) == 0:
+            return None
+        start = self._index.get_indexer([index[0]])[0]
+        if start < 0:
+            return None
+        overlap = len(self._index) - start
+        if overlap > len(index) or index[overlap - 1] != self._index[-1]:
+            return None
+        return overlap
+
+    def sync(self, df):
+        """df 행 순서에 맞춘 (행 수, 지표 수) 배열 반환"""
+        overlap = self._overlap(df.index)
+        if overlap is None:
+            self.reset()
+            overlap = 0
+
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        close = df["close"].to_numpy(dtype=float)
+
+        computed = []
+        if overlap:
+            i = overlap - 1
+            computed.append(self.engine.revise(high[i], low[i], close[i]))
+        for i in range(overlap, len(df)):
+            computed.append(self.engine.update(high[i], low[i], close[i]))
+
+        kept = self._values[len(self._values) - overlap:len(self._values) - 1] if overlap else self._values[:0]
+        values = np.vstack([kept, np.array(computed, dtype=float).reshape(-1, len(INDICATOR_COLUMNS))])
+
+        self._index = pd.DatetimeIndex(df.index)
+        self._values = values
+        return values
+
+
+def compute_indicators(df):
+    """df 전체에 대해 지표를 처음부터 계산 (INDICATOR_COLUMNS 컬럼의 DataFrame)"""
+    values = IndicatorSeries().sync(df)
+    return pd.DataFrame(values, index=df.index, columns=INDICATOR_COLUMNS)
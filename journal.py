@@ -0,0 +1,322 @@
+import argparse
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 없으면 저널 비활성화
+    pa = pq = None
+
+from observability import METRICS, get_logger
+
+log = get_logger("journal")
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL = 60.0  # 첫 항목이 버퍼에 들어온 뒤 이 시간(초)이 지나면 개수와 무관하게 기록
+MAX_QUEUE = 10000              # 기록 스레드가 밀려도 사이클이 막히지 않도록 넘치면 버림
+DROP_WARNING_INTERVAL = 60.0   # 버린 항목 경고는 이 시간(초)에 한 번만 (그동안 버린 개수와 함께)
+DAY_FORMAT = "%Y-%m-%d"
+
+# (컬럼, pyarrow 타입 이름)
+JOURNAL_COLUMNS = [
+    ("ts", "timestamp"),            # 결정 시각 (UTC)
+    ("ticker", "string"),
+    ("decision", "string"),         # AI 응답을 해석하지 못했으면 null
+    ("risk_level", "string"),
+    ("confidence_score", "int32"),
+    ("reason", "string"),
+    ("cached", "bool"),             # DecisionCache에서 재사용한 결정
+    ("fingerprint", "string"),      # decision_cache.fingerprint()의 JSON
+    ("order_uuid", "string"),
+    ("price", "float64"),
+    ("krw_balance", "float64"),
+    ("crypto_balance", "float64"),
+    ("fear_greed", "int32"),
+    ("prompt_tokens", "int32"),
+    ("llm_seconds", "float64"),
+    ("prompt", "string"),           # AI에 보낸 표 형식 프롬프트
+    ("response", "string"),         # AI 응답 원문
+    ("snapshot", "string"),         # 프롬프트를 만든 입력 데이터(optimize_analysis_data)의 JSON
+]
+
+
+def journal_schema():
+    types = {
+        "timestamp": pa.timestamp("ms", tz="UTC"),
+        "string": pa.string(),
+        "bool": pa.bool_(),
+        "int32": pa.int32(),
+        "float64": pa.float64(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in JOURNAL_COLUMNS])
+
+
+def to_utc(value):
+    """datetime/문자열/epoch 초를 UTC Timestamp로 (시간대가 없으면 UTC로 간주)"""
+    if value is None:
+        return None
+    timestamp = pd.Timestamp(value, unit="s") if isinstance(value, (int, float)) else pd.Timestamp(value)
+    return timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+
+
+class DecisionJournal:
+    """사이클별 입력 스냅샷과 AI 결정을 쌓는 추가 전용 Parquet 저널
+
+    record()는 큐에 넣기만 하고, 백그라운드 스레드가 batch_size개 또는 flush_interval초마다
+    root/<UTC 날짜>/<첫 ms>-<마지막 ms>.parquet 파일로 한 번에 기록한다.
+    파일 이름에 시간 범위가 있으므로 query()는 범위 밖 파일을 열지 않는다.
+    """
+
+    def __init__(self, root=".journal", batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for DecisionJournal")
+        self.root = root
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.schema = journal_schema()
+        self._queue = queue.Queue(maxsize=MAX_QUEUE)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._drop_lock = threading.Lock()
+        self._dropped = 0            # 마지막 경고 이후 버린 항목 수
+        self._drop_warned_at = None
+
+    def record(self, entry):
+        """항목 하나를 기록 대기열에 추가 (파일 쓰기는 기록 스레드에서)"""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            METRICS.inc("journal_dropped_total")
+            self._warn_dropped(entry)
+
+    def _warn_dropped(self, entry):
+        with self._drop_lock:
+            self._dropped += 1
+            now = time.monotonic()
+            if self._drop_warned_at is not None and now - self._drop_warned_at < DROP_WARNING_INTERVAL:
+                return
+            dropped, self._dropped, self._drop_warned_at = self._dropped, 0, now
+        log.warning("Journal queue full, dropping entries", dropped=dropped, ticker=entry.get("ticker"))
+
+    def flush(self, timeout=10):
+        """대기 중인 항목을 모두 파일로 쓸 때까지 대기. 제때 끝나면 True"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10):
+        self.flush(timeout)
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name="journal-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)  # 종료 전에 남은 항목 기록
+
+    def _write_loop(self):
+        buffer = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, threading.Event):
+                buffer = self._write(buffer)
+                item.set()
+            elif item is not None:
+                buffer.append(item)
+                if len(buffer) < self.batch_size:
+                    deadline = deadline or time.monotonic() + self.flush_interval
+                    continue
+                buffer = self._write(buffer)
+            else:
+                buffer = self._write(buffer)
+            deadline = time.monotonic() + self.flush_interval if buffer else None
+
+    def _write(self, entries):
+        """entries를 UTC 날짜별 파일로 기록. 실패하면 다음 기록 때 다시 시도하도록 그대로 반환
+
+        files()는 날짜 디렉터리 이름으로 먼저 거르므로 자정을 넘긴 배치도 날짜마다 나누어 쓴다.
+        """
+        if not entries:
+            return []
+        failed = []
+        try:
+            days = {}
+            for entry in entries:
+                row = self._row(entry)
+                days.setdefault(row["ts"].strftime(DAY_FORMAT), []).append((row, entry))
+        except Exception as e:
+            METRICS.inc("journal_write_errors_total")
+            log.error("Error writing journal", entries=len(entries), error=repr(e))
+            failed = entries
+        else:
+            for day, pairs in days.items():
+                if not self._write_day(day, [row for row, _ in pairs]):
+                    failed.extend(entry for _, entry in pairs)
+
+        if len(failed) >= MAX_QUEUE:
+            METRICS.inc("journal_dropped_total", len(failed))
+            return []
+        return failed
+
+    def _write_day(self, day, rows):
+        """한 UTC 날짜의 행을 파일 하나로 기록. 성공하면 True"""
+        start = time.perf_counter()
+        try:
+            rows.sort(key=lambda row: row["ts"])
+            first, last = rows[0]["ts"], rows[-1]["ts"]
+            directory = os.path.join(self.root, day)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{int(first.timestamp() * 1000)}-{int(last.timestamp() * 1000)}.parquet")
+            if os.path.exists(path):
+                path = path.replace(".parquet", f"-{os.getpid()}-{time.monotonic_ns()}.parquet")
+
+            table = pa.Table.from_pylist(rows, schema=self.schema)
+            tmp_path = path + ".tmp"
+            pq.write_table(table, tmp_path, compression="zstd")
+            os.replace(tmp_path, path)  # 읽는 쪽에서 쓰다 만 파일을 보지 않도록
+        except Exception as e:
+            METRICS.inc("journal_write_errors_total")
+            log.error("Error writing journal", entries=len(rows), error=repr(e))
+            return False
+
+        METRICS.observe("journal_write_seconds", time.perf_counter() - start)
+        METRICS.inc("journal_entries_total", len(rows))
+        return True
+
+    @staticmethod
+    def _row(entry):
+        row = {name: entry.get(name) for name, _ in JOURNAL_COLUMNS}
+        row["ts"] = to_utc(entry.get("ts") or datetime.now(timezone.utc)).to_pydatetime()
+        for name in ("fingerprint", "snapshot"):
+            if row[name] is not None and not isinstance(row[name], str):
+                row[name] = json.dumps(row[name], ensure_ascii=False, default=str)
+        return row
+
+    def files(self, start=None, end=None):
+        """start~end(포함)와 겹치는 저널 파일 경로 (이름의 날짜/시간 범위로만 판단)"""
+        start, end = to_utc(start), to_utc(end)
+        if not os.path.isdir(self.root):
+            return []
+        start_ms = int(start.timestamp() * 1000) if start is not None else None
+        end_ms = int(end.timestamp() * 1000) if end is not None else None
+
+        paths = []
+        for day in sorted(os.listdir(self.root)):
+            if start is not None and day < start.strftime(DAY_FORMAT):
+                continue
+            if end is not None and day > end.strftime(DAY_FORMAT):
+                continue
+            directory = os.path.join(self.root, day)
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".parquet"):
+                    continue
+                try:
+                    first, last = (int(part) for part in name[:-len(".parquet")].split("-")[:2])
+                except ValueError:
+                    continue
+                if start_ms is not None and last < start_ms or end_ms is not None and first > end_ms:
+                    continue
+                paths.append(os.path.join(directory, name))
+        return paths
+
+    def query(self, start=None, end=None, ticker=None, columns=None):
+        """시간 범위(UTC, 양끝 포함)와 티커로 걸러낸 DataFrame (ts 순)
+
+        범위 밖 파일은 열지 않고, 연 파일 안에서도 행 그룹 통계로 걸러 필요한 컬럼만 읽는다.
+        """
+        columns = list(columns) if columns else [name for name, _ in JOURNAL_COLUMNS]
+        if "ts" not in columns:
+            columns.insert(0, "ts")
+        paths = self.files(start, end)
+        if not paths:
+            return self.schema.empty_table().select(columns).to_pandas()
+
+        filters = []
+        if start is not None:
+            filters.append(("ts", ">=", to_utc(start)))
+        if end is not None:
+            filters.append(("ts", "<=", to_utc(end)))
+        if ticker is not None:
+            filters.append(("ticker", "==", ticker))
+        table = pq.read_table(paths, columns=columns, filters=filters or None, schema=self.schema)
+        return table.to_pandas().sort_values("ts", kind="stable").reset_index(drop=True)
+
+    def latest_decisions(self, max_age):
+        """최근 max_age초 안에 AI가 새로 내린 티커별 마지막 결정 (DecisionCache 복원용)"""
+        now = datetime.now(timezone.utc)
+        frame = self.query(now - timedelta(seconds=max_age), now, columns=[
+            "ts", "ticker", "decision", "risk_level", "confidence_score", "reason", "cached", "fingerprint",
+        ])
+        frame = frame[frame["decision"].notna() & ~frame["cached"].fillna(False).astype(bool)]
+        return frame.groupby("ticker").tail(1).to_dict("records")
+
+    def compact(self, day):
+        """day(UTC 날짜 문자열)의 작은 파일들을 하나로 합침. 합친 파일 경로 반환"""
+        directory = os.path.join(self.root, day)
+        paths = self.files(f"{day} 00:00:00", f"{day} 23:59:59.999")
+        if len(paths) < 2:
+            return paths[0] if paths else None
+        table = pq.read_table(paths, schema=self.schema).sort_by("ts")
+        first = int(table["ts"][0].as_py().timestamp() * 1000)
+        last = int(table["ts"][-1].as_py().timestamp() * 1000)
+        path = os.path.join(directory, f"{first}-{last}-compacted.parquet")
+        pq.write_table(table, path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+        for old in paths:
+            if old != path:
+                os.remove(old)
+        return path
+
+
+def create_journal():
+    """JOURNAL_DIR(기본 .journal)에 쓰는 DecisionJournal. JOURNAL_DIR이 비었거나 pyarrow가 없으면 None"""
+    root = os.getenv("JOURNAL_DIR", ".journal")
+    if not root:
+        return None
+    if pa is None:
+        log.warning("pyarrow unavailable, decision journal disabled")
+        return None
+    return DecisionJournal(root, batch_size=int(os.getenv("JOURNAL_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+                           flush_interval=float(os.getenv("JOURNAL_FLUSH_SECONDS", DEFAULT_FLUSH_INTERVAL)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query or compact the decision journal")
+    parser.add_argument("command", choices=["query", "compact"])
+    parser.add_argument("--root", default=os.getenv("JOURNAL_DIR", ".journal"))
+    parser.add_argument("--start", default=None, help="UTC 시작 시각 (예: 2026-01-01 00:00)")
+    parser.add_argument("--end", default=None, help="UTC 끝 시각")
+    parser.add_argument("--ticker", default=None)
+    parser.add_argument("--columns", default="ts,ticker,decision,confidence_score,cached,order_uuid,price")
+    parser.add_argument("--day", default=None, help="compact할 UTC 날짜 (기본: 어제)")
+    args = parser.parse_args()
+
+    journal = DecisionJournal(args.root)
+    if args.command == "compact":
+        day = args.day or (datetime.now(timezone.utc) - timedelta(days=1)).strftime(DAY_FORMAT)
+        print(f"Compacted {day}: {journal.compact(day)}")
+    else:
+        frame = journal.query(args.start, args.end, args.ticker, args.columns.split(","))
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(frame)
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+
+import websockets
+
+from observability import METRICS, get_logger
+from orderbook_ring import OrderbookRing
+
+UPBIT_WS_URL = "wss://api.upbit.com/websocket/v1"
+CHANNELS = ("ticker", "trade", "orderbook")
+
+log = get_logger("market_feed")
+
+
+class MarketFeed:
+    """업비트 웹소켓(ticker/trade/orderbook) 구독으로 유지하는 실시간 시세
+
+    백그라운드 스레드의 이벤트 루프에서 메시지를 받아 티커별 최근 체결가와 호가를
+    메모리에서 갱신한다. get_price()/get_orderbook()은 네트워크 없이 바로 반환하며,
+    값이 max_age초보다 오래되면 None을 돌려줘 호출 측이 REST로 대체할 수 있게 한다.
+    """
+
+    def __init__(self, tickers, url=UPBIT_WS_URL, max_age=5.0, record_path=None):
+        self.tickers = list(tickers)
+        self.url = url
+        self.max_age = max_age
+        self.record_path = record_path  # 받은 원본 메시지를 JSONL로 저장 (재생 서버용)
+
+        self._prices = {}
+        self._orderbooks = {}
+        self.rings = {ticker: OrderbookRing() for ticker in self.tickers}  # 티커별 호가 이력
+        self._updated_at = {}  # (ticker, channel) -> time.monotonic()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._stop = None
+        self.messages = 0
+        self.reconnects = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_loop, name="market-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_ready(self, timeout=None):
+        """모든 티커의 체결가와 호가를 한 번 이상 받을 때까지 대기"""
+        return self._ready.wait(timeout)
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    def _subscribe_message(self):
+        message = [{"ticket": str(uuid.uuid4())}]
+        message += [{"type": channel, "codes": self.tickers} for channel in CHANNELS]
+        message.append({"format": "DEFAULT"})
+        return json.dumps(message)
+
+    async def _run(self):
+        self._stop = asyncio.Event()
+        record = open(self.record_path, "a", encoding="utf-8") if self.record_path else None
+        attempt = 0
+        try:
+            while not self._stop.is_set():
+                try:
+                    async with websockets.connect(self.url, ping_interval=60) as ws:
+                        await ws.send(self._subscribe_message())
+                        attempt = 0
+                        stop_task = asyncio.ensure_future(self._stop.wait())
+                        try:
+                            while not self._stop.is_set():
+                                recv_task = asyncio.ensure_future(ws.recv())
+                                done, _ = await asyncio.wait(
+                                    {recv_task, stop_task}, return_when=asyncio.FIRST_COMPLETED
+                                )
+                                if recv_task not in done:
+                                    recv_task.cancel()
+                                    break
+                                raw = recv_task.result()
+                                if record is not None:
+                                    record.write((raw.decode("utf-8") if isinstance(raw, bytes) else raw) + "\n")
+                                try:
+                                    self.handle_message(json.loads(raw))
+                                except Exception as e:
+                                    # 형식이 다른 프레임 하나로 수신 스레드가 죽지 않도록 건너뜀
+                                    METRICS.inc("feed_bad_messages_total")
+                                    log.warning("Bad market feed message, skipping", error=repr(e),
+                                                message=str(raw)[:200])
+                        finally:
+                            stop_task.cancel()
+                except (OSError, websockets.WebSocketException) as e:
+                    if self._stop.is_set():
+                        break
+                    delay = random.uniform(0, min(30.0, 0.5 * (2 ** attempt)))
+                    attempt += 1
+                    self.reconnects += 1
+                    METRICS.inc("market_feed_reconnects_total")
+                    log.warning("Market feed disconnected, reconnecting", error=e.__class__.__name__,
+                                delay=f"{delay:.1f}s")
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            if record is not None:
+                record.close()
+
+    def handle_message(self, message):
+        """웹소켓 메시지 1건을 메모리 상태에 반영"""
+        channel = message.get("type")
+        ticker = message.get("code")
+        if ticker is None:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if channel in ("ticker", "trade"):
+                self._prices[ticker] = float(message["trade_price"])
+                self._updated_at[(ticker, "price")] = now
+            elif channel == "orderbook":
+                book = self._orderbooks.setdefault(ticker, {"market": ticker, "orderbook_units": []})
+                book["timestamp"] = message["timestamp"]
+                book["total_ask_size"] = message["total_ask_size"]
+                book["total_bid_size"] = message["total_bid_size"]
+                # 업비트는 매번 상위 호가 전체를 보내므로 기존 호가 목록을 그 자리에서 갱신
+                units = book["orderbook_units"]
+                new_units = message["orderbook_units"]
+                for i, unit in enumerate(new_units):
+                    if i < len(units):
+                        units[i].update(unit)
+                    else:
+                        units.append(dict(unit))
+                del units[len(new_units):]
+                self._updated_at[(ticker, "orderbook")] = now
+            else:
+                return
+            self.messages += 1
+
+            if not self._ready.is_set() and all(
+                (t, "price") in self._updated_at and (t, "orderbook") in self._updated_at
+                for t in self.tickers
+            ):
+                self._ready.set()
+
+        if channel == "orderbook" and ticker in self.rings:
+            self.rings[ticker].push(message)
+
+    def _fresh(self, ticker, kind, max_age):
+        max_age = self.max_age if max_age is None else max_age
+        updated_at = self._updated_at.get((ticker, kind))
+        return updated_at is not None and time.monotonic() - updated_at <= max_age
+
+    def ring(self, ticker):
+        """티커의 호가 링 버퍼 (구독하지 않은 티커면 새로 만듦)"""
+        return self.rings.setdefault(ticker, OrderbookRing())
+
+    def get_price(self, ticker, max_age=None):
+        """최근 체결가 (오래되었거나 없으면 None)"""
+        with self._lock:
+            if not self._fresh(ticker, "price", max_age):
+                return None
+            return self._prices[ticker]
+
+    def get_orderbook(self, ticker, max_age=None):
+        """pyupbit.get_orderbook()과 같은 형식의 호가 사본 (오래되었거나 없으면 None)"""
+        with self._lock:
+            if not self._fresh(ticker, "orderbook", max_age):
+                return None
+            book = self._orderbooks[ticker]
+            return {**book, "orderbook_units": [dict(unit) for unit in book["orderbook_units"]]}
+
+
+class ReplayServer:
+    """기록된 웹소켓 메시지(JSONL)를 재생하는 로컬 서버 (오프라인 테스트용)
+
+    클라이언트가 구독 메시지를 보내면 구독한 티커의 메시지를 interval초 간격으로
+    보내고, loop=True면 끝까지 보낸 뒤 처음부터 반복한다.
+    """
+
+    def __init__(self, messages, host="127.0.0.1", port=0, interval=0.0, loop=False):
+        self.messages = messages
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.loop = loop
+        self._thread = None
+        self._loop = None
+        self._stop = None
+        self._started = threading.Event()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """JSONL 파일에서 메시지를 읽음 (JSON이 아닌 줄은 문자열 그대로 재생)"""
+        messages = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    messages.append(json.loads(line))
+                except ValueError:
+                    messages.append(line.rstrip("\n"))
+        return cls(messages, **kwargs)
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, ws, *args):
+        subscription = json.loads(await ws.recv())
+        codes = {code for item in subscription for code in item.get("codes", [])}
+        try:
+            while True:
+                for message in self.messages:
+                    if isinstance(message, str):
+                        # JSON이 아닌 기록 줄은 그대로 보냄 (잘못된 프레임 재현용)
+                        await ws.send(message.encode("utf-8"))
+                        await asyncio.sleep(self.interval)
+                        continue
+                    if codes and message.get("code") not in codes:
+                        continue
+                    await ws.send(json.dumps(message).encode("utf-8"))
+                    await asyncio.sleep(self.interval)
+                if not self.loop:
+                    break
+            await ws.wait_closed()
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handler, self.host, self.port) as server:
+            self.port = next(iter(server.sockets)).getsockname()[1]
+            self._started.set()
+            await self._stop.wait()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run_loop, name="replay-server", daemon=True)
+        self._thread.start()
+        self._started.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upbit market data feed")
+    parser.add_argument("tickers", nargs="*", default=["KRW-BTC"])
+    parser.add_argument("--record", default=None, help="받은 메시지를 JSONL 파일로 저장")
+    parser.add_argument("--replay", default=None, help="JSONL 파일을 재생하는 로컬 서버 실행")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    try:
+        if args.replay:
+            server = ReplayServer.from_file(args.replay, port=args.port, interval=args.interval, loop=True).start()
+            print(f"Replaying {args.replay} on {server.url}")
+            while True:
+                time.sleep(1)
+        else:
+            feed = MarketFeed(args.tickers, record_path=args.record).start()
+            while True:
+                time.sleep(1)
+                for ticker in args.tickers:
+                    book = feed.get_orderbook(ticker)
+                    top = book["orderbook_units"][0] if book else {}
+                    print(f"{ticker} price={feed.get_price(ticker)} "
+                          f"bid={top.get('bid_price')} ask={top.get('ask_price')} messages={feed.messages}")
+    except KeyboardInterrupt:
+        print("\nMarket feed stopped by user.")
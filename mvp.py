@@ -57,8 +57,8 @@ if result["decision"] == "buy":
     print("매수합니다.")
     # 여기에 매수 로직 추가
 
-    res = uupbit.buy_market_order(ticker, krw_amount)  # 매수
-    print("매수 시도 " + res)
+    res = upbit.buy_market_order(ticker, krw_amount)  # 매수
+    print(f"매수 시도 {res}")
 
 elif result["decision"] == "sell":
     print("매도합니다.")
@@ -66,8 +66,9 @@ elif result["decision"] == "sell":
     # 여기에 매도 로직 추가
     current_price = pyupbit.get_current_price(ticker)  # 현재가 조회
     sell_amount = (krw_amount / current_price) * 0.9995  # 수수료 0.05% 반영, 매도수량
+    btc_amount = min(sell_amount, upbit.get_balance(ticker))  # 보유 수량 이내로 매도
     res = upbit.sell_market_order(ticker, btc_amount)
-    print("매도 시도 " + res)
+    print(f"매도 시도 {res}")
 
 else:
     print("hold 합니다.")
@@ -0,0 +1,389 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 지연 시간 히스토그램 버킷 상한 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """버킷 안에서 선형 보간한 분위수 추정치"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def cumulative(self):
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class StageTimer:
+    """with 블록의 실행 시간과 실패 여부를 기록. 예외가 나거나 fail()을 부르면 실패로 집계"""
+
+    __slots__ = ("metrics", "stage", "labels", "start", "failed", "elapsed")
+
+    def __init__(self, metrics, stage, labels):
+        self.metrics = metrics
+        self.stage = stage
+        self.labels = labels
+        self.failed = False
+        self.elapsed = None
+
+    def fail(self):
+        self.failed = True
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        failed = self.failed or exc_type is not None
+        self.metrics.observe("stage_duration_seconds", self.elapsed, stage=self.stage, **self.labels)
+        self.metrics.inc("stage_calls_total", stage=self.stage, **self.labels)
+        if failed:
+            self.metrics.inc("stage_failures_total", stage=self.stage, **self.labels)
+        return False
+
+
+class Metrics:
+    """스레드 안전한 카운터/히스토그램 모음 (Prometheus 텍스트 또는 JSON으로 내보냄)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}    # (name, labels) -> float
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._lock = threading.Lock()
+        self._server = None
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def stage(self, stage, **labels):
+        """with METRICS.stage("llm_call"): ... 형태로 단계 시간 측정"""
+        return StageTimer(self, stage, labels)
+
+    def timed(self, stage, none_is_failure=True, **labels):
+        """함수 실행 시간을 stage로 기록하는 데코레이터 (None 반환도 실패로 집계)"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage, **labels) as timer:
+                    result = func(*args, **kwargs)
+                    if none_is_failure and result is None:
+                        timer.fail()
+                    return result
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_json(self):
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "mean": histogram.sum / histogram.count if histogram.count else None,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "buckets": dict(zip([*map(str, histogram.buckets), "+Inf"], histogram.cumulative())),
+                }
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def to_prometheus(self):
+        def render_labels(labels, extra=()):
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{render_labels(labels)} {value}")
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                bounds = [*map(str, histogram.buckets), "+Inf"]
+                for bound, count in zip(bounds, histogram.cumulative()):
+                    lines.append(f"{name}_bucket{render_labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{name}_sum{render_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{render_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def stage_summary(self):
+        """단계별 {호출 수, 평균, p95, 실패 수} (로그 출력용)"""
+        with self._lock:
+            failures = {}
+            for (name, labels), value in self._counters.items():
+                if name == "stage_failures_total":
+                    failures[labels] = value
+            summary = {}
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                if name != "stage_duration_seconds":
+                    continue
+                # "fetch:news", "indicators:day"처럼 단계 이름 뒤에 나머지 라벨 값을 붙임
+                label = ":".join([dict(labels)["stage"], *(value for key, value in labels if key != "stage")])
+                summary[label] = {
+                    "count": histogram.count,
+                    "mean": round(histogram.sum / histogram.count, 4),
+                    "p95": round(histogram.quantile(0.95), 4),
+                    "failures": int(failures.get(labels, 0)),
+                }
+        return summary
+
+    def write_json(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def serve(self, port, host="0.0.0.0"):
+        """/metrics (Prometheus 텍스트), /metrics.json을 제공하는 HTTP 서버를 백그라운드로 시작"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(metrics.to_json()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        return self._server.server_address[1]
+
+
+METRICS = Metrics()  # 프로세스 전체가 공유하는 기본 레지스트리
+
+
+class StructuredFormatter(logging.Formatter):
+    """메시지 뒤에 key=value 필드를 붙이는 텍스트 형식, 또는 한 줄 JSON 형식"""
+
+    def __init__(self, fmt="text"):
+        super().__init__()
+        self.fmt = fmt
+
+    def format(self, record):
+        fields = getattr(record, "fields", None) or {}
+        if self.fmt == "json":
+            entry = {
+                "ts": round(record.created, 3),
+                "level": record.levelname,
+                "logger": record.name,
+                "msg": record.getMessage(),
+                **fields,
+            }
+            if record.exc_info:
+                entry["exc"] = self.formatException(record.exc_info)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created))
+        line = f"{timestamp} {record.levelname:<7} {record.name} {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class StructuredLogger:
+    """log.info("Order filled", ticker=..., volume=...) 형태의 레벨별 구조화 로거
+
+    레벨이 꺼져 있으면 필드를 포맷하지 않으므로 debug 로그는 비용이 거의 없다.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def _log(self, level, msg, fields, exc_info=False):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, msg, extra={"fields": fields}, exc_info=exc_info)
+
+    def isEnabledFor(self, level):
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, msg, **fields):
+        self._log(logging.DEBUG, msg, fields)
+
+    def info(self, msg, **fields):
+        self._log(logging.INFO, msg, fields)
+
+    def warning(self, msg, **fields):
+        self._log(logging.WARNING, msg, fields)
+
+    def error(self, msg, **fields):
+        self._log(logging.ERROR, msg, fields)
+
+    def exception(self, msg, **fields):
+        self._log(logging.ERROR, msg, fields, exc_info=True)
+
+
+ROOT_LOGGER = "trading"
+_configured = False
+
+
+def configure_logging(level=None, fmt=None):
+    """LOG_LEVEL(기본 INFO), LOG_FORMAT(text/json) 환경 변수 또는 인자로 로깅 설정"""
+    global _configured
+    root = logging.getLogger(ROOT_LOGGER)
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    fmt = fmt or os.getenv("LOG_FORMAT", "text")
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(StructuredFormatter(fmt))
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.propagate = False
+    _configured = True
+
+
+def get_logger(name):
+    if not _configured:
+        configure_logging()
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"))
+
+
+# 시작 시간 보고에 로드 여부를 표시할 무거운 모듈
+HEAVY_MODULES = ("requests", "numpy", "pandas", "pyupbit", "openai", "indicators", "websockets", "pyarrow", "tiktoken")
+
+
+class StartupReport:
+    """단계별 시작 소요 시간과 그때까지 로드된 무거운 모듈 (cron 실행의 콜드 스타트 확인용)"""
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.phases = {}
+        self._last = self.started
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+        METRICS.observe("startup_seconds", self.phases[phase], phase=phase)
+
+    @property
+    def total(self):
+        return self._last - self.started
+
+    def loaded_modules(self):
+        return [name for name in HEAVY_MODULES if name in sys.modules]
+
+    def log(self):
+        get_logger("startup").info(
+            "Startup report", total=f"{self.total:.3f}s",
+            **{phase: f"{seconds:.3f}s" for phase, seconds in self.phases.items()},
+            loaded=",".join(self.loaded_modules()) or "none",
+        )
+
+
+def export_cycle_metrics(path=None):
+    """사이클이 끝날 때 단계별 지연 요약을 로그로 남기고, path가 있으면 JSON으로 저장"""
+    summary = METRICS.stage_summary()
+    get_logger("observability").info("Stage latency", **{
+        stage: f"n={item['count']} mean={item['mean']}s p95={item['p95']}s fail={item['failures']}"
+        for stage, item in summary.items()
+    })
+    if path:
+        try:
+            METRICS.write_json(path)
+        except OSError as e:
+            get_logger("observability").error("Error writing metrics", path=path, error=repr(e))
+
+
+def add_observability_arguments(parser):
+    parser.add_argument("--log-level", default=None, help="DEBUG/INFO/WARNING/ERROR (기본: LOG_LEVEL 또는 INFO)")
+    parser.add_argument("--log-format", choices=["text", "json"], default=None)
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="/metrics(Prometheus), /metrics.json을 제공할 포트")
+    parser.add_argument("--metrics-file", default=os.getenv("METRICS_PATH"),
+                        help="사이클마다 지표를 JSON으로 저장할 파일")
+
+
+def setup_observability(args):
+    """CLI 인자대로 로깅 설정, 지표 서버 시작"""
+    configure_logging(args.log_level, args.log_format)
+    if args.metrics_port is not None:
+        port = METRICS.serve(args.metrics_port)
+        get_logger("observability").info("Serving metrics", port=port)
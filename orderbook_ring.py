@@ -0,0 +1,119 @@
+import threading
+
+import numpy as np
+
+DEFAULT_CAPACITY = 256   # 보관할 호가 스냅샷 수
+DEFAULT_DEPTH = 15       # 업비트 호가 단계 수
+
+
+class OrderbookRing:
+    """호가 스냅샷을 고정 크기 numpy 배열에 순환 저장하는 링 버퍼
+
+    단계별 가격/수량을 (capacity, depth) 배열로 보관하므로 메모리가 일정하고,
+    불균형·마이크로프라이스·깊이 가중 스프레드·주문 흐름(OFI) 같은 미시구조
+    지표를 최근 구간 전체에 대해 벡터 연산으로 계산할 수 있다.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, depth=DEFAULT_DEPTH):
+        self.capacity = capacity
+        self.depth = depth
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.ask_prices = np.full((capacity, depth), np.nan)
+        self.ask_sizes = np.full((capacity, depth), np.nan)
+        self.bid_prices = np.full((capacity, depth), np.nan)
+        self.bid_sizes = np.full((capacity, depth), np.nan)
+        self._count = 0  # 지금까지 추가된 스냅샷 수
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def push(self, orderbook):
+        """pyupbit/웹소켓 형식 호가 1건 추가 (직전과 같은 timestamp면 무시)"""
+        timestamp = int(orderbook["timestamp"])
+        units = orderbook["orderbook_units"][:self.depth]
+        levels = len(units)
+
+        with self._lock:
+            if self._count and self.timestamps[(self._count - 1) % self.capacity] == timestamp:
+                return False
+            slot = self._count % self.capacity
+            self.timestamps[slot] = timestamp
+            for prices, sizes, price_key, size_key in (
+                (self.ask_prices, self.ask_sizes, "ask_price", "ask_size"),
+                (self.bid_prices, self.bid_sizes, "bid_price", "bid_size"),
+            ):
+                prices[slot, :levels] = [unit[price_key] for unit in units]
+                sizes[slot, :levels] = [unit[size_key] for unit in units]
+                prices[slot, levels:] = np.nan
+                sizes[slot, levels:] = np.nan
+            self._count += 1
+            return True
+
+    def window(self, size=None):
+        """최근 size개 스냅샷을 시간순(오래된 것 → 최신)으로 복사해 반환"""
+        with self._lock:
+            n = len(self)
+            size = n if size is None else min(size, n)
+            order = np.arange(self._count - size, self._count) % self.capacity
+            return (
+                self.timestamps[order],
+                self.ask_prices[order], self.ask_sizes[order],
+                self.bid_prices[order], self.bid_sizes[order],
+            )
+
+    def features(self, levels=5, window=20):
+        """최신 스냅샷과 최근 window개 구간의 미시구조 지표"""
+        timestamps, ask_px, ask_sz, bid_px, bid_sz = self.window(window)
+        if len(timestamps) == 0:
+            return None
+
+        ask_px, ask_sz = ask_px[:, :levels], ask_sz[:, :levels]
+        bid_px, bid_sz = bid_px[:, :levels], bid_sz[:, :levels]
+
+        # 상위 levels 단계 수량 불균형 (-1: 매도 우위 ~ 1: 매수 우위)
+        ask_depth = np.nansum(ask_sz, axis=1)
+        bid_depth = np.nansum(bid_sz, axis=1)
+        total_depth = ask_depth + bid_depth
+        imbalance = np.divide(bid_depth - ask_depth, total_depth, out=np.zeros_like(total_depth), where=total_depth > 0)
+
+        # 최우선 호가 수량으로 가중한 마이크로프라이스
+        best_ask, best_bid = ask_px[:, 0], bid_px[:, 0]
+        best_ask_size, best_bid_size = ask_sz[:, 0], bid_sz[:, 0]
+        mid = (best_ask + best_bid) / 2
+        microprice = (best_ask * best_bid_size + best_bid * best_ask_size) / (best_bid_size + best_ask_size)
+
+        # 깊이 가중 스프레드: 상위 levels 단계 VWAP 매도가 - VWAP 매수가 (bps)
+        vwap_ask = np.nansum(ask_px * ask_sz, axis=1) / ask_depth
+        vwap_bid = np.nansum(bid_px * bid_sz, axis=1) / bid_depth
+        weighted_spread_bps = (vwap_ask - vwap_bid) / mid * 1e4
+
+        # 최우선 호가 주문 흐름 불균형 (Cont-Kukanov-Stoikov OFI)
+        if len(timestamps) > 1:
+            bid_flow = (
+                np.where(best_bid[1:] >= best_bid[:-1], best_bid_size[1:], 0.0)
+                - np.where(best_bid[1:] <= best_bid[:-1], best_bid_size[:-1], 0.0)
+            )
+            ask_flow = (
+                np.where(best_ask[1:] <= best_ask[:-1], best_ask_size[1:], 0.0)
+                - np.where(best_ask[1:] >= best_ask[:-1], best_ask_size[:-1], 0.0)
+            )
+            ofi = float(np.nansum(bid_flow - ask_flow))
+            mean_top_depth = float(np.nanmean(best_bid_size + best_ask_size) / 2)
+            ofi_normalized = ofi / mean_top_depth if mean_top_depth > 0 else 0.0
+            microprice_change_bps = float((microprice[-1] - microprice[0]) / microprice[0] * 1e4)
+        else:
+            ofi = ofi_normalized = microprice_change_bps = 0.0
+
+        return {
+            "snapshots": int(len(timestamps)),
+            "imbalance": float(imbalance[-1]),
+            "imbalance_mean": float(np.mean(imbalance)),
+            "microprice": float(microprice[-1]),
+            "microprice_offset_bps": float((microprice[-1] - mid[-1]) / mid[-1] * 1e4),
+            "spread_bps": float((best_ask[-1] - best_bid[-1]) / mid[-1] * 1e4),
+            "weighted_spread_bps": float(weighted_spread_bps[-1]),
+            "order_flow_imbalance": ofi,
+            "order_flow_imbalance_normalized": ofi_normalized,
+            "microprice_change_bps": microprice_change_bps,
+        }
@@ -0,0 +1,219 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pyupbit
+from openai import OpenAI
+
+from autotrade import EnhancedCryptoDataCollector, run_trading_cycle, SOURCE_TIMEOUTS
+from candle_store import CandleStore
+from http_client import HttpClient
+from cache import TTLCache
+from decision_cache import DecisionCache
+from execution import create_order_executor
+from journal import create_journal
+from market_feed import MarketFeed
+from observability import (
+    METRICS, get_logger, add_observability_arguments, setup_observability, export_cycle_metrics,
+)
+from scheduler import add_schedule_arguments, scheduler_from_args
+
+log = get_logger("portfolio")
+
+
+def as_list(value):
+    """pyupbit는 티커가 1개면 리스트 대신 단일 값을 돌려주므로 리스트로 맞춤"""
+    return value if isinstance(value, list) else [value]
+
+
+class PortfolioEngine:
+    """여러 티커를 한 프로세스에서 운용하는 포트폴리오 엔진
+
+    Upbit/OpenAI 클라이언트, 캔들 저장소, 주문 실행기를 모든 티커가 공유한다.
+    현재가·호가는 멀티 티커 API로 사이클당 한 번씩(잔고는 주문 실행기의 로컬 캐시), 공포탐욕지수와 뉴스는
+    시장 전체 입력이므로 한 번만 조회하고, 티커별 분석은 병렬로 실행한다.
+    """
+
+    def __init__(self, tickers, max_workers=None, feed=None):
+        self.tickers = list(tickers)
+        self.feed = feed  # MarketFeed가 있으면 현재가/호가를 REST 대신 웹소켓 상태에서 읽음
+        self.upbit = pyupbit.Upbit(os.getenv("UPBIT_ACCESS_KEY"), os.getenv("UPBIT_SECRET_KEY"))
+        self.client = OpenAI()
+        self.http = HttpClient(pool_size=max(16, 2 * len(self.tickers)))
+        self.candle_store = CandleStore(os.getenv("CANDLE_STORE_DIR", ".candles"), http=self.http)
+        self.cache = TTLCache(path=os.getenv("CACHE_PATH", ".cache/collector_cache.json"))
+        self.decision_cache = DecisionCache(max_age=float(os.getenv("DECISION_CACHE_SECONDS", 900)))
+        self.journal = create_journal()  # 모든 티커의 사이클 기록을 한 저널에 모아 씀
+        if self.journal is not None:
+            self.decision_cache.restore(self.journal)
+        # 계정 하나의 잔고를 모든 티커가 공유하므로 주문 실행기도 하나만 사용
+        self.order_executor = create_order_executor(self.upbit, http=self.http, price_source=self._current_price)
+
+        # 조회 작업과 티커별 사이클은 서로 기다리므로 풀을 분리해 교착을 막음
+        workers = max_workers or min(32, 2 * len(self.tickers) + 4)
+        self.fetch_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+        self.cycle_executor = ThreadPoolExecutor(max_workers=len(self.tickers), thread_name_prefix="cycle")
+
+        self.collectors = {
+            ticker: EnhancedCryptoDataCollector(
+                ticker,
+                upbit=self.upbit,
+                client=self.client,
+                executor=self.fetch_executor,
+                candle_store=self.candle_store,
+                http=self.http,
+                cache=self.cache,
+                decision_cache=self.decision_cache,
+                feed=self.feed,
+                order_executor=self.order_executor,
+                journal=self.journal,
+            )
+            for ticker in self.tickers
+        }
+        # 시장 전체 입력(공포탐욕지수, 뉴스) 조회용
+        self.market = self.collectors[self.tickers[0]]
+
+    def _current_price(self, ticker):
+        price = self.feed.get_price(ticker) if self.feed is not None else None
+        if price is None:
+            price = self.http.call("upbit", pyupbit.get_current_price, ticker)
+        return price
+
+    def fetch_shared_inputs(self):
+        """티커 수와 무관하게 사이클당 한 번만 필요한 입력 조회"""
+        streamed_prices, streamed_orderbooks = self._streamed()
+        futures = {
+            "balances": self.fetch_executor.submit(self.order_executor.balances),  # 로컬 잔고 캐시
+            "fear_greed": self.fetch_executor.submit(self.market.get_fear_greed_index),
+            "news": self.fetch_executor.submit(self.market.get_crypto_news),
+        }
+        # 웹소켓 상태가 모든 티커에 대해 최신이면 REST 조회 생략
+        if streamed_prices is None:
+            futures["prices"] = self.fetch_executor.submit(
+                self.http.call, "upbit", pyupbit.get_current_price, self.tickers
+            )
+        if streamed_orderbooks is None:
+            futures["orderbooks"] = self.fetch_executor.submit(
+                self.http.call, "upbit", pyupbit.get_orderbook, self.tickers
+            )
+        timeouts = {
+            "prices": SOURCE_TIMEOUTS["current_status"],
+            "orderbooks": SOURCE_TIMEOUTS["orderbook_data"],
+            "balances": SOURCE_TIMEOUTS["current_status"],
+            "fear_greed": SOURCE_TIMEOUTS["fear_greed"],
+            "news": SOURCE_TIMEOUTS["news"],
+        }
+
+        start = time.monotonic()
+        results = {}
+        for name, future in futures.items():
+            remaining = max(0.0, start + timeouts[name] - time.monotonic())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except Exception as e:
+                log.error("Error collecting shared input", source=name, error=repr(e))
+                results[name] = None
+
+        if streamed_prices is not None:
+            prices = streamed_prices
+        else:
+            prices = results["prices"]
+            if prices is not None and not isinstance(prices, dict):
+                prices = {self.tickers[0]: prices}
+        if streamed_orderbooks is not None:
+            orderbooks = streamed_orderbooks
+        else:
+            orderbooks = {
+                book["market"]: book for book in as_list(results["orderbooks"]) if book
+            }
+        return prices or {}, orderbooks, results["balances"], results["fear_greed"], results["news"]
+
+    def _streamed(self):
+        """모든 티커의 웹소켓 현재가/호가가 최신이면 반환 (하나라도 없으면 None)"""
+        if self.feed is None:
+            return None, None
+        prices = {ticker: self.feed.get_price(ticker) for ticker in self.tickers}
+        orderbooks = {ticker: self.feed.get_orderbook(ticker) for ticker in self.tickers}
+        if any(price is None for price in prices.values()):
+            prices = None
+        if any(book is None for book in orderbooks.values()):
+            orderbooks = None
+        return prices, orderbooks
+
+    def _shared_for(self, ticker, prices, orderbooks, balances, fear_greed, news):
+        """티커별 사이클에 넘길 사전 조회 데이터 (조회 실패한 항목은 티커별로 재조회)"""
+        collector = self.collectors[ticker]
+        # None(조회 실패)은 넣지 않아야 gather_analysis_data가 티커별로 다시 조회함
+        shared = {name: value for name, value in (("fear_greed", fear_greed), ("news", news)) if value is not None}
+        if balances is not None and ticker in prices:
+            shared["current_status"] = collector.get_current_status(balances, prices[ticker])
+        if ticker in orderbooks:
+            shared["orderbook_data"] = collector.get_orderbook_data(orderbooks[ticker])
+        return shared
+
+    def run_cycle(self, deadline=None):
+        """모든 티커에 대해 한 사이클 실행. 티커별 AI 결과 dict 반환"""
+        start = time.monotonic()
+        prices, orderbooks, balances, fear_greed, news = self.fetch_shared_inputs()
+
+        futures = {
+            ticker: self.cycle_executor.submit(
+                run_trading_cycle,
+                self.collectors[ticker],
+                self._shared_for(ticker, prices, orderbooks, balances, fear_greed, news),
+                deadline,
+            )
+            for ticker in self.tickers
+        }
+
+        results = {}
+        for ticker, future in futures.items():
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                log.exception("Error in trading cycle", ticker=ticker, error=repr(e))
+                results[ticker] = None
+
+        elapsed = time.monotonic() - start
+        METRICS.observe("stage_duration_seconds", elapsed, stage="portfolio_cycle")
+        log.info("Portfolio cycle finished", tickers=len(self.tickers), elapsed=f"{elapsed:.2f}s")
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-ticker AI trading bot")
+    parser.add_argument("tickers", nargs="*", default=os.getenv("TICKERS", "KRW-BTC").split(","))
+    parser.add_argument("--stream", action="store_true", help="현재가/호가를 웹소켓으로 실시간 구독")
+    add_schedule_arguments(parser)
+    add_observability_arguments(parser)
+    args = parser.parse_args()
+    setup_observability(args)
+
+    log.info("Starting portfolio trading bot (Ctrl+C to stop)", tickers=",".join(args.tickers))
+
+    try:
+        feed = None
+        if args.stream:
+            feed = MarketFeed(args.tickers).start()
+            if not feed.wait_ready(timeout=10):
+                log.warning("Market feed not ready, falling back to REST until it catches up")
+
+        engine = PortfolioEngine(args.tickers, feed=feed)
+
+        def cycle(deadline=None):
+            try:
+                return engine.run_cycle(deadline)
+            finally:
+                export_cycle_metrics(args.metrics_file)
+
+        if args.schedule:
+            scheduler_from_args(args).run(cycle)
+        else:
+            cycle()
+            if not engine.order_executor.wait_idle(timeout=30):
+                log.warning("Orders still pending", orders=engine.order_executor.pending())
+    except KeyboardInterrupt:
+        log.info("Trading bot stopped by user.")
+    except Exception as e:
+        log.exception("Error in main execution", error=repr(e))
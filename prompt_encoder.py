@@ -0,0 +1,246 @@
+import math
+
+from observability import get_logger
+
+log = get_logger("prompt_encoder")
+
+# 지시문과 표 형식 설명만 담은 고정 문자열 (토큰 수를 한 번만 세고 예산은 user 메시지에만 적용).
+# 약 370토큰으로 OpenAI 프롬프트 캐시 최소 길이(1024토큰)에 못 미치므로 캐시 효과는 기대하지 않음
+SYSTEM_PROMPT = """당신은 비트코인 투자 전문가입니다. 제공된 데이터를 분석하여 매매 결정을 내려주세요.
+분석 기준:
+1. 현재 보유 현황 (현금/코인 보유량...)
+2. 차트 / 기술적 지표 (RSI, MACD, 볼린저밴드..)
+3. 호가창 정보 (매수/매도 세력, 불균형, 주문 흐름...)
+4. 공포 탐욕 지수 (Fear & Greed Index)
+
+Please consider the following key points:
+- Fear & Greed Index below 20 (Extreme Fear) may present buying opportunities.
+- Fear & Greed Index above 80 (Extreme Greed) may present selling opportunities.
+- The trend of the Fear & Greed Index is also a crucial indicator.
+
+데이터 형식:
+- 시장 데이터는 [섹션] 제목 아래 CSV 표로 제공됩니다. 첫 줄이 컬럼명이고 빈 칸은 값 없음입니다.
+- data_age는 캐시된 입력 데이터가 조회된 지 몇 초 지났는지를 나타냅니다.
+- 길이 제한 때문에 중요도가 낮은 섹션이나 컬럼은 생략될 수 있습니다.
+
+응답은 반드시 아래 JSON 형식으로만 제공하고, 모든 텍스트는 한글로 작성해주세요:
+{
+    "decision": "buy/sell/hold",
+    "risk_level": "low/medium/high",
+    "confidence_score": 0-100,
+    "reason": "상세한 분석 근거를 한글로 설명"
+}"""
+
+DEFAULT_TOKEN_BUDGET = 1500
+SIGNIFICANT_DIGITS = 6
+
+# 컬럼별 소수점 자리수 (없으면 유효숫자 SIGNIFICANT_DIGITS자리)
+COLUMN_DECIMALS = {
+    "rsi": 1,
+    "bb_pband": 2,
+    "bb_position": 2,
+    "profit_percentage": 2,
+    "imbalance": 3,
+    "imbalance_mean": 3,
+    "microprice_offset_bps": 1,
+    "spread_bps": 1,
+    "weighted_spread_bps": 1,
+    "order_flow_imbalance_normalized": 3,
+    "microprice_change_bps": 1,
+    "krw_balance": 0,
+    "total_value": 0,
+    "unrealized_profit": 0,
+    "value": 0,
+    "average": 1,
+}
+
+# 토큰이 부족할 때 캔들 표에서 남길 컬럼
+CORE_CANDLE_COLUMNS = ["date", "open", "high", "low", "close", "volume", "rsi", "macd", "macd_signal", "bb_pband"]
+
+
+def format_value(value, column=None):
+    """숫자를 고정 정밀도 문자열로 (None/NaN은 빈 문자열)"""
+    if value is None:
+        return ""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value) or math.isinf(value):
+        return ""
+    decimals = COLUMN_DECIMALS.get(column)
+    if decimals is None:
+        if value == 0:
+            return "0"
+        decimals = min(8, SIGNIFICANT_DIGITS - 1 - math.floor(math.log10(abs(value))))
+        if decimals < 0:  # 큰 값은 정수부를 반올림 (예: 143256552 -> 143257000)
+            return str(int(round(value, decimals)))
+    text = f"{value:.{decimals}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+def table(columns, rows):
+    """컬럼명 줄 + 값 줄로 된 CSV 표"""
+    lines = [",".join(columns)]
+    lines += [",".join(format_value(value, column) for column, value in zip(columns, row)) for row in rows]
+    return "\n".join(lines)
+
+
+def record_table(record, columns=None):
+    """dict 하나를 1행짜리 표로"""
+    columns = columns or list(record)
+    return table(columns, [[record.get(column) for column in columns]])
+
+
+def payload_table(payload, columns=None, rows=None):
+    """frame_to_payload() 형식(컬럼별 리스트)의 표. rows가 있으면 최근 rows행만"""
+    columns = [column for column in (columns or payload) if column in payload]
+    length = len(payload[columns[0]]) if columns else 0
+    start = max(0, length - rows) if rows else 0
+    return table(columns, [[payload[column][i] for column in columns] for i in range(start, length)])
+
+
+class Section:
+    """프롬프트 섹션 하나. variants는 상세한 것부터 간략한 것 순서의 렌더링 결과
+
+    priority가 클수록 중요도가 낮아 토큰이 부족할 때 먼저 간략화/생략되며,
+    priority 0 섹션은 간략화만 하고 생략하지 않는다.
+    """
+
+    __slots__ = ("name", "priority", "variants", "level")
+
+    def __init__(self, name, priority, variants):
+        self.name = name
+        self.priority = priority
+        self.variants = [variant for variant in variants if variant]
+        self.level = 0
+
+    @property
+    def text(self):
+        if self.level >= len(self.variants):
+            return None
+        return f"[{self.name}]\n{self.variants[self.level]}"
+
+    def can_shrink(self):
+        last = len(self.variants) - (1 if self.priority == 0 else 0)
+        return self.level < last
+
+
+class PromptEncoder:
+    """AI 입력 데이터를 토큰 예산 안의 간결한 표 형식 프롬프트로 변환"""
+
+    def __init__(self, budget=DEFAULT_TOKEN_BUDGET, model="gpt-4.1"):
+        self.budget = budget
+        self.model = model
+        self._encoding = None
+        self._encoding_loaded = False
+        self.system_tokens = self.count_tokens(SYSTEM_PROMPT)
+
+    def _get_encoding(self):
+        if not self._encoding_loaded:
+            self._encoding_loaded = True
+            try:
+                import tiktoken  # 무거우므로 처음 토큰을 셀 때 import
+            except ImportError:  # 없으면 글자 수 기반 추정치 사용
+                tiktoken = None
+            if tiktoken is not None:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except Exception:
+                    try:
+                        self._encoding = tiktoken.get_encoding("o200k_base")
+                    except Exception as e:
+                        log.warning("tiktoken unavailable, estimating token counts", error=repr(e))
+        return self._encoding
+
+    def count_tokens(self, text):
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text))
+        # 추정치: 영문/숫자는 약 4글자당 1토큰, 한글 등 비ASCII는 글자당 1토큰
+        non_ascii = sum(1 for char in text if ord(char) > 127)
+        return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+    def sections(self, data):
+        """optimized_data를 중요도 순서의 Section 목록으로"""
+        sections = []
+        status = data.get("current_status")
+        if status:
+            sections.append(Section("status", 0, [record_table(status)]))
+
+        ohlcv = data.get("ohlcv_data") or {}
+        if ohlcv.get("latest_indicators"):
+            sections.append(Section("daily_indicators", 0, [record_table(ohlcv["latest_indicators"])]))
+
+        orderbook = data.get("orderbook_data")
+        if orderbook:
+            totals = record_table(orderbook, ["timestamp", "total_ask_size", "total_bid_size"])
+            asks, bids = orderbook.get("ask_prices") or [], orderbook.get("bid_prices") or []
+            levels = [[i + 1, ask, bid] for i, (ask, bid) in enumerate(zip(asks, bids))]
+            sections.append(Section("orderbook", 1, [
+                totals + "\n" + table(["level", "ask_price", "bid_price"], levels),
+                totals + "\n" + table(["level", "ask_price", "bid_price"], levels[:1]),
+            ]))
+            if orderbook.get("microstructure"):
+                sections.append(Section("orderbook_microstructure", 2, [record_table(orderbook["microstructure"])]))
+
+        fear_greed = data.get("fear_greed")
+        if fear_greed:
+            current = {
+                "value": fear_greed["current"]["value"],
+                "classification": fear_greed["current"]["classification"],
+                "trend": fear_greed.get("trend"),
+                "average": fear_greed.get("average"),
+            }
+            sections.append(Section("fear_greed", 1, [record_table(current)]))
+            if fear_greed.get("history"):
+                history = fear_greed["history"]
+                sections.append(Section("fear_greed_history", 4, [
+                    table(["date", "value"], [[item["date"], item["value"]] for item in history]),
+                ]))
+
+        for name in ("hourly_data", "daily_data"):
+            payload = ohlcv.get(name)
+            if payload:
+                sections.append(Section(name.replace("_data", "_candles"), 3, [
+                    payload_table(payload),
+                    payload_table(payload, CORE_CANDLE_COLUMNS),
+                    payload_table(payload, CORE_CANDLE_COLUMNS, rows=3),
+                ]))
+
+        data_age = data.get("data_age_seconds")
+        if data_age:
+            sections.append(Section("data_age", 5, [record_table(data_age)]))
+        return sections
+
+    def encode(self, data):
+        """(프롬프트 문자열, 섹션별 토큰 보고서) 반환
+
+        전체가 budget 토큰을 넘으면 priority가 가장 큰(같으면 뒤쪽) 섹션부터 한 단계씩
+        간략화하거나 생략한다.
+        """
+        sections = self.sections(data)
+        tokens = {section.name: self.count_tokens(section.text) for section in sections}
+
+        while self.budget and sum(tokens.values()) > self.budget:
+            candidates = [section for section in sections if section.can_shrink()]
+            if not candidates:
+                break
+            section = max(reversed(candidates), key=lambda s: s.priority)
+            section.level += 1
+            tokens[section.name] = self.count_tokens(section.text) if section.text else 0
+
+        prompt = "\n\n".join(section.text for section in sections if section.text)
+        report = {
+            "system": self.system_tokens,
+            "sections": tokens,
+            "reduced": {
+                section.name: "dropped" if section.text is None else f"level {section.level}"
+                for section in sections if section.level
+            },
+            "user": self.count_tokens(prompt),
+            "budget": self.budget,
+        }
+        return prompt, report
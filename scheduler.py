@@ -0,0 +1,90 @@
+import math
+import time
+from datetime import timedelta
+
+from observability import METRICS, get_logger
+
+# interval별 캔들 길이 (month는 가장 긴 달 기준, candle_store와 공유)
+INTERVAL_DURATIONS = {
+    "minute1": timedelta(minutes=1),
+    "minute3": timedelta(minutes=3),
+    "minute5": timedelta(minutes=5),
+    "minute10": timedelta(minutes=10),
+    "minute15": timedelta(minutes=15),
+    "minute30": timedelta(minutes=30),
+    "minute60": timedelta(hours=1),
+    "minute240": timedelta(hours=4),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=31),
+}
+
+# epoch 배수로 마감 시각이 떨어지는 캔들 (week/month는 제외)
+ALIGNABLE_INTERVALS = [interval for interval in INTERVAL_DURATIONS if interval not in ("week", "month")]
+
+log = get_logger("scheduler")
+
+
+class Scheduler:
+    """벽시계에 정렬된 주기로 작업을 반복 실행
+
+    실행 시각은 항상 epoch 기준 interval의 배수(+offset)로 계산하므로 작업 시간이
+    누적되어 밀리지 않는다. 작업이 다음 실행 시각을 넘기면 밀린 회차는 건너뛴다.
+    """
+
+    def __init__(self, interval_seconds, offset_seconds=0.0, max_fetch_seconds=None):
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        self.interval = float(interval_seconds)
+        self.offset = float(offset_seconds)
+        # 실행 시각부터 데이터 수집 완료까지 허용하는 시간 (넘기면 해당 회차는 매매 생략)
+        self.max_fetch_seconds = max_fetch_seconds if max_fetch_seconds is not None else self.interval / 2
+        self.skipped = 0
+
+    def next_tick(self, now):
+        """now 이후 첫 실행 시각"""
+        return (math.floor((now - self.offset) / self.interval) + 1) * self.interval + self.offset
+
+    def run(self, job, max_cycles=None):
+        """job(deadline)을 주기마다 실행. deadline은 데이터 수집 마감 시각 (time.time() 기준)"""
+        tick = self.next_tick(time.time())
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            delay = tick - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+            try:
+                job(tick + self.max_fetch_seconds)
+            except Exception as e:
+                log.exception("Error in scheduled cycle", error=repr(e))
+            cycles += 1
+
+            now = time.time()
+            next_tick = tick + self.interval
+            if now >= next_tick:
+                missed = int((now - tick) // self.interval)
+                self.skipped += missed
+                METRICS.inc("cycles_skipped_total", missed, reason="overrun")
+                log.warning("Cycle overran, skipping", overrun=f"{now - next_tick:.1f}s", skipped=missed)
+                next_tick = self.next_tick(now)
+            tick = next_tick
+
+
+def add_schedule_arguments(parser):
+    parser.add_argument("--schedule", action="store_true", help="주기적으로 계속 실행")
+    parser.add_argument("--interval-minutes", type=float, default=60, help="실행 주기 (분)")
+    parser.add_argument(
+        "--align", choices=ALIGNABLE_INTERVALS, default=None,
+        help="캔들 마감 시각에 맞춰 실행 (지정하면 --interval-minutes 무시)",
+    )
+    parser.add_argument("--offset-seconds", type=float, default=5, help="정렬 시각 이후 지연 (초)")
+    parser.add_argument("--max-fetch-seconds", type=float, default=None, help="데이터 수집 허용 시간 (초)")
+
+
+def scheduler_from_args(args):
+    if args.align:
+        interval = INTERVAL_DURATIONS[args.align].total_seconds()
+    else:
+        interval = args.interval_minutes * 60
+    return Scheduler(interval, args.offset_seconds, args.max_fetch_seconds)
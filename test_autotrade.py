@@ -0,0 +1,80 @@
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from autotrade import EnhancedCryptoDataCollector, daily_candle_start
+from cache import TTLCache
+
+
+def candles(index, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1e8 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({
+        "open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+        "volume": 1.0, "value": close,
+    }, index=index)
+
+
+class FakeCandleStore:
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def get_ohlcv(self, ticker, interval="day", count=200):
+        self.calls.append(interval)
+        return self.frames[interval].iloc[-count:].copy()
+
+
+def test_daily_candle_start_is_utc_midnight_in_kst():
+    # KST로는 이미 다음 날(08:30)이어도 일봉은 UTC 자정(KST 09:00)에 바뀜
+    assert daily_candle_start(datetime(2026, 1, 2, 23, 30, tzinfo=timezone.utc)) == datetime(2026, 1, 2, 9)
+    assert daily_candle_start(datetime(2026, 1, 2, 0, 0, tzinfo=timezone.utc)) == datetime(2026, 1, 2, 9)
+
+
+def test_live_daily_bar_is_rebuilt_from_hourly_every_cycle():
+    start = pd.Timestamp(daily_candle_start())
+    daily = candles(pd.date_range(end=start, periods=200, freq="D"))
+    hourly = candles(pd.date_range(end=start + pd.Timedelta(hours=5), periods=200, freq="h"), seed=1)
+    store = FakeCandleStore({"day": daily, "minute60": hourly})
+    collector = EnhancedCryptoDataCollector(candle_store=store, cache=TTLCache())
+
+    first = collector.get_ohlcv_data()
+    today = hourly[hourly.index >= start]
+    assert first["daily_data"]["date"][-1] == start.strftime("%Y-%m-%d")
+    assert first["daily_data"]["open"][-1] == today["open"].iloc[0]
+    assert first["daily_data"]["high"][-1] == today["high"].max()
+    assert first["daily_data"]["close"][-1] == today["close"].iloc[-1]
+
+    # 가격이 크게 오르면 마감 일봉을 다시 받지 않아도 일봉 지표가 바로 바뀜
+    hourly.iloc[-1, hourly.columns.get_loc("close")] *= 1.2
+    second = collector.get_ohlcv_data()
+    assert store.calls.count("day") == 1
+    assert second["latest_indicators"]["rsi"] > first["latest_indicators"]["rsi"]
+    assert second["daily_data"]["close"][-1] == hourly["close"].iloc[-1]
+
+
+def test_source_still_running_after_timeout_is_skipped_next_cycle():
+    release = threading.Event()
+    calls = []
+
+    class SlowCollector(EnhancedCryptoDataCollector):
+        def get_ohlcv_data(self):
+            calls.append(1)
+            release.wait(5)
+            return {"latest_indicators": {}}
+
+    collector = SlowCollector(cache=TTLCache())
+    shared = {"current_status": {}, "orderbook_data": {}, "fear_greed": {}, "news": []}
+
+    first = collector.gather_analysis_data(timeouts={"ohlcv": 0.05}, shared=shared)
+    second = collector.gather_analysis_data(timeouts={"ohlcv": 0.05}, shared=shared)
+    assert first["ohlcv"] is None and second["ohlcv"] is None
+    assert len(calls) == 1  # 첫 조회가 끝나지 않았으므로 다시 실행하지 않음
+
+    release.set()
+    collector._inflight["ohlcv"].result(5)
+    third = collector.gather_analysis_data(timeouts={"ohlcv": 5}, shared=shared)
+    assert third["ohlcv"] == {"latest_indicators": {}}
+    assert len(calls) == 2
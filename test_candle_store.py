@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import candle_store
+from candle_store import CANDLE_FIELDS, CandleStore
+
+
+def frame(start, periods, close=1.0):
+    index = pd.date_range(start, periods=periods, freq="D")
+    data = {field: np.full(periods, close) for field in CANDLE_FIELDS}
+    data["close"] = close + np.arange(periods, dtype=float)
+    return pd.DataFrame(data, index=index)
+
+
+def fake_ohlcv(history):
+    def get_ohlcv(ticker, interval="day", count=200):
+        return history.iloc[-count:]
+    return get_ohlcv
+
+
+def test_sync_appends_in_place(tmp_path, monkeypatch):
+    history = frame("2026-01-01 09:00", 10)
+    monkeypatch.setattr(candle_store.pyupbit, "get_ohlcv", fake_ohlcv(history))
+    store = CandleStore(root=str(tmp_path))
+    assert store.sync("KRW-BTC", "day", history=5) == 5
+    path = store.path("KRW-BTC", "day")
+    inode = os.stat(path).st_ino
+
+    # 마지막 캔들(진행 중)은 값이 바뀌고 새 캔들 두 개가 추가됨
+    history = pd.concat([history.iloc[:-1], frame(history.index[-1], 3, close=50.0)])
+    monkeypatch.setattr(candle_store.pyupbit, "get_ohlcv", fake_ohlcv(history))
+    monkeypatch.setattr(candle_store.CandleStore, "_write",
+                        lambda *args: (_ for _ in ()).throw(AssertionError("file rewritten")))
+    store.sync("KRW-BTC", "day", history=5)
+
+    assert os.stat(path).st_ino == inode
+    loaded = store.load("KRW-BTC", "day")
+    assert len(loaded) == 7
+    assert list(loaded.index) == list(history.index[-7:])
+    assert list(loaded["close"][-3:]) == [50.0, 51.0, 52.0]
+
+
+def test_sync_trims_to_max_rows_with_slack(tmp_path, monkeypatch):
+    history = frame("2026-01-01 09:00", 40)
+    monkeypatch.setattr(candle_store.pyupbit, "get_ohlcv", fake_ohlcv(history.iloc[:8]))
+    store = CandleStore(root=str(tmp_path), max_rows=8)
+    store.sync("KRW-BTC", "day", history=8)
+
+    # 여유분(8 + 2)까지는 덧붙이기만 함
+    monkeypatch.setattr(candle_store.pyupbit, "get_ohlcv", fake_ohlcv(history.iloc[:10]))
+    store.sync("KRW-BTC", "day", history=1)
+    assert len(store.load("KRW-BTC", "day")) == 10
+
+    monkeypatch.setattr(candle_store.pyupbit, "get_ohlcv", fake_ohlcv(history.iloc[:11]))
+    store.sync("KRW-BTC", "day", history=1)
+    loaded = store.load("KRW-BTC", "day")
+    assert len(loaded) == 8
+    assert loaded.index[-1] == history.index[10]
@@ -0,0 +1,41 @@
+import copy
+
+from decision_cache import DecisionCache, fingerprint
+from decision_parser import Decision
+
+
+def snapshot(rsi=55.0, hourly_rsi=48.0, price=100_000_000.0):
+    return {
+        "current_status": {"current_price": price, "krw_balance": 1_000_000.0, "crypto_balance": 0.0},
+        "ohlcv_data": {
+            "latest_indicators": {"rsi": rsi, "macd": 1.0, "macd_signal": 0.5, "bb_position": 0.5},
+            "hourly_data": {"rsi": [40.0, hourly_rsi]},
+        },
+        "fear_greed": {"current": {"value": 50, "classification": "Neutral"}},
+        "orderbook_data": {"total_bid_size": 1.0, "total_ask_size": 1.0},
+    }
+
+
+def test_rsi_band_change_changes_fingerprint():
+    base = fingerprint("KRW-BTC", snapshot(rsi=55.0))
+    assert fingerprint("KRW-BTC", snapshot(rsi=58.0)) == base     # 같은 구간(50~60)
+    assert fingerprint("KRW-BTC", snapshot(rsi=61.0)) != base     # 다음 구간
+    assert fingerprint("KRW-BTC", snapshot(hourly_rsi=71.0)) != base
+
+
+def test_fingerprint_without_hourly_data():
+    data = snapshot()
+    del data["ohlcv_data"]["hourly_data"]
+    assert fingerprint("KRW-BTC", data)[0] == "KRW-BTC"
+
+
+def test_cache_misses_after_rsi_moves_to_another_band():
+    cache = DecisionCache(max_age=60)
+    decision = Decision("buy", "reason", "low", 70)
+    cache.store(fingerprint("KRW-BTC", snapshot(rsi=55.0)), decision)
+
+    assert cache.lookup(fingerprint("KRW-BTC", snapshot(rsi=56.0))) is decision
+    moved = copy.deepcopy(snapshot())
+    moved["ohlcv_data"]["latest_indicators"]["rsi"] = 72.0
+    assert cache.lookup(fingerprint("KRW-BTC", moved)) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from openai import OpenAI
+
+from decision_parser import (
+    DecisionParseError, DecisionParser, JsonObjectScanner, RESPONSE_FORMAT, StreamingDecisionParser,
+    extract_json_object,
+)
+from fake_openai import FakeOpenAIServer
+
+RESPONSE = {"decision": "buy", "risk_level": "low", "confidence_score": 72, "reason": "RSI가 반등 중"}
+TEXT = json.dumps(RESPONSE, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("text", [
+    TEXT,
+    f"```json\n{TEXT}\n```",
+    f"분석 결과는 다음과 같습니다.\n{TEXT}\n참고하세요.",
+])
+def test_parse_plain_fenced_and_prose_wrapped(text):
+    parser = DecisionParser()
+    decision = parser.parse(text)
+    assert (decision.decision, decision.risk_level, decision.confidence_score) == ("buy", "low", 72)
+    assert parser.stats()["fallbacks"] == (text != TEXT)
+
+
+def test_escaped_braces_and_quotes_inside_reason():
+    reason = 'MACD } 가 "교차 {" \\ 직후'
+    text = "결과: " + json.dumps(dict(RESPONSE, reason=reason), ensure_ascii=False) + " {끝}"
+    assert DecisionParser().parse(text).reason == reason
+    assert json.loads(extract_json_object(text))["reason"] == reason
+
+
+def test_truncated_response_fails():
+    parser = DecisionParser()
+    with pytest.raises(DecisionParseError):
+        parser.parse("응답: " + TEXT[:-10])
+    assert parser.stats()["failures"] == 1
+
+
+@pytest.mark.parametrize("data", [
+    dict(RESPONSE, decision="moon"),
+    dict(RESPONSE, risk_level="extreme"),
+    dict(RESPONSE, confidence_score=150),
+    ["buy"],
+])
+def test_invalid_values_fail(data):
+    with pytest.raises(DecisionParseError):
+        DecisionParser().parse(json.dumps(data))
+
+
+def test_oversize_input_is_rejected():
+    text = "x" * 25_000 + TEXT
+    with pytest.raises(DecisionParseError):
+        DecisionParser().parse(text)
+    with pytest.raises(DecisionParseError):
+        JsonObjectScanner(max_chars=100).feed("{" + '"a":' * 100)
+
+
+def test_scanner_finds_object_across_chunks():
+    scanner = JsonObjectScanner()
+    chunks = ["앞말 {\"a\": \"}", "\", \"b\": {\"c\"", ": 1}}", " 뒷말"]
+    results = [scanner.feed(chunk) for chunk in chunks]
+    assert results[:2] == [None, None]
+    assert json.loads(results[2]) == {"a": "}", "b": {"c": 1}}
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7])
+def test_streaming_early_decision_with_chunks_split_anywhere(size):
+    stream = StreamingDecisionParser()
+    chunks = [TEXT[i:i + size] for i in range(0, len(TEXT), size)]
+    early_at = None
+    for i, chunk in enumerate(chunks):
+        if stream.feed(chunk) is not None:
+            early_at = i
+    assert early_at is not None
+    # reason 값이 도착하기 전에 결정이 나와야 함
+    assert sum(len(chunk) for chunk in chunks[:early_at + 1]) < TEXT.index('"reason"') + len('"reason"') + 2
+    assert (stream.early.decision, stream.early.confidence_score) == ("buy", 72)
+    assert stream.finish().reason == RESPONSE["reason"]
+
+
+def test_streaming_split_inside_decision_token():
+    stream = StreamingDecisionParser()
+    for chunk in ['{"deci', 'sion": "b', 'uy", "risk_', 'level": "hi', 'gh", "confidence_score": 4']:
+        assert stream.feed(chunk) is None
+    early = stream.feed('5, "reason": "')
+    assert (early.decision, early.risk_level, early.confidence_score) == ("buy", "high", 45)
+
+
+def test_streaming_ignores_nested_decision_keys():
+    stream = StreamingDecisionParser()
+    text = json.dumps({"meta": {"decision": "sell"}, **RESPONSE})
+    for i in range(0, len(text), 4):
+        stream.feed(text[i:i + 4])
+    assert stream.early.decision == "buy"
+
+
+def test_streaming_invalid_early_values_defer_to_finish():
+    stream = StreamingDecisionParser()
+    assert stream.feed(json.dumps(dict(RESPONSE, decision="moon"))) is None
+    assert stream.early is None
+    with pytest.raises(DecisionParseError):
+        stream.finish()
+
+
+def test_streaming_against_fake_openai_server():
+    server = FakeOpenAIServer([TEXT], chunk_size=3).start()
+    try:
+        client = OpenAI(base_url=server.url, api_key="test", max_retries=0)
+        stream = client.chat.completions.create(
+            model="gpt-4.1", messages=[{"role": "user", "content": "x"}], response_format=RESPONSE_FORMAT, stream=True,
+        )
+        parser = StreamingDecisionParser()
+        early = []
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta and parser.feed(delta) is not None:
+                early.append(len(parser.text))
+        assert len(early) == 1 and early[0] < len(TEXT)
+        assert parser.finish().to_dict() == RESPONSE
+    finally:
+        server.stop()
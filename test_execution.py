@@ -0,0 +1,133 @@
+import pytest
+
+from execution import FEE_RATE, MIN_ORDER_KRW, MockExchange, OrderExecutor, size_order
+
+PRICE = 100_000_000.0
+
+
+def balance(executor, currency):
+    for item in executor.balances():
+        if item["currency"] == currency:
+            return float(item["balance"]), float(item["locked"])
+    return 0.0, 0.0
+
+
+def test_size_order_rejects_below_min_order():
+    assert size_order("buy", 50, None, MIN_ORDER_KRW * 1.5, 0.0, PRICE) is None
+    assert size_order("sell", 50, None, 0.0, MIN_ORDER_KRW * 1.5 / PRICE, PRICE) is None
+    assert size_order("hold", 100, None, 1_000_000, 1.0, PRICE) is None
+
+
+def test_size_order_leaves_room_for_fee():
+    side, amount = size_order("buy", 100, None, 1_000_000, 0.0, PRICE)
+    assert side == "buy"
+    assert amount * (1 + FEE_RATE) <= 1_000_000
+
+
+def test_size_order_fear_greed_tilt():
+    _, base = size_order("buy", 50, 50, 1_000_000, 0.0, PRICE)
+    _, fearful = size_order("buy", 50, 20, 1_000_000, 0.0, PRICE)
+    assert fearful > base
+
+
+def test_mock_exchange_fee_accounting():
+    exchange = MockExchange({"KRW": 1_000_000}, price_source=lambda ticker: PRICE)
+    order = exchange.buy_market_order("KRW-BTC", 500_000)
+    filled = exchange.get_order(order["uuid"])
+    assert filled["state"] == "done"
+    assert float(filled["paid_fee"]) == pytest.approx(500_000 * FEE_RATE)
+
+    balances = {item["currency"]: item for item in exchange.get_balances()}
+    assert float(balances["KRW"]["balance"]) == pytest.approx(1_000_000 - 500_000 * (1 + FEE_RATE))
+    assert float(balances["KRW"]["locked"]) == pytest.approx(0.0)
+    assert float(balances["BTC"]["balance"]) == pytest.approx(500_000 / PRICE)
+    assert float(balances["BTC"]["avg_buy_price"]) == pytest.approx(PRICE)
+
+    response = exchange.buy_market_order("KRW-BTC", 600_000)
+    assert response["error"]["name"] == "insufficient_funds"
+
+
+def test_mock_exchange_ledger_survives_restart(tmp_path):
+    path = str(tmp_path / "ledger.json")
+    exchange = MockExchange({"KRW": 1_000_000}, price_source=lambda ticker: PRICE, path=path)
+    exchange.buy_market_order("KRW-BTC", 200_000)
+
+    restarted = MockExchange({"KRW": 1_000_000}, price_source=lambda ticker: PRICE, path=path)
+    balances = {item["currency"]: float(item["balance"]) for item in restarted.get_balances()}
+    assert balances["KRW"] == pytest.approx(1_000_000 - 200_000 * (1 + FEE_RATE))
+    assert balances["BTC"] == pytest.approx(200_000 / PRICE)
+
+
+def test_executor_balance_cache_after_fill():
+    exchange = MockExchange({"KRW": 1_000_000}, price_source=lambda ticker: PRICE, fill_delay=0.2)
+    executor = OrderExecutor(exchange, poll_interval=0.01)
+    order_uuid = executor.submit("KRW-BTC", "buy", 100_000)
+    assert order_uuid is not None
+
+    # 체결 전에는 주문 금액(수수료 포함)이 묶여 있음
+    krw, locked = balance(executor, "KRW")
+    assert krw == pytest.approx(1_000_000 - 100_000 * (1 + FEE_RATE))
+    assert locked == pytest.approx(100_000 * (1 + FEE_RATE))
+
+    assert executor.wait_idle(5)
+    krw, locked = balance(executor, "KRW")
+    assert krw == pytest.approx(1_000_000 - 100_000 * (1 + FEE_RATE))
+    assert locked == pytest.approx(0.0)
+    assert balance(executor, "BTC")[0] == pytest.approx(100_000 / PRICE)
+    # 로컬 캐시가 거래소 잔고와 같아야 함
+    assert {item["currency"]: float(item["balance"]) for item in exchange.get_balances()} == pytest.approx(
+        {item["currency"]: float(item["balance"]) for item in executor.balances()})
+
+
+def test_submit_sized_uses_balance_left_by_earlier_orders():
+    exchange = MockExchange({"KRW": 1_000_000}, price_source=lambda ticker: PRICE, fill_delay=10)
+    executor = OrderExecutor(exchange, poll_interval=0.01)
+
+    def sizer(balances):
+        krw = next(float(item["balance"]) for item in balances if item["currency"] == "KRW")
+        return size_order("buy", 60, None, krw, 0.0, PRICE)
+
+    first = executor.submit_sized("KRW-BTC", sizer)
+    second = executor.submit_sized("KRW-ETH", sizer)
+    assert first and second
+    orders = {order["market"]: float(order["price"]) for order in exchange._orders.values()}
+    assert orders["KRW-ETH"] < orders["KRW-BTC"]
+    assert sum(orders.values()) * (1 + FEE_RATE) <= 1_000_000
+    assert executor.submit_sized("KRW-XRP", lambda balances: None) is None
+
+
+class PartialFillExchange(MockExchange):
+    """매수 주문의 일부만 체결하고 나머지는 취소(cancel)하는 거래소"""
+
+    def get_order(self, order_uuid):
+        order = super().get_order(order_uuid)
+        funds = float(order["price"]) / 2
+        volume = funds / PRICE
+        return dict(order, state="cancel", executed_volume=f"{volume}", paid_fee=f"{funds * FEE_RATE}",
+                    trades=[{"price": f"{PRICE}", "volume": f"{volume}", "funds": f"{funds}"}])
+
+
+def test_executor_partial_fill_returns_unused_reservation():
+    exchange = PartialFillExchange({"KRW": 1_000_000}, price_source=lambda ticker: PRICE, fill_delay=10)
+    executor = OrderExecutor(exchange, poll_interval=0.01)
+    executor.submit("KRW-BTC", "buy", 100_000)
+    assert executor.wait_idle(5)
+
+    krw, locked = balance(executor, "KRW")
+    assert krw == pytest.approx(1_000_000 - 50_000 * (1 + FEE_RATE))
+    assert locked == pytest.approx(0.0)
+    assert balance(executor, "BTC")[0] == pytest.approx(50_000 / PRICE)
+
+
+def test_executor_expires_unsettled_order_and_resyncs():
+    exchange = MockExchange({"KRW": 1_000_000}, price_source=lambda ticker: PRICE, fill_delay=60)
+    executor = OrderExecutor(exchange, poll_interval=0.01, order_timeout=0.05)
+    executor.submit("KRW-BTC", "buy", 100_000)
+    assert executor.wait_idle(5)
+    assert executor.pending() == []
+
+    # 만료 후에는 거래소 잔고를 다시 받아 로컬 캐시를 교체
+    exchange.fill_delay = 0
+    exchange._orders.clear()
+    exchange._balances["KRW"] = [777_000.0, 0.0, 0.0]
+    assert balance(executor, "KRW") == (pytest.approx(777_000.0), pytest.approx(0.0))
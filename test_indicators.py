@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import INDICATOR_COLUMNS, IndicatorSeries, compute_indicators
+
+ta = pytest.importorskip("ta")  # 비교 기준으로만 쓰는 테스트 전용 의존성 (requirements-dev.txt)
+
+CANDLES = 600
+WINDOW = 200  # autotrade가 매 사이클 넘기는 시간봉 창 크기
+
+
+def ohlcv(count=CANDLES, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1e8 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, count))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, count))
+    index = pd.date_range("2026-01-01", periods=count, freq="h")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": 1.0}, index=index)
+
+
+def ta_indicators(df):
+    """기존 ta 라이브러리 구현으로 계산한 같은 지표 (기준값)"""
+    out = pd.DataFrame(index=df.index)
+    bb = ta.volatility.BollingerBands(close=df["close"])
+    out["bb_high"] = bb.bollinger_hband()
+    out["bb_mid"] = bb.bollinger_mavg()
+    out["bb_low"] = bb.bollinger_lband()
+    out["bb_pband"] = bb.bollinger_pband()
+    out["rsi"] = ta.momentum.RSIIndicator(close=df["close"]).rsi()
+    macd = ta.trend.MACD(close=df["close"])
+    out["macd"] = macd.macd()
+    out["macd_signal"] = macd.macd_signal()
+    out["macd_diff"] = macd.macd_diff()
+    for window in (5, 20, 60, 120):
+        out[f"sma_{window}"] = ta.trend.SMAIndicator(close=df["close"], window=window).sma_indicator()
+    out["atr"] = ta.volatility.AverageTrueRange(
+        high=df["high"], low=df["low"], close=df["close"]
+    ).average_true_range()
+    return out[INDICATOR_COLUMNS]
+
+
+def assert_matches(actual, expected):
+    for column in INDICATOR_COLUMNS:
+        a, e = np.asarray(actual[column], dtype=float), np.asarray(expected[column], dtype=float)
+        # ATR은 ta가 워밍업 구간을 NaN 대신 0으로 채우므로 값이 있는 구간만 비교
+        valid = ~np.isnan(a) & ~np.isnan(e) & (e != 0 if column == "atr" else True)
+        assert valid.sum() > 0, column
+        np.testing.assert_allclose(a[valid], e[valid], rtol=1e-9, atol=1e-9, err_msg=column)
+        if column != "atr":
+            np.testing.assert_array_equal(np.isnan(a), np.isnan(e), err_msg=column)
+
+
+def test_fresh_series_matches_ta():
+    df = ohlcv()
+    assert_matches(compute_indicators(df), ta_indicators(df))
+
+
+def test_sliding_window_sync_matches_ta():
+    """매 사이클 한 봉씩 밀리는 창을 sync()해도 전체 이력으로 계산한 ta 값과 같아야 함"""
+    df = ohlcv()
+    expected = ta_indicators(df)
+    series = IndicatorSeries()
+    for end in range(WINDOW, CANDLES + 1):
+        window = df.iloc[end - WINDOW:end]
+        # 진행 중인 마지막 봉이 먼저 다른 가격으로 들어왔다가 갱신되는 경우
+        provisional = window.copy()
+        provisional.iloc[-1, provisional.columns.get_loc("close")] *= 1.02
+        series.sync(provisional)
+        values = series.sync(window)
+
+    actual = pd.DataFrame(values, index=df.index[-WINDOW:], columns=INDICATOR_COLUMNS)
+    assert_matches(actual, expected.iloc[-WINDOW:])
@@ -0,0 +1,83 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import journal  # noqa: E402
+from backtest import RecordedDecider  # noqa: E402
+from decision_cache import DecisionCache  # noqa: E402
+from journal import DecisionJournal  # noqa: E402
+
+
+def entry(ts, ticker="KRW-BTC", decision="buy", cached=False, fingerprint=("KRW-BTC", 1, True)):
+    return {
+        "ts": ts, "ticker": ticker, "decision": decision, "risk_level": "low", "confidence_score": 70,
+        "reason": "근거", "cached": cached, "fingerprint": list(fingerprint), "price": 100.0,
+        "snapshot": {"current_status": {"current_price": 100.0}},
+    }
+
+
+def test_record_flush_query_round_trip(tmp_path):
+    log = DecisionJournal(str(tmp_path), batch_size=1000, flush_interval=3600)
+    now = datetime.now(timezone.utc)
+    log.record(entry(now - timedelta(minutes=2), ticker="KRW-ETH", decision="sell"))
+    log.record(entry(now - timedelta(minutes=1)))
+    assert log.flush()
+
+    frame = log.query()
+    assert list(frame["ticker"]) == ["KRW-ETH", "KRW-BTC"]
+    assert json.loads(frame["snapshot"][1]) == {"current_status": {"current_price": 100.0}}
+    assert len(log.query(ticker="KRW-BTC")) == 1
+    assert len(log.query(start=now - timedelta(seconds=90))) == 1
+    assert len(log.query(end=now - timedelta(hours=1))) == 0
+
+
+def test_batch_across_utc_midnight_is_split_by_day(tmp_path):
+    log = DecisionJournal(str(tmp_path), batch_size=1000, flush_interval=3600)
+    for ts in ("2026-01-01 23:59:58", "2026-01-02 00:00:01"):
+        log.record(entry(ts))
+    assert log.flush()
+
+    days = sorted(path.name for path in tmp_path.iterdir())
+    assert days == ["2026-01-01", "2026-01-02"]
+    assert len(log.query("2026-01-02 00:00", "2026-01-02 23:59")) == 1
+    assert len(log.query("2026-01-01 00:00", "2026-01-01 23:59:59.999")) == 1
+
+
+def test_latest_decisions_restore_and_replay(tmp_path):
+    log = DecisionJournal(str(tmp_path), batch_size=1000, flush_interval=3600)
+    now = datetime.now(timezone.utc)
+    log.record(entry(now - timedelta(minutes=3), decision="sell"))
+    log.record(entry(now - timedelta(minutes=2), decision="buy", fingerprint=("KRW-BTC", 2, True)))
+    log.record(entry(now - timedelta(minutes=1), decision="sell", cached=True))  # 재사용 결정은 제외
+    log.record(entry(now - timedelta(hours=2), ticker="KRW-ETH"))                 # max_age 밖
+    assert log.flush()
+
+    latest = log.latest_decisions(max_age=600)
+    assert [(row["ticker"], row["decision"]) for row in latest] == [("KRW-BTC", "buy")]
+
+    cache = DecisionCache(max_age=600)
+    assert cache.restore(log) == 1
+    assert cache.lookup(("KRW-BTC", 2, True)).decision == "buy"
+
+    decider = RecordedDecider.from_journal(log, "KRW-BTC")
+    assert [record["decision"] for record in decider._records] == ["sell", "buy", "sell"]
+
+
+def test_queue_full_drops_and_warns_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "MAX_QUEUE", 2)
+    log = DecisionJournal(str(tmp_path))
+    log._ensure_writer = lambda: None  # 기록 스레드를 띄우지 않아 대기열이 비지 않게 함
+    warnings = []
+    monkeypatch.setattr(journal.log, "warning", lambda message, **fields: warnings.append(fields))
+
+    for i in range(5):
+        log.record(entry(datetime.now(timezone.utc)))
+    assert log._queue.qsize() == 2
+    assert len(warnings) == 1 and warnings[0]["dropped"] == 1
+
+    log._drop_warned_at -= journal.DROP_WARNING_INTERVAL
+    log.record(entry(datetime.now(timezone.utc)))
+    assert warnings[-1]["dropped"] == 3
@@ -0,0 +1,48 @@
+import json
+import time
+
+from market_feed import MarketFeed, ReplayServer
+from observability import METRICS
+
+ORDERBOOK = {
+    "type": "orderbook", "code": "KRW-BTC", "timestamp": 2, "total_ask_size": 1.0, "total_bid_size": 2.0,
+    "orderbook_units": [{"ask_price": 101.0, "bid_price": 99.0, "ask_size": 1.0, "bid_size": 2.0}],
+}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def bad_messages():
+    return sum(counter["value"] for counter in METRICS.to_json()["counters"]
+               if counter["name"] == "feed_bad_messages_total")
+
+
+def test_bad_frames_do_not_stop_the_feed(tmp_path):
+    path = tmp_path / "feed.jsonl"
+    lines = [
+        json.dumps({"type": "ticker", "code": "KRW-BTC", "trade_price": 100.0}),
+        "not json at all",
+        json.dumps({"type": "orderbook", "code": "KRW-BTC"}),       # 필드가 빠진 프레임
+        json.dumps(ORDERBOOK),
+        json.dumps({"type": "trade", "code": "KRW-BTC", "trade_price": 101.0}),
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    before = bad_messages()
+    server = ReplayServer.from_file(str(path)).start()
+    feed = MarketFeed(["KRW-BTC"], url=server.url).start()
+    try:
+        assert feed.wait_ready(5)
+        assert wait_for(lambda: feed.get_price("KRW-BTC") == 101.0)
+        assert feed.get_orderbook("KRW-BTC")["total_bid_size"] == 2.0
+        assert bad_messages() - before == 2
+    finally:
+        feed.stop()
+        server.stop()